@@ -0,0 +1,49 @@
+"""Time Requirement.to_yaml() with the emitter and with a ruamel dump.
+
+The requirements of a scaled example project are converted to text, once
+with the emitter and once with the emitter disabled so every requirement is
+dumped by ruamel, as before. The texts are compared so a difference in the
+output is seen as well as the time.
+
+Usage:
+    python benchmark/bench_emit.py [count]
+"""
+
+import sys
+import tempfile
+
+from context import littleR
+from littleR import requirement as requirement_module
+from littleR.emitter import dump_requirement
+from littleR.standard import Standard
+
+from synthetic import build_standard, timed
+
+
+def _to_yaml(requirements):
+    return [req.to_yaml() for req in requirements]
+
+
+def main(count=20000):
+    """Convert a synthetic standard to text both ways and print the results."""
+    with tempfile.TemporaryDirectory() as directory:
+        build_standard(directory, count)
+        standard = Standard("Emit", directory).read(directory)
+        requirements = list(standard.requirements_iter())
+
+        fast, emitted = timed(_to_yaml, requirements, repeat=3)
+        requirement_module.dump_requirement = lambda index, content: None
+        try:
+            slow, dumped = timed(_to_yaml, requirements, repeat=3)
+        finally:
+            requirement_module.dump_requirement = dump_requirement
+
+        size = sum(len(text) for text in emitted)
+        print(f"Requirements: {len(requirements)}  text {size / 2**20:.1f} MiB")
+        print(f"ruamel : {slow:8.3f} s  {len(requirements) / slow:10.0f} req/s")
+        print(f"emitter: {fast:8.3f} s  {len(requirements) / fast:10.0f} req/s")
+        print(f"speedup: {slow / fast:8.1f} x  identical: {emitted == dumped}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,57 @@
+"""Compare an eager and a lazy read of a scaled example project.
+
+The startup time, the memory held by the standard and the peak while
+reading are measured, then the time to use a single requirement, as the
+detail view does.
+
+Usage:
+    python benchmark/bench_lazy.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from context import littleR
+from littleR.standard import Standard
+
+from synthetic import build_standard, timed
+
+
+def _measure(directory, output, lazy):
+    # the memory held once the standard is read, and the most used while reading
+    tracemalloc.start()
+    standard = Standard("Lazy" if lazy else "Eager", output).read(directory, lazy=lazy)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return standard, held, peak
+
+
+def main(count=50000):
+    """Read a synthetic standard eagerly and lazily and print the results."""
+    with tempfile.TemporaryDirectory() as directory:
+        build_standard(directory, count)
+        output = os.path.join(directory, "output")
+        os.makedirs(output)
+
+        print(f"Requirements: {count}")
+        for lazy in [False, True]:
+            name = "lazy" if lazy else "eager"
+            seconds, standard = timed(
+                lambda l=lazy: Standard(name, output).read(directory, lazy=l), repeat=3
+            )
+            standard, held, peak = _measure(directory, output, lazy)
+            index = f"r{count // 2:08d}"
+            if standard.get_requirement(index) is None:
+                index = next(standard.requirements_iter()).index
+            detail, _ = timed(lambda s=standard: s.get_requirement(index).title)
+            print(
+                f"{name:>6}: read {seconds:8.3f} s  memory {held / 2**20:6.1f} MiB  "
+                f"peak {peak / 2**20:6.1f} MiB  "
+                f"first detail {detail * 1000:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
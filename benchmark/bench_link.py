@@ -0,0 +1,58 @@
+"""Time linking a standard where one customer requirement has many children.
+
+Every child names the customer requirement as its parent and the customer
+requirement lists every child, so each link is made from both sides. One
+child in ten also names a related index that does not exist, so notes are
+reported. The time per child should stay flat as the count grows.
+
+Usage:
+    python benchmark/bench_link.py [children]
+"""
+
+import os
+import sys
+import tempfile
+
+from context import littleR
+from littleR.requirement import Requirement
+from littleR.standard import Standard
+
+from synthetic import timed
+
+
+def build(directory, children):
+    """Return an unlinked standard with one customer and many children."""
+    path = os.path.join(directory, "Acme.yaml")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("")
+
+    standard = Standard("Link", directory)
+    indices = [f"r{i:08d}" for i in range(2, children + 2)]
+    standard.add_requirement(
+        Requirement.factory(
+            path, {"index": "r00000001", "type": "customer", "child_idx": indices}
+        )
+    )
+    for i, index in enumerate(indices):
+        data = {"index": index, "type": "software", "parent_idx": ["r00000001"]}
+        if i % 10 == 0:
+            data["related_idx"] = [f"r{children + 10 + i:08d}"]
+        standard.add_requirement(Requirement.factory(path, data))
+    return standard
+
+
+def main(children=10000):
+    """Link standards of growing size and print the time per child."""
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'children':>10} {'seconds':>10} {'us/child':>10}")
+        for count in [children // 8, children // 4, children // 2, children, children * 2]:
+            standard = build(directory, count)
+            seconds, _ = timed(
+                lambda s=standard: s._link_requirements(),  # pylint: disable=protected-access
+                repeat=1,
+            )
+            print(f"{count:>10} {seconds:>10.3f} {seconds / count * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,41 @@
+"""Compare the round trip and fast loaders on a scaled example project.
+
+Usage:
+    python benchmark/bench_loader.py [count]
+"""
+
+import os
+import sys
+import tempfile
+
+from context import littleR
+from littleR import loader
+from littleR.standard import Standard
+
+from synthetic import build_standard, timed
+
+
+def main(count=10000):
+    """Read a synthetic standard with each loader and print the times."""
+    with tempfile.TemporaryDirectory() as directory:
+        build_standard(directory, count)
+        output = os.path.join(directory, "output")
+        os.makedirs(output)
+
+        print(f"Requirements: {count}")
+        print(f"libyaml CSafeLoader: {loader.fast_is_accelerated()}")
+
+        results = {}
+        for name in loader.LOADERS:
+            seconds, standard = timed(
+                lambda n=name: Standard(n, output).read(directory, loader=n), repeat=3
+            )
+            results[name] = seconds
+            print(f"{name:>10}: {seconds:8.3f} s  {standard}")
+
+        speedup = results[loader.ROUND_TRIP] / results[loader.FAST]
+        print(f"fast loader speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,106 @@
+"""Compare the memory used per requirement by the old and compact layouts.
+
+The old layout is the Requirement as it was before slots: an instance
+dictionary, a set for each label and index field and a list for each
+link field, with a new string for every value read. Both layouts are
+built from a fresh parse of the same synthetic standard and linked.
+
+Usage:
+    python benchmark/bench_memory.py [count]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from context import littleR
+from littleR import loader
+from littleR.requirement import Requirement
+
+from synthetic import build_standard
+
+
+class DictRequirement:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """The Requirement fields as they were stored before slots."""
+
+    def __init__(self, file_path, req_data):
+        self._path = file_path
+        self.enabled = True
+        self.index = req_data["index"].lower()
+        self.type = req_data.get("type", "").lower()
+        self.title = req_data.get("title", "")
+        self.requirement = req_data.get("requirement", "")
+        self.description = req_data.get("description", "")
+        self.assumptions = req_data.get("assumptions", "")
+        self.component = req_data.get("component", "").lower()
+        self.label = {label.lower() for label in req_data.get("label", [])}
+        self.parent_idx = set(req_data.get("parent_idx", []))
+        self.child_idx = set(req_data.get("child_idx", []))
+        self.related_idx = set(req_data.get("related_idx", []))
+        self.parent = []
+        self.child = []
+        self.related = []
+
+    def add_link(self, relation, requirement):
+        """Append the requirement to the relation list once."""
+        links = getattr(self, relation)
+        if all(link is not requirement for link in links):
+            links.append(requirement)
+
+
+def _paths(directory):
+    paths = []
+    for root, _, files in os.walk(os.path.join(directory, "project")):
+        paths.extend(os.path.join(root, file) for file in sorted(files))
+    return sorted(paths)
+
+
+def _build(paths, factory):
+    # parse, create and link every requirement, return the memory they hold
+    tracemalloc.start()
+    requirements = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            data = loader.load(file, loader.FAST)
+        for key, value in data.items():
+            value["index"] = key
+            req = factory(path, value)
+            requirements[req.index] = req
+        del data
+
+    for req in requirements.values():
+        for relation, field in [
+            ("parent", "parent_idx"),
+            ("child", "child_idx"),
+            ("related", "related_idx"),
+        ]:
+            for index in getattr(req, field):
+                other = requirements.get(index)
+                if other is None:
+                    continue
+                req.add_link(relation, other)
+                reverse = {"parent": "child", "child": "parent"}.get(relation, relation)
+                other.add_link(reverse, req)
+
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, len(requirements)
+
+
+def main(count=100000):
+    """Build the requirements in each layout and print the bytes per requirement."""
+    with tempfile.TemporaryDirectory() as directory:
+        build_standard(directory, count)
+        paths = _paths(directory)
+
+        print(f"Requirements: {count}")
+        before, built = _build(paths, DictRequirement)
+        print(f"  before: {before / built:8.0f} bytes per requirement")
+        after, built = _build(paths, Requirement.factory)
+        print(f"   after: {after / built:8.0f} bytes per requirement")
+        print(f"  saving: {1 - after / before:8.1%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
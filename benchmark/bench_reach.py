@@ -0,0 +1,81 @@
+"""Time ancestor and descendant queries on a large linked standard.
+
+The standard is a tree: 100 customer requirements, each with a chain of
+service requirements, and each service with software children. One child in
+fifty also has a second parent in another branch. The first query of a
+requirement walks its links, a second query is a dictionary lookup. After a
+new link is made, only the bitsets that hold one of its ends are found again.
+
+Usage:
+    python benchmark/bench_reach.py [count]
+"""
+
+import os
+import sys
+import tempfile
+
+from context import littleR
+from littleR.requirement import Requirement
+from littleR.standard import Standard
+
+from synthetic import timed
+
+
+def build(directory, count):
+    """Return a linked standard with about count requirements."""
+    path = os.path.join(directory, "Acme.yaml")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("")
+
+    standard = Standard("Reach", directory)
+    parents = {}
+    for i in range(1, count + 1):
+        if i <= 100:
+            parents[i] = []
+        elif i <= count // 10:
+            parents[i] = [i - 100]
+        else:
+            parents[i] = [(i * 7919) % (count // 10) + 1]
+            if i % 50 == 0:
+                parents[i].append((i * 104729) % (count // 10) + 1)
+    for i, linked in parents.items():
+        data = {
+            "index": f"r{i:08d}",
+            "type": "customer" if i <= 100 else "software",
+            "parent_idx": [f"r{p:08d}" for p in linked],
+        }
+        standard.add_requirement(Requirement.factory(path, data))
+    standard._link_requirements()  # pylint: disable=protected-access
+    return standard
+
+
+def main(count=100000):
+    """Build a standard and print the time of each kind of query."""
+    with tempfile.TemporaryDirectory() as directory:
+        standard = build(directory, count)
+        graph = standard.graph()
+        reach = standard.reachability()
+        root = graph.node(standard.get_requirement("r00000001"))
+        leaf = graph.node(standard.get_requirement(f"r{count:08d}"))
+
+        first, bits = timed(reach.descendants, root)
+        again, _ = timed(reach.descendants, root, repeat=1000)
+        check, _ = timed(reach.reaches, root, leaf, repeat=1000)
+        up, _ = timed(reach.ancestors, leaf)
+        print(f"Requirements: {len(graph)}  below r00000001: {bin(bits).count('1')}")
+        print(f"descendants, first : {first * 1e3:10.3f} ms")
+        print(f"descendants, again : {again * 1e6:10.3f} us")
+        print(f"reaches            : {check * 1e6:10.3f} us")
+        print(f"ancestors, first   : {up * 1e6:10.3f} us")
+
+        # a new link keeps the bitsets it does not touch
+        child = standard.get_requirement(f"r{count - 1:08d}")
+        standard.relink(child.add_relationship(f"r{count:08d}", "child"))
+        rebase, reach = timed(standard.reachability)
+        print(f"relink, rebase     : {rebase * 1e3:10.3f} ms")
+        again, _ = timed(reach.descendants, root, repeat=1000)
+        print(f"descendants, kept  : {again * 1e6:10.3f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
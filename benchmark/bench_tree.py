@@ -0,0 +1,81 @@
+"""Time the tree the views render on a large linked standard.
+
+The standard is a tree: 100 top requirements, each with a chain of
+requirements below it, and the rest spread across them. The first call to
+Tree.nodes() walks the links, a second call with the same filter gets the
+nodes the standard kept. The top of the tree is kept by the standard too,
+so finding it again only sorts the roots. An edit to the text keeps the
+nodes, an edit to the labels finds them again.
+
+Usage:
+    python benchmark/bench_tree.py [count]
+"""
+
+import os
+import sys
+import tempfile
+
+from context import littleR
+from littleR.requirement import Requirement
+from littleR.standard import Standard
+from littleR.tree import Tree
+from littleR.tree_filter import TreeFilter
+
+from synthetic import timed
+
+
+def build(directory, count):
+    """Return a linked standard with about count requirements."""
+    path = os.path.join(directory, "Acme.yaml")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("")
+
+    standard = Standard("Tree", directory)
+    for i in range(1, count + 1):
+        if i <= 100:
+            parents = []
+        elif i <= count // 10:
+            parents = [i - 100]
+        else:
+            parents = [(i * 7919) % (count // 10) + 1]
+        data = {
+            "index": f"r{i:08d}",
+            "type": "software",
+            "parent_idx": [f"r{p:08d}" for p in parents],
+        }
+        standard.add_requirement(Requirement.factory(path, data))
+    standard._link_requirements()  # pylint: disable=protected-access
+    return standard
+
+
+def nodes(standard, max_depth):
+    """Return the nodes of an unfiltered tree, as the views ask for them."""
+    return Tree(standard, TreeFilter({})).nodes(max_depth)
+
+
+def main(count=100000):
+    """Build a standard and print the time to get its tree."""
+    with tempfile.TemporaryDirectory() as directory:
+        standard = build(directory, count)
+        tree = Tree(standard, TreeFilter({}))
+        top, _ = timed(tree.top)
+        top_again, _ = timed(tree.top, repeat=100)
+        first, found = timed(nodes, standard, 100)
+        again, _ = timed(nodes, standard, 100, repeat=100)
+        print(f"Requirements: {count}  nodes: {len(found)}")
+        print(f"top, first         : {top * 1e3:10.3f} ms")
+        print(f"top, kept          : {top_again * 1e6:10.3f} us")
+        print(f"nodes, first       : {first * 1e3:10.3f} ms")
+        print(f"nodes, kept        : {again * 1e6:10.3f} us")
+
+        req = standard.get_requirement(f"r{count:08d}")
+        req.requirement = "The tree shall be kept."
+        text, _ = timed(nodes, standard, 100)
+        print(f"after a text edit  : {text * 1e6:10.3f} us")
+        req.add_label("moved")
+        label, _ = timed(nodes, standard, 100)
+        print(f"after a label edit : {label * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,94 @@
+"""Build synthetic standards for the benchmarks.
+
+The example project is copied over and over with the indices shifted,
+so the requirements look like real ones and keep their relationships.
+"""
+
+import os
+import re
+import time
+
+EXAMPLE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "example")
+INDEX_PATTERN = re.compile(r"\br(\d{8})\b")
+
+
+def example_blocks():
+    """Return the text of each requirement in the example project.
+
+    Returns:
+        list: (index, text) tuples, one per requirement.
+    """
+    blocks = []
+    project_path = os.path.join(EXAMPLE_DIRECTORY, "project")
+    for root, _, files in sorted(os.walk(project_path)):
+        for file in sorted(files):
+            if not file.endswith(".yaml"):
+                continue
+            with open(os.path.join(root, file), "r", encoding="utf-8") as f:
+                text = f.read()
+            for block in re.split(r"\n\s*\n(?=r\d{8}:)", text.strip()):
+                if block.strip() == "":
+                    continue
+                index = int(block[1:9])
+                blocks.append((index, block.strip()))
+    return blocks
+
+
+def build_standard(directory, count, per_file=100):
+    """Write a standard with count requirements under directory.
+
+    Args:
+        directory (str): The empty directory to write the standard to.
+        count (int): The number of requirements to write.
+        per_file (int): The number of requirements in each folio.
+
+    Returns:
+        str: The directory, ready for Standard.read().
+    """
+    blocks = example_blocks()
+    span = max(index for index, _ in blocks)
+
+    with open(os.path.join(directory, "config.yaml"), "w", encoding="utf-8") as f:
+        f.write("project:\n  name: synthetic\n")
+
+    project_path = os.path.join(directory, "project")
+    os.makedirs(project_path, exist_ok=True)
+
+    texts = []
+    written = 0
+    copy = 0
+    while written < count:
+        offset = copy * span
+        for _, block in blocks:
+            if written == count:
+                break
+            texts.append(INDEX_PATTERN.sub(lambda m: f"r{int(m.group(1)) + offset:08d}", block))
+            written += 1
+        copy += 1
+
+    for i in range(0, len(texts), per_file):
+        path = os.path.join(project_path, f"folio_{i // per_file:05d}.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(texts[i : i + per_file]))
+
+    return directory
+
+
+def timed(function, *args, repeat=1, **kwargs):
+    """Run function and return the best time in seconds and the last result.
+
+    Args:
+        function (callable): The function to time.
+        repeat (int): The number of times to run the function.
+
+    Returns:
+        tuple: (seconds, result)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
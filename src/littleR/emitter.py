@@ -0,0 +1,235 @@
+"""Emitter used to write the requirements of the littleR project as .yaml text.
+
+Requirement.to_yaml() is called for every requirement each time a folio is
+written. A ruamel dump builds a representer, serializer and emitter for each
+call, which is most of the time spent writing a standard. The requirements
+only hold a small set of shapes: a mapping of scalars and lists of scalars,
+under a single index key. This module writes those shapes directly, with
+the same rules ruamel uses to choose the style of a scalar and to fold long
+lines, so the text is the same as the ruamel dump.
+
+Only plain, single quoted and literal block scalars are written. Anything
+else (double quoted text, folded scalars, keep chomping, unknown types)
+makes dump_requirement() return None, and the caller dumps with ruamel.
+"""
+
+import re
+import ruamel.yaml
+from ruamel.yaml.nodes import ScalarNode
+from ruamel.yaml.scalarstring import LiteralScalarString
+
+# the layout of YAML(typ=["rt", "string"])
+WIDTH = 80
+KEY_INDENT = 2
+VALUE_INDENT = 4
+SEQUENCE_ITEM = "  - "
+
+# a simple key longer than this is written as a complex key by ruamel
+MAX_KEY = 128
+
+STR_TAG = "tag:yaml.org,2002:str"
+BREAKS = "\n\x85\u2028\u2029"
+
+# text ruamel always allows as a plain scalar: no indicator, quote, break,
+# leading or trailing space or non ascii character, analyze_scalar() is
+# only needed for the rest
+_SAFE_PLAIN = re.compile(
+    r"[A-Za-z0-9(][A-Za-z0-9 _.,;()/+=-]*[A-Za-z0-9_.,;()/+=-]\Z|[A-Za-z0-9_]\Z"
+)
+
+_yaml = ruamel.yaml.YAML()
+_keys = {}
+
+
+def dump_requirement(index, content):
+    """Write one requirement as .yaml text, like YAML(typ=["rt", "string"]).
+
+    Args:
+        index (str): The top level key of the requirement.
+        content (dict): The fields of the requirement, in the order they are
+            written. The values are bool, str, LiteralScalarString or a list
+            of str.
+
+    Returns:
+        str: The .yaml text, without the final line break.
+        None: If the content can not be written the same way as ruamel.
+    """
+    if not _plain_key(index):
+        return None
+
+    lines = [f"{index}:"]
+    for key, value in content.items():
+        if not _field_key(key):
+            return None
+        prefix = " " * KEY_INDENT + f"{key}:"
+
+        if isinstance(value, list):
+            text = _sequence(prefix, value)
+        elif isinstance(value, bool):
+            text = prefix + (" true" if value else " false")
+        elif type(value) is LiteralScalarString:  # pylint: disable=unidiomatic-typecheck
+            text = _literal(prefix, str(value))
+        elif type(value) is str:  # pylint: disable=unidiomatic-typecheck
+            text = _scalar(prefix, value)
+        else:
+            return None
+
+        if text is None:
+            return None
+        lines.append(text)
+    return "\n".join(lines)
+
+
+def _implicit(text):
+    # a plain scalar that reads back as a string
+    tag = _yaml.resolver.resolve(ScalarNode, text, (True, False))
+    return str(tag) == STR_TAG
+
+
+def _plain_key(key):
+    # pylint: disable-next=unidiomatic-typecheck
+    if type(key) is not str or not key or len(key) >= MAX_KEY:
+        return False
+    if _SAFE_PLAIN.match(key) is None:
+        analysis = _yaml.emitter.analyze_scalar(key)
+        if analysis.multiline or not analysis.allow_block_plain:
+            return False
+    return _implicit(key)
+
+
+def _field_key(key):
+    # the same few field names are used by every requirement
+    plain = _keys.get(key)
+    if plain is None:
+        plain = _plain_key(key)
+        if isinstance(key, str):
+            _keys[key] = plain
+    return plain
+
+
+def _style(text):
+    # see Emitter.choose_scalar_style() for a block mapping value
+    if _SAFE_PLAIN.match(text) is not None and _implicit(text):
+        return ""
+    analysis = _yaml.emitter.analyze_scalar(text)
+    if analysis.allow_block_plain and _implicit(text):
+        return ""
+    if analysis.allow_double_quoted and ("'" in text or "\n" in text):
+        return '"'
+    if analysis.allow_single_quoted:
+        return "'"
+    return '"'
+
+
+def _scalar(prefix, text):
+    style = _style(text)
+    if style == "":
+        return _plain(prefix, text)
+    if style == "'":
+        return _single_quoted(prefix, text)
+    return None
+
+
+def _sequence(prefix, values):
+    if len(values) == 0:
+        return prefix + " []"
+
+    lines = [prefix]
+    for value in values:
+        # a label long enough to be folded is left to ruamel
+        if type(value) is not str:  # pylint: disable=unidiomatic-typecheck
+            return None
+        if len(SEQUENCE_ITEM) + len(value) + 2 > WIDTH:
+            return None
+        text = _scalar(SEQUENCE_ITEM[:-1], value)
+        if text is None:
+            return None
+        lines.append(text)
+    return "\n".join(lines)
+
+
+def _plain(prefix, text):
+    # see Emitter.write_plain(), a single line folded at single spaces
+    if any(ch in BREAKS for ch in text):
+        return None
+
+    out = [prefix, " "]
+    column = len(prefix) + 1
+    start = 0
+    length = len(text)
+    while start < length:
+        if text[start] == " ":
+            end = start
+            while end < length and text[end] == " ":
+                end += 1
+            if end - start == 1 and column >= WIDTH:
+                out.append("\n" + " " * VALUE_INDENT)
+                column = VALUE_INDENT
+            else:
+                out.append(text[start:end])
+                column += end - start
+        else:
+            end = text.find(" ", start)
+            if end == -1:
+                end = length
+            # a word that does not fit starts a new line
+            if end - start + column > WIDTH and column > VALUE_INDENT:
+                out.append("\n" + " " * VALUE_INDENT)
+                column = VALUE_INDENT
+            out.append(text[start:end])
+            column += end - start
+        start = end
+    return "".join(out)
+
+
+def _single_quoted(prefix, text):
+    # see Emitter.write_single_quoted(), folded at single spaces
+    if "'" in text or any(ch in BREAKS for ch in text):
+        return None
+
+    out = [prefix, " '"]
+    column = len(prefix) + 2
+    start = 0
+    length = len(text)
+    while start < length:
+        if text[start] == " ":
+            end = start
+            while end < length and text[end] == " ":
+                end += 1
+            if end - start == 1 and column > WIDTH and start != 0 and end != length:
+                out.append("\n" + " " * VALUE_INDENT)
+                column = VALUE_INDENT
+            else:
+                out.append(text[start:end])
+                column += end - start
+        else:
+            end = text.find(" ", start)
+            if end == -1:
+                end = length
+            out.append(text[start:end])
+            column += end - start
+        start = end
+    out.append("'")
+    return "".join(out)
+
+
+def _literal(prefix, text):
+    # see Emitter.write_literal(), every line indented, empty lines left bare
+    if not text:
+        return prefix + " |"
+    if any(ch in text for ch in "\r\x85\u2028\u2029"):
+        return None
+
+    hints = ""
+    if text[0] in " \n":
+        hints += "2"
+    if text[-1] != "\n":
+        hints += "-"
+    elif len(text) == 1 or text[-2] == "\n":
+        # keep chomping ends the document with "...", left to ruamel
+        return None
+
+    body = text[:-1] if text.endswith("\n") else text
+    indent = " " * VALUE_INDENT
+    lines = [line and indent + line for line in body.split("\n")]
+    return f"{prefix} |{hints}\n" + "\n".join(lines)
@@ -1,7 +1,10 @@
 """This module contains the Folio class."""
 
 import os
-import ruamel.yaml
+import re
+import secrets
+import stat
+from littleR import loader as yaml_loader
 from littleR.validate import Validator
 from littleR.requirement import Requirement
 
@@ -19,16 +22,35 @@ class Folio:
         _raw_contents (str): The raw contents of the file.
         _requirements (list): The list of Requirement objects created from the file.
             This list is only populated just before writing the file.
+        _parsed (dict): The parsed data from when the Folio was created.
+            Cleared once the requirements are created from it.
+        _loader (str): The loader used to parse the file, see littleR.loader.
+        _stat (tuple): The (mtime_ns, size) of the file when it was read or
+            last written. None if the file could not be found.
+        _lazy (bool): True if the text of the requirements is loaded on first use.
+        _blocks (dict): The (start, end) span of each requirement in the raw
+            contents, see block_spans(). None if the layout is not known.
+        _renamed (dict): The new index of the requirements given an index
+            since the blocks were found, indexed by the index in the file.
+        _write_failed (bool): True if the last write of the file failed.
     """
 
-    def __init__(self, path, validator):
+    def __init__(
+        self, path, validator, contents=None, loader=yaml_loader.ROUND_TRIP, lazy=False
+    ):  # pylint: disable=too-many-arguments
         """Create a new Folio object.
 
         File is read at object creation and parsed to check for validity.
+        The read can be done ahead of time, for example by a worker process,
+        by passing the result of read_folio() as contents.
 
         Args:
             path (str): The path to the .yaml file.
             validator (Validator): The validator object to use for validation.
+            contents (dict): The result of read_folio() for the path. Optional.
+            loader (str): The loader used to parse the file, see littleR.loader.
+            lazy (bool): If True, the file is indexed with index_folio() and
+                the text of each requirement is loaded on first use.
 
         Raises:
             TypeError: If the path is not a string or the validator is not a
@@ -42,6 +64,12 @@ class Folio:
             raise ValueError("The path must be a file ending in .yaml")
         if not isinstance(validator, Validator):
             raise ValueError("The validator must be an instance of the Validator class")
+        if contents is not None and not isinstance(contents, dict):
+            raise TypeError("The contents must be a dictionary from read_folio()")
+        if not yaml_loader.valid_loader(loader):
+            raise ValueError(f"The loader must be one of {yaml_loader.LOADERS}")
+        if not isinstance(lazy, bool):
+            raise TypeError("lazy must be a boolean")
 
         # store the path
         self._path = path
@@ -50,18 +78,39 @@ class Folio:
         self._validator = validator
         self._valid = True
 
+        # the strategy used to parse the file
+        self._loader = loader
+        self._lazy = lazy
+
         # test directory, is None unless set by the the standard
         # this must be initialize before the file is read
         self._test_directory = None
 
-        # read the file and store its contents, this is flat information
-        self._raw_contents = self._read_file()
+        # read and parse the file, unless it was done ahead of time
+        if contents is None:
+            contents = read_folio(self._path, self._loader, self._lazy)
+
+        # store the contents, this is flat information
+        self._raw_contents = contents["raw_contents"]
+        self._blocks = block_spans(self._raw_contents)
+        self._renamed = {}
+        self._write_failed = False
+
+        # the state of the file on disk, used to find changes
+        self._stat = contents.get("stat", stat_file(self._path))
 
         # requirements are linked back here just before writing the file
         self._requirements = []
 
-        # parse the file just to check if it is valid
-        self.parse_file()
+        # the parsed data is kept until the requirements are first requested
+        self._parsed = None
+
+        # report the read and parse, this checks if the file is valid
+        self._report(contents)
+        if self._raw_contents is None:
+            self._valid = False
+        else:
+            self._parsed = contents
 
     def path(self):
         """Get the path to the .yaml file.
@@ -77,6 +126,33 @@ class Folio:
             return os.path.join(self._test_directory, file_name)
         return self._path
 
+    def read_path(self):
+        """Get the path the .yaml file is read from.
+
+        Unlike path(), this is not changed by the test directory.
+
+        Returns:
+            str: The path to the .yaml file that is read.
+        """
+        return self._path
+
+    def stat(self):
+        """Get the state of the file when it was read or last written.
+
+        Returns:
+            tuple: The (mtime_ns, size) of the file.
+            None: If the file could not be found.
+        """
+        return self._stat
+
+    def changed(self):
+        """Check if the file changed on disk since it was read or written.
+
+        Returns:
+            bool: True if the file changed or was removed, False otherwise.
+        """
+        return stat_file(self._path) != self._stat
+
     def valid(self):
         """Check if the Folio is linked to a valid file.
 
@@ -92,6 +168,8 @@ class Folio:
         If the file is not valid, an empty list is returned.
         If the file has already been parsed and marked invalid,
         the file is not re-parsed unless force is True.
+        The first call uses the parse done when the Folio was created,
+        later calls parse the file again.
 
         Args:
             force (bool): If True, the file is re-parsed even if
@@ -112,75 +190,16 @@ class Folio:
         self._requirements = []
         self._valid = True
 
-        # initialize yaml parser
-        yaml = ruamel.yaml.YAML()
-
-        # read the file and parse it to verify the contents
-        data = None
-        try:
-            # we want to read from the actual path of the file, self._path
-            with open(self._path, "r", encoding="utf-8") as file:
-                data = yaml.load(file)
-        except Exception:
-            self._validator.file_note(
-                self.path(), "Error parsing .yaml file.", problem=True
-            )
-            self._valid = False
-            return []
-
-        # these checks make sure data was returned
-        if data is None:
-            self._validator.file_note(
-                self.path(), "No data read from file file.", problem=True
-            )
-            return []
-
-        if not isinstance(data, dict) and len(data) > 0:
-            self._validator.file_note(
-                self.path(), "No requirements found in file.", problem=True
-            )
-            self._valid = False
-            return []
-
-        # now we check the contents of the data by trying to make requirements out of it
-        parsed_requirements = []
-        for key, value in data.items():
-
-            if not Requirement.valid_index(key):
-                self._validator.file_note(
-                    self.path(), f"Invalid index: {key}.", problem=True
-                )
-                # this does not make the file invalid, just skips the requirement
-                continue
-
-            value["index"] = key
-            # regardless of the "test_directory" we want to create the requirement
-            # from the path of the folio
-            req = Requirement.factory(self._path, value)
-
-            # change the path if there is a test folder
-            if self._test_directory is not None:
-                req_file_name = os.path.basename(req.path())
-                req_path = os.path.join(self._test_directory, req_file_name)
-                req.set_path(req_path)
-            
-            # we cannot get a duplicate index - we will not check for one.
-
-            # now we add the requirement to the list of requirements
-            parsed_requirements.append(req)
-
-        # now check if we have any requirements
-        if len(parsed_requirements) == 0:
-            self._validator.file_note(
-                self.path(),
-                "No requirements were able to be created from file.",
-                problem=True,
-            )
-            self._valid = False
-            return []
+        # use the parse done when the folio was created, or parse the file again
+        parsed = self._parsed
+        self._parsed = None
+        if parsed is None or force:
+            state = stat_file(self._path)
+            parsed = scan_folio(self._path, self._loader, self._lazy)
+            parsed["stat"] = state
 
-        # return the list of requirements
-        return parsed_requirements
+        # report and make requirements from the parsed data
+        return self._create_requirements(parsed)
 
     def link_requirement(self, requirement):
         """Link a Requirement object to the Folio.
@@ -216,14 +235,26 @@ class Folio:
             raise ValueError("The test directory must be a valid directory")
         self._test_directory = test_directory
 
-    def write_file(self):
+    def write_file(self, directories=None, force=False):
         """Write the contents of the Folio to the .yaml file.
 
         Before calling this, ensure that requirement objects are
         linked to the Folio by calling link_requirement().
 
-        If the Folio is not valid, the file is not written.
+        If the Folio is not valid, the file is not written. If the file
+        changed on disk since it was read or written, it is not replaced
+        unless forced, the change is noted as a problem and write_failed()
+        is True. A file removed from disk is written again.
+        The file is replaced in one step, see replace_file().
+
+        Args:
+            directories (set): If given, the folder of the written file is
+                added to it to be synced with sync_directories(), otherwise
+                it is synced right away.
+            force (bool): If True, a file changed on disk is written over.
         """
+        self._write_failed = False
+
         # we don't need to write an invalid file
         if not self.valid():
             return
@@ -247,14 +278,150 @@ class Folio:
         # no need to write if nothing changed
         if text == self._raw_contents:
             return
-        
+
+        self._write_text(text, block_spans(text), directories, force)
+
+    def write_failed(self):
+        """Check if the last write of the file failed.
+
+        Returns:
+            bool: True if the file could not be written, False otherwise.
+        """
+        return self._write_failed
+
+    def rename_block(self, old_index, new_index):
+        """Record that a requirement of the file was given a new index.
+
+        patch_file() then writes the requirement in place of its old block.
+
+        Args:
+            old_index (str): The index in the file.
+            new_index (str): The new index of the requirement.
+        """
+        self._renamed[old_index] = new_index
+
+    def patch_file(self, requirements, changed, directories=None, force=False):
+        """Write only the changed requirements into the text of the file.
+
+        The block of each changed requirement is replaced in the raw
+        contents, the blocks of requirements that left the folio are
+        removed, and new requirements are added at the end. Everything
+        else, comments and order included, is kept as it was read.
+
+        Args:
+            requirements (list<Requirement>): Every requirement of the folio.
+            changed (set<str>): The indices of the requirements to write.
+                Only these are converted to text.
+            directories (set): See write_file().
+            force (bool): See write_file().
+
+        Returns:
+            bool: True if the file is up to date, False if the layout of the
+                file is not known and it must be written with write_file().
+        """
+        self._write_failed = False
+
+        # we don't need to write an invalid file
+        if not self.valid():
+            return True
+        if self._raw_contents is None or self._blocks is None:
+            return False
+
+        # the blocks of renamed requirements are found by the new index
+        if len(self._renamed) > 0:
+            renamed = self._renamed
+            self._blocks = {
+                renamed.get(key, key): span for key, span in self._blocks.items()
+            }
+            self._renamed = {}
+
+        text = self._raw_contents
+        indices = {req.index for req in requirements}
+
+        # the text of the changed requirements, new ones go at the end
+        replaced = {}
+        appended = []
+        for req in requirements:
+            if req.index not in changed:
+                continue
+            try:
+                req_text = req.to_yaml()
+            except Exception:
+                self._validator.index_note(
+                    req, "Error creating .yaml text from requirement.", problem=True
+                )
+                continue
+            if req.index in self._blocks:
+                replaced[req.index] = req_text
+            else:
+                appended.append((req.index, req_text))
+
+        # splice the blocks in file order, keeping the text between them
+        pieces = []
+        blocks = {}
+        length = 0
+        position = 0
+        for index, (start, end) in self._blocks.items():
+            if index not in indices and Requirement.valid_index(index):
+                # a removed block takes the blank lines after it, or before
+                # it at the end of the file
+                end = _next_text(text, end)
+                if end == len(text):
+                    start = len(text[:start].rstrip())
+                start = max(start, position)
+                pieces.append(text[position:start])
+                length += start - position
+                position = end
+                continue
+
+            pieces.append(text[position:start])
+            length += start - position
+            block = replaced.get(index, text[start:end])
+            blocks[index] = (length, length + len(block))
+            pieces.append(block)
+            length += len(block)
+            position = end
+        pieces.append(text[position:])
+        new_text = "".join(pieces)
+
+        for index, req_text in appended:
+            new_text = new_text.rstrip()
+            if new_text != "":
+                new_text += "\n\n"
+            blocks[index] = (len(new_text), len(new_text) + len(req_text))
+            new_text += req_text
+
+        # no need to write if nothing changed
+        if new_text != self._raw_contents:
+            self._write_text(new_text, blocks, directories, force)
+        return True
+
+    def _write_text(self, text, blocks, directories=None, force=False):
+        # a newer file on disk is not written over, a removed one is written
+        own_file = self.path() == self._path
+        if own_file and not force and self.changed() and os.path.isfile(self._path):
+            message = "File changed on disk since it was read, edits were not written."
+            self._validator.clear_file(self._path, tag="conflict")
+            self._validator.file_note(self._path, message, problem=True, tag="conflict")
+            self._write_failed = True
+            return
+
         # write the file
         try:
             # we write with the "path" so that the test directory is used
-            with open(self.path(), "w", encoding="utf-8") as file:
-                file.write(text)
+            replace_file(self.path(), text, directories)
         except Exception:
             self._validator.file_note(self.path(), "Error writing file.", problem=True)
+            self._write_failed = True
+            return
+
+        # the file now holds the text, our own write is not an outside change
+        self._raw_contents = text
+        self._blocks = blocks
+        self._renamed = {}
+        if own_file:
+            self._stat = stat_file(self._path)
+            self._validator.clear_file(self._path, tag="conflict")
 
     def clear(self):
         """Clear the contents of the Folio.
@@ -265,17 +432,51 @@ class Folio:
         """
         self._requirements = []
         self._raw_contents = ""
+        self._blocks = {}
+        self._renamed = {}
         self._valid = True
 
-    def _read_file(self):
-        try:
-            with open(self._path, "r", encoding="utf-8") as file:
-                data = file.read()
-        except Exception:
-            self._validator.file_note(self.path(), "Error reading file.", problem=True)
+    def _report(self, parsed):
+        # add the notes from reading and parsing to the validator, in order
+        for message, problem in parsed["notes"]:
+            self._validator.file_note(self.path(), message, problem=problem)
+        if not parsed["valid"]:
             self._valid = False
-            return None
-        return data
+
+    def _create_requirements(self, parsed):
+        self._report(parsed)
+        if not self._valid:
+            return []
+
+        parsed_requirements = []
+        for value in parsed["requirements"]:
+            # regardless of the "test_directory" we want to create the requirement
+            # from the path of the folio
+            req = Requirement.factory(self._path, value)
+
+            # the text is loaded from the block when it is first used
+            if "span" in value:
+                req.set_source(
+                    self._path,
+                    value["index"],
+                    value["span"],
+                    self._loader,
+                    parsed.get("stat", self._stat),
+                )
+
+            # change the path if there is a test folder
+            if self._test_directory is not None:
+                req_file_name = os.path.basename(req.path())
+                req_path = os.path.join(self._test_directory, req_file_name)
+                req.set_path(req_path)
+
+            # we cannot get a duplicate index - we will not check for one.
+
+            # now we add the requirement to the list of requirements
+            parsed_requirements.append(req)
+
+        # return the list of requirements
+        return parsed_requirements
 
     def __str__(self):
         return f"Folio({self._path})"
@@ -288,3 +489,430 @@ class Folio:
         if not isinstance(other, Folio):
             return False
         return self._path == other._path
+
+
+def read_folio(path, loader=yaml_loader.ROUND_TRIP, lazy=False):
+    """Read and parse a folio file without a validator.
+
+    This is the work done when a Folio is created. It only uses plain
+    data so it can be run in a worker process and the result passed
+    back to Folio() as contents.
+
+    Args:
+        path (str): The path to the .yaml file.
+        loader (str): The loader used to parse the file, see littleR.loader.
+        lazy (bool): If True, the file is indexed instead of parsed, see scan_folio().
+
+    Returns:
+        dict: The raw_contents of the file (None if it could not be read),
+            the stat of the file from stat_file(), and the result of scan_folio().
+    """
+    contents = {"raw_contents": None, "valid": False, "requirements": [], "notes": []}
+
+    # the state of the file is taken first, a change during the read is
+    # then seen as a change later
+    contents["stat"] = stat_file(path)
+
+    # read the file
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            contents["raw_contents"] = file.read()
+    except Exception:
+        contents["notes"].append(("Error reading file.", True))
+        return contents
+
+    # parse the file
+    contents.update(scan_folio(path, loader, lazy))
+    return contents
+
+
+def scan_folio(path, loader=yaml_loader.ROUND_TRIP, lazy=False):
+    """Index or parse a folio file.
+
+    Args:
+        path (str): The path to the .yaml file.
+        loader (str): The loader used to parse the file, see littleR.loader.
+        lazy (bool): If True, the file is indexed with index_folio() when it
+            has the simple layout, otherwise it is parsed with parse_folio().
+
+    Returns:
+        dict: The result of index_folio() or parse_folio().
+    """
+    if lazy:
+        parsed = index_folio(path)
+        if parsed is not None:
+            return parsed
+    return parse_folio(path, loader)
+
+
+def parse_folio(path, loader=yaml_loader.ROUND_TRIP):
+    """Parse a folio file into plain requirement data without a validator.
+
+    The notes that would be added to the validator are returned in
+    the order they were found so the caller can report them.
+
+    Args:
+        path (str): The path to the .yaml file.
+        loader (str): The loader used to parse the file, see littleR.loader.
+
+    Returns:
+        dict: valid (bool) if the file is still valid, requirements (list)
+            of plain requirement dictionaries including the index, and
+            notes (list) of (message, problem) tuples.
+    """
+    parsed = {"valid": True, "requirements": [], "notes": []}
+
+    # read the file and parse it to verify the contents
+    data = None
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            data = yaml_loader.load(file, loader)
+    except Exception:
+        parsed["notes"].append(("Error parsing .yaml file.", True))
+        parsed["valid"] = False
+        return parsed
+
+    # these checks make sure data was returned
+    if data is None:
+        parsed["notes"].append(("No data read from file file.", True))
+        return parsed
+
+    if not isinstance(data, dict) and len(data) > 0:
+        parsed["notes"].append(("No requirements found in file.", True))
+        parsed["valid"] = False
+        return parsed
+
+    # now we check the contents of the data
+    for key, value in data.items():
+
+        if not Requirement.valid_index(key):
+            parsed["notes"].append((f"Invalid index: {key}.", True))
+            # this does not make the file invalid, just skips the requirement
+            continue
+
+        value = _plain(value)
+        value["index"] = key
+        parsed["requirements"].append(value)
+
+    # now check if we have any requirements
+    if len(parsed["requirements"]) == 0:
+        parsed["notes"].append(
+            ("No requirements were able to be created from file.", True)
+        )
+        parsed["valid"] = False
+
+    return parsed
+
+
+# the parts of a folio that index_folio() understands without a parser
+_KEY_LINE = re.compile(rb"([A-Za-z0-9_]+):[ \t]*\r?\n?")
+_FIELD_LINE = re.compile(rb"  ([A-Za-z_]+):(?:[ \t]+(.*?))?[ \t]*\r?\n?")
+_ITEM_LINE = re.compile(rb" {2,4}- ([A-Za-z0-9_][A-Za-z0-9_ .\-/]*?)[ \t]*\r?\n?")
+_PLAIN_VALUE = re.compile(rb"[A-Za-z_][A-Za-z0-9_ .\-/]*")
+_NOT_STRING = re.compile(
+    rb"(?:true|false|null|~|[-+]?[0-9].*|\.(?:inf|nan).*)", re.IGNORECASE
+)
+_SCALAR_FIELDS = {b"type", b"component"}
+_LIST_FIELDS = {b"label", b"parent_idx", b"child_idx", b"related_idx"}
+
+
+def index_folio(path):
+    """Index a folio file without parsing the requirement text.
+
+    Each requirement is found by its top level key and recorded with its
+    byte span in the file. The short fields (type, component, labels, and
+    the relationship indices) are read from the lines so the requirements
+    can be linked. The text fields are left in the file and loaded when the
+    requirement first needs them, see Requirement.set_source().
+
+    Only the simple layout that littleR writes is indexed. Anything else,
+    comments aside, falls back to parse_folio().
+
+    Args:
+        path (str): The path to the .yaml file.
+
+    Returns:
+        dict: The same as parse_folio(), each requirement dictionary also
+            has the span (start, end) of its block in the file.
+        None: If the file does not have the simple layout.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except Exception:
+        return None
+
+    # find the blocks, each starts with a top level key
+    blocks = []
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        start = offset
+        offset += len(line)
+        if line.strip() == b"" or line.startswith(b"#"):
+            continue
+        if line[0:1] in (b" ", b"\t"):
+            if len(blocks) == 0:
+                return None
+            blocks[-1][2].append(line)
+            continue
+        match = _KEY_LINE.fullmatch(line)
+        if match is None:
+            return None
+        blocks.append([match.group(1).decode("utf-8"), start, []])
+    if len(blocks) == 0:
+        return None
+
+    parsed = {"valid": True, "requirements": [], "notes": []}
+    keys = set()
+    for i, (key, start, lines) in enumerate(blocks):
+        end = blocks[i + 1][1] if i + 1 < len(blocks) else len(data)
+
+        # a duplicated key is a parse error and an invalid key may not be
+        # a string, let the parser report them
+        if key in keys or not Requirement.valid_index(key):
+            return None
+        keys.add(key)
+
+        value = _index_block(lines)
+        if value is None:
+            return None
+
+        value["index"] = key
+        value["span"] = (start, end)
+        parsed["requirements"].append(value)
+
+    if len(parsed["requirements"]) == 0:
+        parsed["notes"].append(
+            ("No requirements were able to be created from file.", True)
+        )
+        parsed["valid"] = False
+
+    return parsed
+
+
+def _index_block(lines):
+    # read the short fields of one requirement, None if it is not simple
+    value = {}
+    fields = set()
+    field = None
+    for line in lines:
+        if line.lstrip().startswith(b"#"):
+            continue
+        match = _FIELD_LINE.fullmatch(line)
+
+        # lines below a field belong to it
+        if match is None:
+            if field in _LIST_FIELDS:
+                item = _ITEM_LINE.fullmatch(line)
+                if item is None or _NOT_STRING.fullmatch(item.group(1)):
+                    return None
+                value[field.decode("utf-8")].append(item.group(1).decode("utf-8"))
+            elif field in _SCALAR_FIELDS or field is None:
+                return None
+            elif not line.startswith(b"   ") and line.strip() != b"":
+                return None
+            elif line.strip() != b"" and not _safe_text(line.strip()):
+                return None
+            continue
+
+        field, text = match.group(1), match.group(2)
+        if field in fields:
+            return None
+        fields.add(field)
+
+        if field in _LIST_FIELDS:
+            if text is None:
+                value[field.decode("utf-8")] = []
+            elif text == b"[]":
+                value[field.decode("utf-8")] = []
+                field = None
+            else:
+                return None
+        elif field in _SCALAR_FIELDS:
+            if text is None or not _PLAIN_VALUE.fullmatch(text):
+                return None
+            if _NOT_STRING.fullmatch(text):
+                return None
+            value[field.decode("utf-8")] = text.decode("utf-8")
+        elif text is not None and not _safe_text(text):
+            return None
+
+    # a requirement without fields is not a mapping
+    if len(fields) == 0:
+        return None
+    return value
+
+
+def _safe_text(text):
+    # a plain scalar that the parser would read the same way, quoted and
+    # block scalars are left to the parser to check
+    if text[0:1] in (b'"', b"'", b"|", b">"):
+        return True
+    if text[0:1] in b"[]{},&*!%@`#?:-":
+        return False
+    return b": " not in text and b" #" not in text and not text.endswith(b":")
+
+
+_TEXT_KEY_LINE = re.compile(r"([A-Za-z0-9_]+):[ \t]*")
+_NEXT_TEXT = re.compile(r"\s*")
+
+
+def block_spans(text):
+    """Find the span of each top level key in the text of a folio.
+
+    A block runs from its key line to the end of its last indented line,
+    the blank lines and top level comments after it are not part of it.
+
+    Args:
+        text (str): The raw contents of the folio.
+
+    Returns:
+        dict: The (start, end) character offsets of each block, indexed by
+            the key, in the order of the file.
+        None: If the text does not have the simple layout that littleR writes.
+    """
+    if text is None:
+        return None
+
+    spans = {}
+    key = None
+    start = end = offset = 0
+    for line in text.splitlines(keepends=True):
+        line_start = offset
+        offset += len(line)
+        content = line.rstrip("\r\n")
+        if content.strip() == "":
+            continue
+        if content[0] in " \t":
+            if key is None:
+                return None
+            end = line_start + len(content)
+            continue
+        if content.startswith("#"):
+            continue
+
+        match = _TEXT_KEY_LINE.fullmatch(content)
+        if match is None or match.group(1) in spans:
+            return None
+        if key is not None:
+            spans[key] = (start, end)
+        key = match.group(1)
+        start = line_start
+        end = line_start + len(content)
+
+    if key is not None:
+        spans[key] = (start, end)
+    return spans
+
+
+def replace_file(path, text, directories=None):
+    """Write a text file in one step.
+
+    The text is written and flushed to a temporary file next to the path,
+    which then replaces the path. A reader sees the old file or the new
+    one, never part of it, and a crash leaves the old file in place.
+
+    Args:
+        path (str): The path to the file.
+        text (str): The text to write.
+        directories (set): If given, the folder of the file is added to it
+            to be synced with sync_directories(), otherwise it is synced
+            right away.
+
+    Raises:
+        OSError: If the file could not be written. The file is unchanged.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+
+    fd, temp_path = _create_temp(folder, os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+
+        # keep the permissions of the file being replaced, a new file has
+        # the ones the umask gave the temporary file
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # the rename is only durable once the folder is synced
+    if directories is None:
+        sync_directories([folder])
+    else:
+        directories.add(folder)
+
+
+def sync_directories(directories):
+    """Flush the entries of folders to disk, after files were replaced.
+
+    Folders that cannot be opened, as on Windows, are skipped.
+
+    Args:
+        directories (iterable<str>): The folders to sync.
+    """
+    for folder in directories:
+        try:
+            fd = os.open(folder, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _create_temp(folder, name):
+    # the temporary file does not end in .yaml so it is never read, it is
+    # opened like open() does so the umask applies to its permissions
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        temp_path = os.path.join(folder, f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temp_path, flags, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+def _next_text(text, position):
+    # the offset of the first character after the whitespace at position
+    return _NEXT_TEXT.match(text, position).end()
+
+
+def stat_file(path):
+    """Get the state of a file used to find changes.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        tuple: The (mtime_ns, size) of the file.
+        None: If the file could not be found.
+    """
+    try:
+        state = os.stat(path)
+    except OSError:
+        return None
+    return (state.st_mtime_ns, state.st_size)
+
+
+def _plain(value):
+    # convert the round trip containers to plain ones so they can be pickled,
+    # scalars keep their round trip type so the style is kept when written
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
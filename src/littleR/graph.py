@@ -0,0 +1,395 @@
+"""Graph class for the littleR project."""
+
+from array import array
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depends on the environment
+    numpy = None
+
+PARENT = "parent"
+CHILD = "child"
+RELATED = "related"
+RELATIONS = [PARENT, CHILD, RELATED]
+
+
+class Graph:
+    """The Graph class holds the links of a standard as compact arrays.
+
+    Each requirement gets a dense id, in the order of Requirement.int_index().
+    The parent, child and related links are stored in compressed sparse row
+    form: the links of node i are targets[offsets[i]:offsets[i + 1]]. NumPy
+    arrays are used when NumPy is installed, otherwise array("i").
+
+    The graph is built from the links of the requirements and keeps their
+    order. It is not changed after it is built, Standard.graph() builds a
+    new one when the standard changes.
+
+    The strongly connected components of the child links are found on first
+    use, with an iterative Tarjan pass in node order. A component with more
+    than one node, or a node that is its own child, is a cycle. The same
+    pass marks the back edges, the child links that close a cycle in that
+    walk. Without them the links form a tree, see tree_children().
+
+    Attributes:
+        _requirements (list<Requirement>): The requirements indexed by id.
+        _nodes (dict): The ids indexed by the id() of the requirements, as
+            two requirements can share an int_index().
+        _offsets (dict): The offsets array for each relation.
+        _targets (dict): The targets array for each relation.
+        _component (list<int>): The component of each node, None until used.
+        _components (list<list<int>>): The nodes of each component, sorted.
+        _back_edges (set<tuple>): The (parent, child) links that close a cycle.
+        _cycles (list<list<int>>): The components that are cycles, None until used.
+    """
+
+    def __init__(self, requirements):
+        """Create a new Graph object.
+
+        Args:
+            requirements (iterable<Requirement>): The linked requirements.
+
+        Raises:
+            TypeError: If requirements is not iterable.
+        """
+        # verify the input
+        try:
+            requirements = list(requirements)
+        except TypeError as e:
+            raise TypeError("requirements must be an iterable of Requirement") from e
+
+        self._requirements = sorted(requirements, key=lambda req: req.int_index())
+
+        # links are found by identity, the requirement objects are unique
+        self._nodes = {id(req): i for i, req in enumerate(self._requirements)}
+        nodes = self._nodes
+
+        self._offsets = {}
+        self._targets = {}
+        for relation in RELATIONS:
+            offsets = array("i", [0])
+            targets = array("i")
+            for req in self._requirements:
+                for other in getattr(req, relation):
+                    node = nodes.get(id(other))
+                    if node is not None:
+                        targets.append(node)
+                offsets.append(len(targets))
+            self._offsets[relation] = _compact(offsets)
+            self._targets[relation] = _compact(targets)
+
+        # found on first use, see _find_components()
+        self._component = None
+        self._components = None
+        self._back_edges = None
+        self._cycles = None
+
+    @staticmethod
+    def backend():
+        """Get the array type used to store the links.
+
+        Returns:
+            str: numpy or array.
+        """
+        return "numpy" if numpy is not None else "array"
+
+    def node(self, requirement):
+        """Get the id of a requirement.
+
+        Args:
+            requirement (Requirement): The requirement to find.
+
+        Returns:
+            int: The id of the requirement.
+            None: If the requirement is not in the graph.
+        """
+        return self._nodes.get(id(requirement))
+
+    def requirement(self, node):
+        """Get the requirement with an id.
+
+        Args:
+            node (int): The id of the requirement.
+
+        Returns:
+            Requirement: The requirement.
+        """
+        return self._requirements[node]
+
+    def neighbors(self, node, relation):
+        """Get the ids linked to a node.
+
+        Args:
+            node (int): The id of the requirement.
+            relation (str): parent, child or related.
+
+        Returns:
+            array: The linked ids, in the order they were linked.
+
+        Raises:
+            ValueError: If the relation is not known.
+        """
+        # verify the input
+        if relation not in RELATIONS:
+            raise ValueError(f"relation must be one of {RELATIONS}")
+
+        offsets = self._offsets[relation]
+        return self._targets[relation][offsets[node] : offsets[node + 1]]
+
+    def parents(self, node):
+        """Get the ids of the parents of a node, see neighbors()."""
+        return self.neighbors(node, PARENT)
+
+    def children(self, node):
+        """Get the ids of the children of a node, see neighbors()."""
+        return self.neighbors(node, CHILD)
+
+    def related(self, node):
+        """Get the ids of the related requirements of a node, see neighbors()."""
+        return self.neighbors(node, RELATED)
+
+    def adjacency(self, relation):
+        """Get the links of a relation as plain lists.
+
+        Args:
+            relation (str): parent, child or related.
+
+        Returns:
+            tuple: The offsets and the targets lists, the links of node i are
+                targets[offsets[i]:offsets[i + 1]].
+        """
+        return self._offsets[relation].tolist(), self._targets[relation].tolist()
+
+    def degree(self, node, relation):
+        """Get the number of links of a node.
+
+        Args:
+            node (int): The id of the requirement.
+            relation (str): parent, child or related.
+
+        Returns:
+            int: The number of links.
+        """
+        offsets = self._offsets[relation]
+        return int(offsets[node + 1] - offsets[node])
+
+    def edge_count(self, relation):
+        """Get the number of links of a relation in the graph.
+
+        Args:
+            relation (str): parent, child or related.
+
+        Returns:
+            int: The number of links.
+        """
+        return len(self._targets[relation])
+
+    def component(self, node):
+        """Get the strongly connected component of a node.
+
+        Args:
+            node (int): The id of the requirement.
+
+        Returns:
+            int: The id of the component, see components().
+        """
+        self._find_components()
+        return self._component[node]
+
+    def components(self):
+        """Get the strongly connected components of the child links.
+
+        The components are in reverse topological order: the components a
+        node's children are in come before the node's own component.
+
+        Returns:
+            list<list<int>>: The sorted node ids of each component.
+        """
+        self._find_components()
+        return [list(nodes) for nodes in self._components]
+
+    def cycles(self):
+        """Get the components that are parent and child cycles.
+
+        Returns:
+            list<list<int>>: The sorted node ids of each cycle, ordered by
+                their first node.
+        """
+        if self._cycles is None:
+            self._find_components()
+            cycles = []
+            for nodes in self._components:
+                if len(nodes) > 1 or (nodes[0], nodes[0]) in self._back_edges:
+                    cycles.append(list(nodes))
+            self._cycles = sorted(cycles)
+        return [list(nodes) for nodes in self._cycles]
+
+    def is_back_edge(self, parent, child):
+        """Check if a child link closes a cycle, see tree_children().
+
+        Args:
+            parent (int): The id of the parent.
+            child (int): The id of the child.
+
+        Returns:
+            bool: True if the link is dropped to break a cycle.
+        """
+        self._find_components()
+        return (parent, child) in self._back_edges
+
+    def tree_children(self, node):
+        """Get the children of a node without the links that close a cycle.
+
+        Following tree_children() from any node always ends.
+
+        Args:
+            node (int): The id of the requirement.
+
+        Returns:
+            list<int>: The ids of the children, in the order they were linked.
+        """
+        self._find_components()
+        children = self.children(node)
+        if len(self._back_edges) == 0:
+            return [int(child) for child in children]
+        return [int(c) for c in children if (node, int(c)) not in self._back_edges]
+
+    def tree_parents(self, node):
+        """Get the parents of a node without the links that close a cycle.
+
+        Args:
+            node (int): The id of the requirement.
+
+        Returns:
+            list<int>: The ids of the parents, in the order they were linked.
+        """
+        self._find_components()
+        parents = self.parents(node)
+        if len(self._back_edges) == 0:
+            return [int(parent) for parent in parents]
+        return [int(p) for p in parents if (int(p), node) not in self._back_edges]
+
+    def resolve_components(self):
+        """Find the component each requirement is part of.
+
+        A requirement with a component is part of it. One without is part of
+        the component of its first parent that is part of one, in the order
+        the parents were linked. The links that close a cycle are left out,
+        see tree_parents(), and the nodes are resolved in one topological
+        pass, parents first.
+
+        Returns:
+            list<str>: The component of each node, "" for none.
+        """
+        self._find_components()
+        count = len(self._requirements)
+        parents = [self.tree_parents(node) for node in range(count)]
+        children = [[] for _ in range(count)]
+        for node, node_parents in enumerate(parents):
+            for parent in node_parents:
+                children[parent].append(node)
+
+        # Kahn's algorithm, a node is resolved once all of its parents are
+        waiting = [len(node_parents) for node_parents in parents]
+        ready = [node for node in range(count) if waiting[node] == 0]
+        resolved = [""] * count
+        while ready:
+            node = ready.pop()
+            component = self._requirements[node].component
+            if component == "":
+                for parent in parents[node]:
+                    if resolved[parent] != "":
+                        component = resolved[parent]
+                        break
+            resolved[node] = component
+            for child in children[node]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    ready.append(child)
+        return resolved
+
+    def _find_components(self):
+        # iterative Tarjan over the child links, the nodes on the walk are
+        # kept too so a link back to one of them is known as a back edge
+        if self._component is not None:
+            return
+
+        count = len(self._requirements)
+        offsets = self._offsets[CHILD].tolist()
+        targets = self._targets[CHILD].tolist()
+        order = [-1] * count
+        low = [0] * count
+        component = [-1] * count
+        on_stack = [False] * count
+        on_walk = [False] * count
+        stack = []
+        components = []
+        back_edges = set()
+        counter = 0
+
+        for root in range(count):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = on_walk[root] = True
+            walk = [[root, offsets[root]]]
+
+            while walk:
+                frame = walk[-1]
+                node, position = frame
+                if position < offsets[node + 1]:
+                    frame[1] = position + 1
+                    child = targets[position]
+                    if order[child] == -1:
+                        order[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = on_walk[child] = True
+                        walk.append([child, offsets[child]])
+                        continue
+                    if on_walk[child]:
+                        back_edges.add((node, child))
+                    if on_stack[child] and order[child] < low[node]:
+                        low[node] = order[child]
+                    continue
+
+                # the node is done, its low link goes to its parent on the walk
+                walk.pop()
+                on_walk[node] = False
+                if walk and low[node] < low[walk[-1][0]]:
+                    low[walk[-1][0]] = low[node]
+                if low[node] != order[node]:
+                    continue
+
+                # the node is the root of a component
+                nodes = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = len(components)
+                    nodes.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(nodes))
+
+        self._component = component
+        self._components = components
+        self._back_edges = back_edges
+
+    def __len__(self):
+        return len(self._requirements)
+
+    def __str__(self):
+        return f"Graph({len(self._requirements)} requirements, {self.backend()})"
+
+    def __repr__(self):
+        return "Graph"
+
+
+def _compact(values):
+    # numpy when it is available, the array otherwise
+    if numpy is not None:
+        return numpy.frombuffer(values, dtype=numpy.intc).copy()
+    return values
@@ -9,10 +9,12 @@ Returns:
     JsonResponse: The response object.
 """
 
+from django.conf import settings
 from django.http import JsonResponse
 from django.template import loader
 from django.views.decorators.csrf import csrf_exempt
-from .models import Standard_Model as Std
+from .models import Standard_Model as Std, locked
+from .standard_view import StdView
 from littleR.requirement import Requirement
 from .forms.req_forms import ReqText, ReqPath
 
@@ -48,6 +50,7 @@ def check_input(request, req_id):
     return (True, "", standard, req)
 
 @csrf_exempt
+@locked
 def req_path(request, req_id):
     """The ajax handler for the requirement path."""
     (valid, message, standard, req) = check_input(request, req_id)
@@ -64,12 +67,13 @@ def req_path(request, req_id):
     form = ReqPath(request.POST, path_choices=path_choices)
     if form.is_valid():
         req.update_from_dict(form.cleaned_data)
-        standard.write()
+        Std.request_write()
         return JsonResponse({'success': True})
     
     return JsonResponse({'success': False, 'message': "The form is not valid."})
 
 @csrf_exempt
+@locked
 def req_text(request, req_id):
     """The ajax handler for the requirement text."""
     (valid, message, standard, req) = check_input(request, req_id)
@@ -81,12 +85,13 @@ def req_text(request, req_id):
     form = ReqText(request.POST)
     if form.is_valid():
         req.update_from_dict(form.cleaned_data)
-        standard.write()
+        Std.request_write()
         return JsonResponse({'success': True})
     
     return JsonResponse({'success': False})
 
 @csrf_exempt
+@locked
 def delete_req_label(request, req_id):
     """The ajax handler to delete labels from the requirement."""
     (valid, message, standard, req) = check_input(request, req_id)
@@ -100,7 +105,7 @@ def delete_req_label(request, req_id):
     
     label = request.POST["label"]
     req.delete_label(label)
-    standard.write()
+    Std.request_write()
 
     #create the template for the labels, this displays the labels for deletion
     label_template = loader.get_template("viewR/req_label.html")
@@ -110,6 +115,7 @@ def delete_req_label(request, req_id):
     return JsonResponse({'success': True, 'req_label': req_label})
 
 @csrf_exempt
+@locked
 def add_req_label(request, req_id):
     """The ajax handler to add labels for the requirement."""
     (valid, message, standard, req) = check_input(request, req_id)
@@ -123,7 +129,7 @@ def add_req_label(request, req_id):
     
     label = request.POST["new_label"]
     req.add_label(label)
-    standard.write()
+    Std.request_write()
 
     #create the template for the labels
     label_template = loader.get_template("viewR/req_label.html")
@@ -133,6 +139,7 @@ def add_req_label(request, req_id):
     return JsonResponse({'success': True, 'req_label': req_label})
 
 @csrf_exempt
+@locked
 def delete_req_relation(request, req_id):
     """The ajax handler to delete relationships from the requirement."""
     (valid, message, standard, req) = check_input(request, req_id)
@@ -147,7 +154,7 @@ def delete_req_relation(request, req_id):
     delete = request.POST["delete"]
     #delete deletes from both sides of the relationship
     req.delete_relationship(delete)
-    standard.write()
+    Std.request_write()
 
     #create the template for the relations, this displays the relations for deletion
     relation_template = loader.get_template("viewR/req_relation.html")
@@ -156,6 +163,7 @@ def delete_req_relation(request, req_id):
     return JsonResponse({'success': True, 'req_relation': req_relation})
 
 @csrf_exempt
+@locked
 def add_req_relation(request, req_id):
     """The ajax handler to add relationships for the requirement."""
     (valid, message, standard, req) = check_input(request, req_id)
@@ -192,7 +200,7 @@ def add_req_relation(request, req_id):
     #relink the requirements in the standard
     if len(relink) >= 2:
         standard.relink(relink)
-    standard.write()
+    Std.request_write()
 
     #create the template for the relations
     relation_template = loader.get_template("viewR/req_relation.html")
@@ -201,6 +209,7 @@ def add_req_relation(request, req_id):
     return JsonResponse({'success': True, 'req_relation': req_relation})
 
 @csrf_exempt
+@locked
 def add_req(request):
     """The ajax handler to add a new requirement."""
     # get the tree data
@@ -218,9 +227,60 @@ def add_req(request):
 
     #relink the requirements in the standard
     req = standard.get_new_requirement(path, type)
-    standard.write()
+    Std.request_write()
 
     url = '/viewR/req/' + req.index
 
     return JsonResponse({'success': True, 'new_req_url': url})
 
+@locked
+def writer_status(request):
+    """The ajax handler for the state of the background writer."""
+    standard = Std.model()
+    status = Std.writer().status()
+    status["problems"] = standard.validator().problem_count()
+    status["conflicts"] = standard.conflicts()
+    return JsonResponse({'success': True, 'status': status})
+
+@csrf_exempt
+@locked
+def resolve_conflict(request):
+    """The ajax handler for a file that changed on disk with unsaved edits.
+
+    The form sends the "path" of the file and the "action", "keep" writes
+    the edits over the file and "discard" reads the file again.
+    """
+    standard = Std.model()
+
+    # we get here via post
+    if request.method != "POST":
+        message = "The request must be a POST."
+        return JsonResponse({'success': False, 'message': message})
+
+    if "path" not in request.POST or "action" not in request.POST:
+        message = "The path or action is missing from the form."
+        return JsonResponse({'success': False, 'message': message})
+
+    path = request.POST["path"]
+    action = request.POST["action"]
+    if path not in standard.conflicts():
+        return JsonResponse({'success': False, 'message': "The file has no conflict."})
+
+    if action == "keep":
+        standard.write(patch=True, force=True)
+        if len(standard.write_errors()) > 0:
+            return JsonResponse({'success': False, 'message': "Error writing file."})
+    elif action == "discard":
+        standard.reload(path, discard=True)
+    else:
+        message = "The action must be keep or discard."
+        return JsonResponse({'success': False, 'message': message})
+
+    return JsonResponse({'success': True, 'conflicts': standard.conflicts()})
+
+def fragment_cache_status(request):
+    """The debug handler for the hits and misses of the fragment cache."""
+    if not settings.DEBUG:
+        message = "Only available in debug mode."
+        return JsonResponse({'success': False, 'message': message})
+    return JsonResponse({'success': True, 'status': StdView.fragments.status()})
@@ -0,0 +1,121 @@
+"""A cache of the rendered html of each requirement for the viewR app.
+
+The toc, summary and detail views render one template for each requirement
+in the tree. The html only changes when the requirement, its place in the
+tree or the template changes, so it is kept here and a repeated view joins
+the kept html instead of rendering each requirement again.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """The FragmentCache class keeps the most recently rendered fragments.
+
+    A fragment is found by its key, the template name, the requirement,
+    its revision, depth and outline number. The requirement is kept with
+    the html, so a new requirement that reuses the id() of a removed one
+    is not given its html. When the cache is full the fragment used
+    longest ago is dropped.
+
+    Attributes:
+        _max_size (int): The most fragments kept.
+        _fragments (OrderedDict): The (requirement, html) of each key, the
+            most recently used last.
+        _lock (Lock): Guards the fragments and the counters.
+        hits (int): The number of renders found in the cache.
+        misses (int): The number of renders not found in the cache.
+        evictions (int): The number of fragments dropped to make room.
+    """
+
+    def __init__(self, max_size=20000):
+        """Create a new FragmentCache object.
+
+        Args:
+            max_size (int): The most fragments kept.
+
+        Raises:
+            ValueError: If max_size is not a positive integer.
+        """
+        # verify the input
+        if not isinstance(max_size, int) or isinstance(max_size, bool) or max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+
+        self._max_size = max_size
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, template_name, template, context, request, revision):
+        """Return the html of a requirement, rendering it if it is not kept.
+
+        Args:
+            template_name (str): The name of the template, part of the key.
+            template (Template): The template to render on a miss.
+            context (dict): The context, with the requirement as "req", its
+                "depth" and its outline number as "idx".
+            request (HttpRequest): The request to render with.
+            revision (hashable): Changes when the html of the requirement
+                would change, see StdView.
+
+        Returns:
+            str: The html.
+        """
+        req = context["req"]
+        key = (template_name, id(req), revision, context["depth"], context["idx"])
+        with self._lock:
+            found = self._fragments.get(key)
+            if found is not None and found[0] is req:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return found[1]
+            self.misses += 1
+
+        # render outside the lock, a template can be slow
+        html = template.render(context, request)
+
+        with self._lock:
+            self._fragments[key] = (req, html)
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self._max_size:
+                self._fragments.popitem(last=False)
+                self.evictions += 1
+        return html
+
+    def clear(self):
+        """Drop every fragment and reset the counters."""
+        with self._lock:
+            self._fragments.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def status(self):
+        """Get the state of the cache.
+
+        Returns:
+            dict: size, max_size, hits, misses, evictions and hit_rate, the
+                share of renders found in the cache.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._fragments),
+                "max_size": self._max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total > 0 else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def __str__(self):
+        return f"FragmentCache({len(self._fragments)} of {self._max_size} fragments)"
+
+    def __repr__(self):
+        return "FragmentCache"
@@ -1,20 +1,72 @@
+import atexit
+import threading
+from functools import wraps
+
 from django.db import models
 
 from context import littleR
 from littleR.standard import Standard
+from littleR.watcher import Watcher
+from littleR.writer import Writer
 
 
 class Standard_Model(models.Model):
     """Model for accessing the standard.
 
     Do you appreciate the physics joke?
+
+    The standard is read once and kept up to date by a watcher that
+    refreshes it in place when the requirement files change on disk.
+    The read is lazy, the text of a requirement is loaded when a view
+    first shows it. Views hold the lock while they use the standard.
+
+    Edits are written by a background writer, a view asks for a write and
+    returns without waiting for it. Pending writes are flushed at exit.
     """
 
     # static data
     _standard = None
+    _watcher = None
+    _writer = None
+    _lock = threading.RLock()
 
     @staticmethod
     def model():
-        if Standard_Model._standard is None:
-            Standard_Model._standard = Standard("Root").read()
+        with Standard_Model._lock:
+            if Standard_Model._standard is None:
+                Standard_Model._standard = Standard("Root").read(cache=True, lazy=True)
+                Standard_Model._watcher = Watcher(
+                    Standard_Model._standard, lock=Standard_Model._lock
+                ).start()
+                Standard_Model._writer = Writer(
+                    Standard_Model._standard, lock=Standard_Model._lock
+                ).start()
+                atexit.register(Standard_Model._writer.stop)
         return Standard_Model._standard
+
+    @staticmethod
+    def writer():
+        """Return the writer of the standard."""
+        Standard_Model.model()
+        return Standard_Model._writer
+
+    @staticmethod
+    def request_write():
+        """Ask for the edited standard to be written in the background."""
+        Standard_Model.writer().request()
+
+    @staticmethod
+    def lock():
+        """Return the lock held while the standard is used or refreshed."""
+        return Standard_Model._lock
+
+
+def locked(view):
+    """Decorate a view so it holds the standard lock while it runs."""
+
+    @wraps(view)
+    def locked_view(*args, **kwargs):
+        with Standard_Model.lock():
+            return view(*args, **kwargs)
+
+    return locked_view
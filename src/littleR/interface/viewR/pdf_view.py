@@ -15,12 +15,12 @@ PYPPETEER_CHROMIUM_REVISION = '1263111'
 os.environ['PYPPETEER_CHROMIUM_REVISION'] = PYPPETEER_CHROMIUM_REVISION
 
 from pyppeteer import launch
-from django.http import HttpResponse, JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.template import loader
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 
-from .models import Standard_Model as Std
+from .models import Standard_Model as Std, locked
 from .views import menu_rendered
 from .standard_view import StdView
 from littleR.tree import Tree
@@ -62,31 +62,37 @@ def pdf_write(request, action):
     return write_pdf(url, filename)
 
 @csrf_exempt
+@locked
 def pdf_summary(request):
     """The summary view."""
     # pdf
     pdf_content = common_content(request, {"title": "Project Summary"} )
     pdf_content["menu"] = menu_rendered(request)
-    pdf_content["content"] = StdView.summary(request, 100, pdf=True) #depth can also be changed
+    content = StdView.summary_stream(request, 100, pdf=True) #depth can also be changed
 
-    # page
+    # page, the content is sent as it is rendered
     page_template = loader.get_template("viewR/pdf_page.html")
-    page_html = page_template.render(pdf_content, request)
+    page_html = StdView.stream_page(
+        page_template, pdf_content, request, "content", content
+    )
 
-    return HttpResponse(page_html)
+    return StreamingHttpResponse(page_html)
 
+@locked
 def pdf_detail(request):
     """The detail view."""
     # pdf
     pdf_content = common_content(request, {"title": "Project Details"} )
     pdf_content["menu"] = menu_rendered(request)
-    pdf_content["content"] = StdView.detail(request, 100, pdf=True) #depth can also be changed
+    content = StdView.detail_stream(request, 100, pdf=True) #depth can also be changed
 
-    # page
+    # page, the content is sent as it is rendered
     page_template = loader.get_template("viewR/pdf_page.html")
-    page_html = page_template.render(pdf_content, request)
+    page_html = StdView.stream_page(
+        page_template, pdf_content, request, "content", content
+    )
 
-    return HttpResponse(page_html)
+    return StreamingHttpResponse(page_html)
 
 # helper functions
 
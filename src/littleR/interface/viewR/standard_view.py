@@ -1,13 +1,23 @@
+from itertools import chain
+
 from django.http import HttpRequest
 from django.template import loader
+from django.utils.safestring import mark_safe
 
 from .models import Standard_Model as Std
+from .fragments import FragmentCache
 from littleR.tree import Tree
 from littleR.tree_filter import TreeFilter
 from littleR.standard import Standard
 
+# the items rendered while holding the lock, before they are sent
+STREAM_CHUNK = 200
+
 class StdView(Standard):
 
+    # the rendered html of each requirement, see FragmentCache
+    fragments = FragmentCache()
+
     @staticmethod
     def toc(request, max_depth, pdf=False):
         # verify the input
@@ -22,25 +32,19 @@ class StdView(Standard):
         
         # the template depends on the pdf flag
         if pdf:
-            toc_item_template = loader.get_template("viewR/pdf_toc_item.html")
+            toc_item_name = "viewR/pdf_toc_item.html"
         else:
-            toc_item_template = loader.get_template("viewR/toc_item.html")
+            toc_item_name = "viewR/toc_item.html"
+        toc_item_template = loader.get_template(toc_item_name)
         
-        # get the tree data
+        # get the tree data, kept by the standard until it changes
         tree = Tree( Std.model(), TreeFilter({})) # no filter for now
 
-        #start with the top
-        tree_top = tree.top()
         view = []
-        depth = 1
-        for i,req in enumerate(tree_top):
-
-            idx = str(i+1)
-            view.append( toc_item_template.render({"depth": depth, 'req':req, 'idx':idx}, request) )
-
-            for i,child in enumerate(tree.children(req)):
-                child_idx = idx+"."+str(i+1)
-                view.extend( StdView._tree_child(request, toc_item_template,  tree, child,child_idx, depth+1, max_depth) )
+        for node in tree.nodes(max_depth):
+            view.append(
+                StdView._render(request, toc_item_name, toc_item_template, node)
+            )
 
         # toc
         toc_template = loader.get_template("viewR/content.html")
@@ -56,6 +60,11 @@ class StdView(Standard):
 
     @staticmethod
     def summary(request, max_depth, pdf=False):
+        return "".join(StdView.summary_stream(request, max_depth, pdf))
+
+    @staticmethod
+    def summary_stream(request, max_depth, pdf=False):
+        """Return the summary as an iterator of html, see _stream_content()."""
         # verify the input
         if not isinstance(request, HttpRequest):
             raise TypeError("The request must be an HttpRequest.")
@@ -68,39 +77,34 @@ class StdView(Standard):
 
         # the template depends on the pdf flag
         if pdf:
-            summary_item_template = loader.get_template("viewR/pdf_summary_item.html")
+            summary_item_name = "viewR/pdf_summary_item.html"
         else:
-            summary_item_template = loader.get_template("viewR/summary_item.html")
+            summary_item_name = "viewR/summary_item.html"
+        summary_item_template = loader.get_template(summary_item_name)
 
-        # get the tree data
+        # get the tree data, kept by the standard until it changes
         tree = Tree( Std.model(), TreeFilter({})) # no filter for now
 
-        #start with the top
-        tree_top = tree.top()
-        view = []
-        depth = 1
-        for i,req in enumerate(tree_top):
-
-            idx = str(i+1)
-            view.append( summary_item_template.render({'depth': depth, 'depth_plus': depth+1, 'req':req, 'idx':idx}, request) )
-
-            for i,child in enumerate(tree.children(req)):
-                child_idx = idx+"."+str(i+1)
-                view.extend( StdView._tree_child(request, summary_item_template,  tree, child, child_idx, depth+1, max_depth) )
+        nodes = tree.nodes(max_depth)
 
         # summary
-        summary_template = loader.get_template("viewR/content.html")
         content = { 
             "class": "summary",
-            "view_list": view, 
             }
         if pdf:
             content["header"]= "Requirements Summary"
-        html = summary_template.render(content, request)
 
-        return html
+        return StdView._stream_content(
+            request, content, summary_item_name, summary_item_template, nodes
+        )
 
+    @staticmethod
     def detail(request, max_depth, pdf=False):
+        return "".join(StdView.detail_stream(request, max_depth, pdf))
+
+    @staticmethod
+    def detail_stream(request, max_depth, pdf=False):
+        """Return the detail as an iterator of html, see _stream_content()."""
         # verify the input
         if not isinstance(request, HttpRequest):
             raise TypeError("The request must be an HttpRequest.")
@@ -112,51 +116,118 @@ class StdView(Standard):
             raise TypeError("The pdf flag must be a boolean.")
 
         # this view is only used for the pdf
-        detail_item_template = loader.get_template("viewR/pdf_detail_item.html")
-
-        # get the tree data
-        tree = Tree( Std.model(), TreeFilter({}))
-
-        #start with the top
-        tree_top = tree.top()
-        view = []
-        depth = 1
-        for i,req in enumerate(tree_top):
+        detail_item_name = "viewR/pdf_detail_item.html"
+        detail_item_template = loader.get_template(detail_item_name)
 
-            idx = str(i+1)
-            view.append( detail_item_template.render({'req':req, 'idx':idx}, request) )
+        # get the tree data, kept by the standard until it changes
+        tree = Tree( Std.model(), TreeFilter({})) # no filter for now
 
-            for i,child in enumerate(tree.children(req)):
-                child_idx = idx+"."+str(i+1)
-                view.extend( StdView._tree_child(request, detail_item_template,  tree, child, child_idx, depth+1, max_depth) )
+        nodes = tree.nodes(max_depth)
 
-        # detail
-        detail_template = loader.get_template("viewR/content.html")
+        # detail, it shows the linked requirements too
         content = { 
             "class": "detail",
-            "view_list": view,
             "header": "Detailed Requirements",
             }
-        html = detail_template.render(content, request)
 
-        return html
-   
-    @staticmethod        
-    def _tree_child(request, template, tree, req, idx, depth, max_depth):
-        # input verified elsewhere
-        
-        # handle the trivial case
-        if depth > max_depth:
-            return []
-        
-        view = []
+        return StdView._stream_content(
+            request, content, detail_item_name, detail_item_template, nodes, linked=True
+        )
+
+    @staticmethod
+    def stream_page(template, context, request, key, content):
+        """Return a page as an iterator of html, with the content streamed in.
+
+        The page is rendered once around a hole, the part before it is sent
+        first, then the content as it is rendered, then the rest.
 
-        # render the child
-        view.append( template.render({"depth": depth, 'depth_plus': depth+1, 'req':req, 'idx':idx}, request) )
+        Args:
+            template (Template): The page template.
+            context (dict): The context of the page, without the content.
+            request (HttpRequest): The request.
+            key (str): The name of the content in the template.
+            content (iterator<str>): The html of the content.
 
-        # keep going down recursively        
-        for i,child in enumerate(tree.children(req)):
-            child_idx = idx+"."+str(i+1)
-            view.extend( StdView._tree_child(request, template,  tree, child, child_idx, depth+1, max_depth) )
-    
-        return view
\ No newline at end of file
+        Returns:
+            iterator<str>: The html of the page, for a StreamingHttpResponse.
+        """
+        head, tail = StdView.template_parts(template, context, request, key)
+        return chain([head], content, [tail])
+
+    @staticmethod
+    def template_parts(template, context, request, key, count=1):
+        """Render a template with holes and return the html around them.
+
+        Args:
+            template (Template): The template.
+            context (dict): The context, it is not changed.
+            request (HttpRequest): The request.
+            key (str): The name of the holes in the template.
+            count (int): The number of holes, more than 1 makes the value a
+                list for a for loop.
+
+        Returns:
+            list<str>: The html before, between and after the holes.
+        """
+        markers = [mark_safe(f"<!--littleR part {i}-->") for i in range(count)]
+        context = dict(context)
+        context[key] = markers[0] if count == 1 else markers
+        html = template.render(context, request)
+
+        parts = []
+        for marker in markers:
+            part, html = html.split(marker, 1)
+            parts.append(part)
+        parts.append(html)
+        return parts
+
+    @staticmethod
+    def _stream_content(
+        request, content, item_name, item_template, nodes, linked=False
+    ):  # pylint: disable=too-many-arguments
+        # the content around the items, each chunk rendered holding the lock
+        content_template = loader.get_template("viewR/content.html")
+        if len(nodes) == 0:
+            yield content_template.render(dict(content, view_list=[]), request)
+            return
+
+        head, between, tail = StdView.template_parts(
+            content_template, content, request, "view_list", 2
+        )
+        yield head
+        for start in range(0, len(nodes), STREAM_CHUNK):
+            with Std.lock():
+                items = [
+                    StdView._render(request, item_name, item_template, node, linked)
+                    for node in nodes[start : start + STREAM_CHUNK]
+                ]
+            if start > 0:
+                yield between
+            yield between.join(items)
+        yield tail
+   
+    @staticmethod
+    def _render(request, template_name, template, node, linked=False):
+        # the html of a node, kept until the requirement changes
+        standard = Std.model()
+        req = node.requirement
+        revision = standard.requirement_revision(req)
+        if linked:
+            revision = (revision, tuple(
+                standard.requirement_revision(other)
+                for other in [*req.parent, *req.child, *req.related]
+            ))
+        context = StdView._node_context(node)
+        return StdView.fragments.render(
+            template_name, template, context, request, revision
+        )
+
+    @staticmethod
+    def _node_context(node):
+        # the template context of a node of the tree
+        return {
+            "depth": node.depth,
+            "depth_plus": node.depth + 1,
+            "req": node.requirement,
+            "idx": node.outline,
+            }
@@ -20,6 +20,17 @@ urlpatterns = [
     path("ajax_delete_req_relation/<str:req_id>", ajax_view.delete_req_relation, name="ajax_delete_req_relation"),
     path("ajax_add_req_relation/<str:req_id>", ajax_view.add_req_relation, name="ajax_add_req_relation"),
     path("ajax_add_req", ajax_view.add_req, name="ajax_add_req"),
+    path("ajax_writer_status", ajax_view.writer_status, name="ajax_writer_status"),
+    path(
+        "ajax_resolve_conflict",
+        ajax_view.resolve_conflict,
+        name="ajax_resolve_conflict",
+    ),
+    path(
+        "debug/fragment_cache",
+        ajax_view.fragment_cache_status,
+        name="debug_fragment_cache",
+    ),
 
     path("pdf/summary", pdf_view.pdf_summary, name="pdf_summary"),
     path("pdf/detail", pdf_view.pdf_detail, name="pdf_detail"),
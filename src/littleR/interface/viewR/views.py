@@ -8,11 +8,13 @@ Args:
 Returns:
     HttpResponse: The response object.
 """
-from django.http import HttpResponse, HttpResponseNotFound, HttpRequest
+from django.http import (
+    HttpResponse, HttpResponseNotFound, HttpRequest, StreamingHttpResponse
+)
 from django.template import loader
 from django.views.decorators.csrf import csrf_exempt
 
-from .models import Standard_Model as Std
+from .models import Standard_Model as Std, locked
 from littleR.tree import Tree
 from littleR.tree_filter import TreeFilter
 from .standard_view import StdView
@@ -23,6 +25,7 @@ from .forms.req_forms import ReqText, ReqPath, ReqLabel, ReqRelationParent, ReqR
 
 # views
 
+@locked
 def index(request):
     """The index view for the viewR app."""
 
@@ -48,14 +51,15 @@ def index(request):
     return HttpResponse(page)
 
 @csrf_exempt
+@locked
 def summary(request, req_id=None):
     """The summary view, scrolled to the requirement."""
     # verify the input
     if not isinstance(req_id, str) or not Requirement.valid_index(req_id):
         req_id = None
     
-    # toc_tree (table of contents tree)
-    summary_html = StdView.summary(request, 100) #depth can also be changed
+    # the summary is sent as it is rendered
+    summary_html = StdView.summary_stream(request, 100) #depth can also be changed
 
     # menu
     menu = menu_rendered(request)
@@ -66,16 +70,18 @@ def summary(request, req_id=None):
 
     # page
     page_content = {
-        "content": summary_html,
         "menu": menu,
         "sidebar": navigation,
     }
     page_template = loader.get_template("viewR/page.html")
-    page = page_template.render(page_content, request)
+    page = StdView.stream_page(
+        page_template, page_content, request, "content", summary_html
+    )
 
-    return HttpResponse(page)
+    return StreamingHttpResponse(page)
 
 @csrf_exempt
+@locked
 def detail(request, req_id):
     """The detail view for the requirement."""
     # verify the input
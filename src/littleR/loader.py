@@ -0,0 +1,197 @@
+"""Loaders used to parse the .yaml files of the littleR project.
+
+Two strategies are available:
+    * roundtrip: ruamel round trip loading. It keeps the style of the
+      scalars, so it must be used when the files will be written again.
+    * fast: a C accelerated safe loader. PyYAML's CSafeLoader (libyaml)
+      is used when it is installed, otherwise ruamel's safe loader, which
+      uses its own C extension when available. Use it for read only work.
+"""
+
+import os
+import re
+import ruamel.yaml
+
+try:
+    import yaml as pyyaml
+except ImportError:  # pragma: no cover - depends on the environment
+    pyyaml = None
+
+ROUND_TRIP = "roundtrip"
+FAST = "fast"
+LOADERS = [ROUND_TRIP, FAST]
+
+
+def valid_loader(loader):
+    """Check if the loader is one of the known strategies.
+
+    Args:
+        loader (str): The name of the loader.
+
+    Returns:
+        bool: True if the loader is known, False otherwise.
+    """
+    return isinstance(loader, str) and loader in LOADERS
+
+
+def is_read_only(loader):
+    """Check if files loaded with the loader must not be written back.
+
+    Args:
+        loader (str): The name of the loader.
+
+    Returns:
+        bool: True if the loader drops information needed to write the file.
+    """
+    return loader != ROUND_TRIP
+
+
+def fast_is_accelerated():
+    """Check if the fast loader uses libyaml.
+
+    Returns:
+        bool: True if PyYAML's CSafeLoader is available, False otherwise.
+    """
+    return _FastLoader is not None
+
+
+def load(stream, loader=ROUND_TRIP):
+    """Load yaml data with the chosen strategy.
+
+    Args:
+        stream (file|str): The open file or text to load.
+        loader (str): The name of the loader, see LOADERS.
+
+    Returns:
+        object: The loaded data.
+
+    Raises:
+        ValueError: If the loader is not known.
+    """
+    # verify the input
+    if not valid_loader(loader):
+        raise ValueError(f"loader must be one of {LOADERS}")
+
+    if loader == FAST:
+        if _FastLoader is not None:
+            return pyyaml.load(stream, Loader=_FastLoader)
+        return ruamel.yaml.YAML(typ="safe").load(stream)
+
+    return ruamel.yaml.YAML().load(stream)
+
+
+def load_block(path, index, span, loader=ROUND_TRIP, stat=None):
+    """Load the data of one requirement from its block in a file.
+
+    Only the bytes of the block are parsed. If the file changed since the
+    span was found, or the block does not hold the index, the whole file is
+    parsed instead.
+
+    Args:
+        path (str): The path to the .yaml file.
+        index (str): The top level key of the requirement in the file.
+        span (tuple): The (start, end) byte offsets of the block.
+        loader (str): The name of the loader, see LOADERS.
+        stat (tuple): The (mtime_ns, size) of the file when the span was
+            found. The span is trusted if None.
+
+    Returns:
+        dict: The data of the requirement.
+        None: If the requirement could not be loaded.
+    """
+    try:
+        current = os.stat(path)
+        if stat is None or (current.st_mtime_ns, current.st_size) == tuple(stat):
+            with open(path, "rb") as file:
+                file.seek(span[0])
+                text = file.read(span[1] - span[0]).decode("utf-8")
+            data = load(text, loader)
+            if isinstance(data, dict) and index in data:
+                return data[index]
+
+        # the block moved, fall back to the whole file
+        with open(path, "r", encoding="utf-8") as file:
+            data = load(file, loader)
+        if isinstance(data, dict):
+            return data.get(index)
+    except Exception:
+        pass
+    return None
+
+
+def _fast_loader():
+    # PyYAML resolves yaml 1.1, where yes/no/on/off are booleans and 1:30 is
+    # a number. The requirements are read as yaml 1.2 by ruamel, so keep the
+    # plain scalars that 1.2 reads as strings as strings.
+    if pyyaml is None or not hasattr(pyyaml, "CSafeLoader"):
+        return None
+
+    class FastLoader(pyyaml.CSafeLoader):  # pylint: disable=too-many-ancestors
+        """CSafeLoader with yaml 1.2 booleans and numbers and no duplicate keys."""
+
+        def construct_mapping(self, node, deep=False):
+            # ruamel refuses duplicate keys, a duplicated index must not be hidden
+            keys = set()
+            for key_node, _ in node.value:
+                key = self.construct_object(key_node, deep=deep)
+                try:
+                    duplicate = key in keys
+                    keys.add(key)
+                except TypeError:
+                    continue
+                if duplicate:
+                    raise pyyaml.constructor.ConstructorError(
+                        "while constructing a mapping",
+                        node.start_mark,
+                        f"found duplicate key {key}",
+                        key_node.start_mark,
+                    )
+            return super().construct_mapping(node, deep=deep)
+
+        def construct_yaml_int(self, node):
+            # a leading zero is decimal in yaml 1.2, not octal
+            value = self.construct_scalar(node)
+            sign = -1 if value.startswith("-") else 1
+            digits = value.lstrip("-+")
+            if digits.startswith("0o"):
+                return sign * int(digits[2:], 8)
+            if digits.startswith("0x"):
+                return sign * int(digits[2:], 16)
+            return sign * int(digits, 10)
+
+    FastLoader.add_constructor("tag:yaml.org,2002:int", FastLoader.construct_yaml_int)
+
+    resolvers = {}
+    replaced = {
+        "tag:yaml.org,2002:bool",
+        "tag:yaml.org,2002:int",
+        "tag:yaml.org,2002:float",
+    }
+    for first, items in pyyaml.CSafeLoader.yaml_implicit_resolvers.items():
+        resolvers[first] = [
+            (tag, regexp) for tag, regexp in items if tag not in replaced
+        ]
+    FastLoader.yaml_implicit_resolvers = resolvers
+
+    FastLoader.add_implicit_resolver(
+        "tag:yaml.org,2002:bool",
+        re.compile(r"^(?:true|True|TRUE|false|False|FALSE)$"),
+        list("tTfF"),
+    )
+    FastLoader.add_implicit_resolver(
+        "tag:yaml.org,2002:int",
+        re.compile(r"^[-+]?(?:[0-9]+|0o[0-7]+|0x[0-9a-fA-F]+)$"),
+        list("-+0123456789"),
+    )
+    FastLoader.add_implicit_resolver(
+        "tag:yaml.org,2002:float",
+        re.compile(
+            r"^(?:[-+]?(?:\.[0-9]+|[0-9]+(?:\.[0-9]*)?)(?:[eE][-+]?[0-9]+)?"
+            r"|[-+]?\.(?:inf|Inf|INF)|\.(?:nan|NaN|NAN))$"
+        ),
+        list("-+.0123456789"),
+    )
+    return FastLoader
+
+
+_FastLoader = _fast_loader()
@@ -7,6 +7,7 @@ import webbrowser
 
 from context import littleR
 from littleR.standard import Standard
+from littleR.report import TEXT, valid_format
 
 def main():
     """Main function to run command line for installed project.
@@ -14,6 +15,12 @@ def main():
     This has two functions:
         * Run the command line interface for the littleR project.
         * Start the gui and open the default web browser to local host.
+
+    Options:
+        --jobs N, -j N: Parse the requirement files with N processes.
+        --check: Also run the validation rules, see littleR.rules.
+        --report-format F: Also write the report as F, jsonl or junit.
+            It can be given more than once, or as a comma separated list.
     """
     # check if the user wants to run the command line interface or the GUI
     if len(os.sys.argv) > 1 and os.sys.argv[1] == "gui":
@@ -106,6 +113,54 @@ def _can_copy_template():
     return False
 
 
+def _jobs():
+    # the number of processes to read the standard with, from --jobs N or -j N
+    args = os.sys.argv[1:]
+    for i, arg in enumerate(args):
+        value = None
+        if arg in ["--jobs", "-j"] and i + 1 < len(args):
+            value = args[i + 1]
+        elif arg.startswith("--jobs="):
+            value = arg[len("--jobs="):]
+        if value is None:
+            continue
+        try:
+            jobs = int(value)
+        except ValueError:
+            jobs = 0
+        if jobs < 1:
+            print(f"Invalid number of jobs: {value}. Using 1.")
+            return 1
+        return jobs
+    return 1
+
+
+def _check():
+    # the validation rules are only run when asked for with --check
+    return "--check" in os.sys.argv[1:]
+
+
+def _report_formats():
+    # the text report, and those asked for with --report-format F
+    args = os.sys.argv[1:]
+    formats = [TEXT]
+    for i, arg in enumerate(args):
+        value = None
+        if arg == "--report-format" and i + 1 < len(args):
+            value = args[i + 1]
+        elif arg.startswith("--report-format="):
+            value = arg[len("--report-format="):]
+        if value is None:
+            continue
+        for fmt in value.split(","):
+            fmt = fmt.strip().lower()
+            if not valid_format(fmt):
+                print(f"Invalid report format: {fmt}. It is not written.")
+            elif fmt not in formats:
+                formats.append(fmt)
+    return formats
+
+
 def _template_path(template_name):
     return os.path.join(os.path.dirname(__file__), "templates", template_name)
 
@@ -162,9 +217,14 @@ def _remove_project():
 
 
 def _validate_project():
-    standard = Standard().read()
+    jobs = _jobs()
+    standard = Standard().read(jobs=jobs, cache=True)
+    timings = standard.check(jobs=jobs) if _check() else {}
+    standard.validator().set_report_formats(_report_formats())
     standard.write()
     print("Project requirements validated.")
+    for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"  {name}: {seconds:.3f} s")
     print(f"Problems found: {standard.validator().problem_count()}")
     if standard.validator().problem_count() > 0:
         print("Please review the problems and correct as needed.")
@@ -0,0 +1,198 @@
+"""Reachability class for the littleR project."""
+
+from littleR.graph import CHILD, PARENT
+
+# the positions of the set bits of each byte
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+class Reachability:
+    """The Reachability class answers which requirements are above or below another.
+
+    The descendants and ancestors of a node are kept as a bitset, a Python
+    int with bit i set for node i of the Graph. A bitset is found by a walk
+    of the links the first time it is asked for and kept, so asking again,
+    or asking if one node reaches another, takes microseconds.
+
+    When the links change but the requirements do not, rebase() keeps the
+    bitsets the change cannot touch: a descendants bitset is dropped only if
+    it holds a node whose links changed, and the same for ancestors.
+
+    Attributes:
+        _graph (Graph): The graph the node ids come from.
+        _links (dict): The offsets and targets of each relation as lists.
+        _descendants (dict): The descendants bitset of each node asked for.
+        _ancestors (dict): The ancestors bitset of each node asked for.
+    """
+
+    def __init__(self, graph):
+        """Create a new Reachability object.
+
+        Args:
+            graph (Graph): The graph of the standard.
+        """
+        self._graph = graph
+        self._links = {}
+        self._descendants = {}
+        self._ancestors = {}
+        self._read_links()
+
+    def graph(self):
+        """Get the graph the node ids come from.
+
+        Returns:
+            Graph: The graph.
+        """
+        return self._graph
+
+    def descendants(self, node):
+        """Get the descendants of a node, following the child links.
+
+        Args:
+            node (int): The id of the requirement.
+
+        Returns:
+            int: The bitset of the descendants, without the node itself
+                unless it is in a cycle.
+        """
+        bits = self._descendants.get(node)
+        if bits is None:
+            bits = self._descendants[node] = self._walk(node, CHILD)
+        return bits
+
+    def ancestors(self, node):
+        """Get the ancestors of a node, following the parent links.
+
+        Args:
+            node (int): The id of the requirement.
+
+        Returns:
+            int: The bitset of the ancestors, without the node itself
+                unless it is in a cycle.
+        """
+        bits = self._ancestors.get(node)
+        if bits is None:
+            bits = self._ancestors[node] = self._walk(node, PARENT)
+        return bits
+
+    def impacted_by(self, nodes):
+        """Get the descendants of any of the nodes.
+
+        Args:
+            nodes (iterable<int>): The ids of the changed requirements.
+
+        Returns:
+            int: The bitset of the requirements below a changed one.
+        """
+        bits = 0
+        for node in nodes:
+            bits |= self.descendants(node)
+        return bits
+
+    def reaches(self, ancestor, descendant):
+        """Check if a node is below another.
+
+        Args:
+            ancestor (int): The id of the requirement above.
+            descendant (int): The id of the requirement below.
+
+        Returns:
+            bool: True if descendant is a descendant of ancestor.
+        """
+        return bool(self.descendants(ancestor) >> descendant & 1)
+
+    def rebase(self, graph, changed):
+        """Move to a new graph of the same requirements.
+
+        Args:
+            graph (Graph): The new graph.
+            changed (iterable<Requirement>): The requirements whose links
+                may have changed since the old graph was built.
+
+        Returns:
+            bool: True if the bitsets were kept, False if the requirements of
+                the graphs differ and the new graph needs a new Reachability.
+        """
+        if graph is self._graph:
+            return True
+        old = self._graph
+        if len(graph) != len(old):
+            return False
+        for node in range(len(graph)):
+            if graph.requirement(node) is not old.requirement(node):
+                return False
+
+        # the bitsets that hold a changed node are found again when asked for
+        nodes = [graph.node(req) for req in changed]
+        mask = to_bits(node for node in nodes if node is not None)
+        for cache in [self._descendants, self._ancestors]:
+            dropped = [n for n, bits in cache.items() if bits & mask or mask >> n & 1]
+            for node in dropped:
+                del cache[node]
+
+        self._graph = graph
+        self._read_links()
+        return True
+
+    def _read_links(self):
+        # plain lists are faster to walk than the arrays of the graph
+        for relation in [CHILD, PARENT]:
+            self._links[relation] = self._graph.adjacency(relation)
+
+    def _walk(self, node, relation):
+        # every node reached from the node by the relation
+        offsets, targets = self._links[relation]
+        seen = bytearray(len(self._graph))
+        found = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for other in targets[offsets[current] : offsets[current + 1]]:
+                if not seen[other]:
+                    seen[other] = 1
+                    found.append(other)
+                    stack.append(other)
+        return to_bits(found)
+
+    def __str__(self):
+        kept = len(self._descendants) + len(self._ancestors)
+        return f"Reachability({len(self._graph)} requirements, {kept} bitsets)"
+
+    def __repr__(self):
+        return "Reachability"
+
+
+def to_bits(nodes):
+    """Make a bitset of node ids.
+
+    Args:
+        nodes (iterable<int>): The node ids.
+
+    Returns:
+        int: The bitset, bit i is set for node i.
+    """
+    nodes = list(nodes)
+    if len(nodes) == 0:
+        return 0
+    packed = bytearray(max(nodes) // 8 + 1)
+    for node in nodes:
+        packed[node >> 3] |= 1 << (node & 7)
+    return int.from_bytes(packed, "little")
+
+
+def from_bits(bits):
+    """Get the node ids of a bitset.
+
+    Args:
+        bits (int): The bitset.
+
+    Returns:
+        list<int>: The node ids, in order.
+    """
+    nodes = []
+    packed = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for i, byte in enumerate(packed):
+        if byte:
+            base = i * 8
+            nodes.extend(base + bit for bit in _BYTE_BITS[byte])
+    return nodes
@@ -0,0 +1,247 @@
+"""Report writers for the validation notes of the littleR project.
+
+The Validator gives its notes as a stream of records, see
+Validator.records(). A record is a dict with the fields:
+    * severity (str): "problem" or "note".
+    * file (str): The file the note is about, relative to the working
+      directory. None for a note about the standard.
+    * index (str): The requirement the note is about. None for a note
+      about the standard or a file.
+    * rule (str): The tag of the check that made the note, or None.
+    * message (str): The note.
+
+The writers write each record to the stream as it is given, so a report is
+never held in memory. Three formats are available:
+    * text: the validation_report.txt layout, for people.
+    * jsonl: one JSON object per line, for scripts.
+    * junit: JUnit XML, one test case per note, for CI servers.
+"""
+
+import json
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+TEXT = "text"
+JSONL = "jsonl"
+JUNIT = "junit"
+FORMATS = [TEXT, JSONL, JUNIT]
+
+# the file name of each format in the report folder
+FILE_NAMES = {
+    TEXT: "validation_report.txt",
+    JSONL: "validation_report.jsonl",
+    JUNIT: "validation_report.xml",
+}
+
+PROBLEM = "problem"
+NOTE = "note"
+
+# the characters XML 1.0 does not allow, escaping does not remove them
+_NOT_XML = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def valid_format(fmt):
+    """Check if the report format is known.
+
+    Args:
+        fmt (str): The name of the format.
+
+    Returns:
+        bool: True if the format is known, False otherwise.
+    """
+    return isinstance(fmt, str) and fmt in FORMATS
+
+
+def report_writer(fmt, stream, problem_count, note_count):
+    """Create the writer for a format.
+
+    Args:
+        fmt (str): One of FORMATS.
+        stream (file): The text stream to write to.
+        problem_count (int): The number of problems in the report.
+        note_count (int): The number of notes in the report.
+
+    Returns:
+        TextReport|JsonLinesReport|JUnitReport: The writer, call write() for
+            each record then close().
+
+    Raises:
+        ValueError: If the format is not known.
+    """
+    if fmt == TEXT:
+        return TextReport(stream, problem_count)
+    if fmt == JSONL:
+        return JsonLinesReport(stream)
+    if fmt == JUNIT:
+        return JUnitReport(stream, problem_count, note_count)
+    raise ValueError(f"fmt must be one of {FORMATS}")
+
+
+class TextReport:
+    """The TextReport class writes the plain text validation report.
+
+    The notes about the standard come first, then the notes of each file
+    followed by the notes of each requirement in it. The records must be in
+    that order, as Validator.records() gives them. Trailing white space is
+    not written, so the report is the same as Validator.report().
+
+    Attributes:
+        _stream (file): The text stream to write to.
+        _pending (str): White space held back until more text is written.
+        _general (bool): True if a note about the standard was written.
+        _file (str): The file being written, None before the first file.
+        _file_done (bool): True once the notes about the file are written.
+        _index (str): The index being written, None if there is none.
+    """
+
+    def __init__(self, stream, problem_count):
+        """Create a new TextReport object and write the header.
+
+        Args:
+            stream (file): The text stream to write to.
+            problem_count (int): The number of problems in the report.
+        """
+        self._stream = stream
+        self._pending = ""
+        self._general = False
+        self._file = None
+        self._file_done = False
+        self._index = None
+        self._write(f"Validation Report\nProblems: {problem_count}\n\n")
+
+    def write(self, record):
+        """Write a record.
+
+        Args:
+            record (dict): The note, see the module docstring.
+        """
+        file, index = record["file"], record["index"]
+        if file is None:
+            self._general = True
+            self._write(record["message"] + "\n")
+            return
+
+        if file != self._file:
+            if self._file is None and self._general:
+                self._write("\n")
+            self._end_file()
+            self._write(f"File: {file}\n")
+            self._file = file
+
+        if index is not None:
+            if not self._file_done:
+                self._write("\n")
+                self._file_done = True
+            if index != self._index:
+                self._end_index()
+                self._write(f"\tIndex: {index}\n")
+                self._index = index
+
+        self._write(f"\t\t{record['message']}\n")
+
+    def close(self):
+        """Finish the report, the trailing white space is not written."""
+        self._pending = ""
+
+    def _end_index(self):
+        # a blank line after the notes of a requirement
+        if self._index is not None:
+            self._write("\n")
+            self._index = None
+
+    def _end_file(self):
+        # a blank line after the notes about a file, then its requirements
+        if self._file is not None and not self._file_done:
+            self._write("\n")
+        self._end_index()
+        self._file_done = False
+
+    def _write(self, text):
+        # hold back trailing white space, it is only written before more text
+        stripped = text.rstrip()
+        if stripped == "":
+            self._pending += text
+            return
+        self._stream.write(self._pending + stripped)
+        self._pending = text[len(stripped) :]
+
+
+class JsonLinesReport:
+    """The JsonLinesReport class writes one JSON object per note.
+
+    Attributes:
+        _stream (file): The text stream to write to.
+    """
+
+    def __init__(self, stream):
+        """Create a new JsonLinesReport object.
+
+        Args:
+            stream (file): The text stream to write to.
+        """
+        self._stream = stream
+
+    def write(self, record):
+        """Write a record as a line of JSON.
+
+        Args:
+            record (dict): The note, see the module docstring.
+        """
+        self._stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        """Finish the report, there is nothing left to write."""
+
+
+class JUnitReport:
+    """The JUnitReport class writes the notes as JUnit XML.
+
+    Each note is a test case, its class name is the file, or "standard",
+    and its name the index and rule. A problem is a failed test case.
+
+    Attributes:
+        _stream (file): The text stream to write to.
+    """
+
+    def __init__(self, stream, problem_count, note_count):
+        """Create a new JUnitReport object and write the opening tags.
+
+        Args:
+            stream (file): The text stream to write to.
+            problem_count (int): The number of problems, the failures.
+            note_count (int): The number of notes, the test cases.
+        """
+        self._stream = stream
+        self._stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        counts = f'tests="{note_count}" failures="{problem_count}" errors="0"'
+        self._stream.write(f'<testsuites name="littleR" {counts}>\n')
+        self._stream.write(f'  <testsuite name="validation" {counts}>\n')
+
+    def write(self, record):
+        """Write a record as a test case.
+
+        Args:
+            record (dict): The note, see the module docstring.
+        """
+        classname = record["file"] if record["file"] is not None else "standard"
+        name = " ".join(n for n in [record["index"], record["rule"]] if n is not None)
+        if name == "":
+            name = "note"
+        classname = _NOT_XML.sub("", classname)
+        name = _NOT_XML.sub("", name)
+        message = _NOT_XML.sub("", record["message"])
+
+        self._stream.write(
+            f"    <testcase classname={quoteattr(classname)} name={quoteattr(name)}>"
+        )
+        if record["severity"] == PROBLEM:
+            self._stream.write(
+                f"<failure message={quoteattr(message)}>{escape(message)}</failure>"
+            )
+        else:
+            self._stream.write(f"<system-out>{escape(message)}</system-out>")
+        self._stream.write("</testcase>\n")
+
+    def close(self):
+        """Write the closing tags."""
+        self._stream.write("  </testsuite>\n</testsuites>\n")
@@ -1,8 +1,17 @@
 """Requirement class for the littleR project."""
 
 import os
+import sys
 import ruamel.yaml
 
+from littleR import loader as yaml_loader
+from littleR.emitter import dump_requirement
+
+# shared by every requirement without labels or relationships, a requirement
+# gets its own set on the first change
+_EMPTY_SET = frozenset()
+_NO_LINKS = ()
+
 
 class Requirement:  # pylint: disable=too-many-instance-attributes
     """Requirement class describing a requirement.
@@ -30,11 +39,42 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         parent_idx (set<str>): the indexes of the parent requirements
         child_idx (set<str>): the indexes of the child requirements
         related_idx (set<str>): the indexes of the related requirements
-        parent (list<Requirement>): the parent requirements
-        child (list<Requirement>): the child requirements
-        related (list<Requirement>): the related requirements
+        parent (tuple<Requirement>): the parent requirements
+        child (tuple<Requirement>): the child requirements
+        related (tuple<Requirement>): the related requirements
+        _source (tuple): where the text fields are loaded from, see
+            set_source(). None once the text fields are loaded.
+        _owner (Standard): told about changes that must be written, see
+            set_owner().
+
+    A standard holds many requirements, so they are kept small. The fields
+    are slots, the short strings are interned, an empty label or index
+    field is a shared frozenset, and the parent, child and related fields
+    are tuples. Change the labels and relationships with the methods, or
+    by assigning the field, not by changing the container in place.
     """
 
+    __slots__ = (
+        "_path",
+        "enabled",
+        "_source",
+        "index",
+        "type",
+        "_title",
+        "_requirement",
+        "_description",
+        "_assumptions",
+        "component",
+        "_label",
+        "_parent_idx",
+        "_child_idx",
+        "_related_idx",
+        "_parent",
+        "_child",
+        "_related",
+        "_owner",
+    )
+
     def __init__(self):
         """Create a new Requirement object."""
         # set default values for all fields
@@ -42,25 +82,253 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
 
         self.enabled = True
 
+        # text fields are loaded from the file on first use, see set_source()
+        self._source = None
+
+        # the standard holding the requirement, see set_owner()
+        self._owner = None
+
         self.index = ""
         self.type = ""
-        self.title = ""
-        self.requirement = ""
-        self.description = ""
-        self.assumptions = ""
+        self._title = ""
+        self._requirement = ""
+        self._description = ""
+        self._assumptions = ""
 
         self.component = ""
-        self.label = set()
+        self._label = _EMPTY_SET
 
         # lists of indexes
-        self.parent_idx = set()
-        self.child_idx = set()
-        self.related_idx = set()
+        self._parent_idx = _EMPTY_SET
+        self._child_idx = _EMPTY_SET
+        self._related_idx = _EMPTY_SET
 
         # lists of requirements, linked later
-        self.parent = []
-        self.child = []
-        self.related = []
+        self._parent = _NO_LINKS
+        self._child = _NO_LINKS
+        self._related = _NO_LINKS
+
+    @property
+    def label(self):
+        """set<str>: the labels of the requirement."""
+        return self._label
+
+    @label.setter
+    def label(self, value):
+        value = _intern_set(value)
+        if value != self._label:
+            self._changing()
+            self._label = value
+            self._changed()
+
+    @property
+    def parent_idx(self):
+        """set<str>: the indexes of the parent requirements."""
+        return self._parent_idx
+
+    @parent_idx.setter
+    def parent_idx(self, value):
+        value = _intern_set(value)
+        if value != self._parent_idx:
+            self._changing()
+            self._parent_idx = value
+            self._changed()
+
+    @property
+    def child_idx(self):
+        """set<str>: the indexes of the child requirements."""
+        return self._child_idx
+
+    @child_idx.setter
+    def child_idx(self, value):
+        value = _intern_set(value)
+        if value != self._child_idx:
+            self._changing()
+            self._child_idx = value
+            self._changed()
+
+    @property
+    def related_idx(self):
+        """set<str>: the indexes of the related requirements."""
+        return self._related_idx
+
+    @related_idx.setter
+    def related_idx(self, value):
+        value = _intern_set(value)
+        if value != self._related_idx:
+            self._changing()
+            self._related_idx = value
+            self._changed()
+
+    @property
+    def parent(self):
+        """tuple<Requirement>: the parent requirements."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, value):
+        self._changing()
+        self._parent = tuple(value) if len(value) > 0 else _NO_LINKS
+        self._linked()
+
+    @property
+    def child(self):
+        """tuple<Requirement>: the child requirements."""
+        return self._child
+
+    @child.setter
+    def child(self, value):
+        self._changing()
+        self._child = tuple(value) if len(value) > 0 else _NO_LINKS
+        self._linked()
+
+    @property
+    def related(self):
+        """tuple<Requirement>: the related requirements."""
+        return self._related
+
+    @related.setter
+    def related(self, value):
+        self._changing()
+        self._related = tuple(value) if len(value) > 0 else _NO_LINKS
+        self._linked()
+
+    @property
+    def title(self):
+        """str: the title of the requirement, loaded on first use."""
+        self._load_source()
+        return self._title
+
+    @title.setter
+    def title(self, value):
+        self._load_source()
+        if value != self._title:
+            self._changing()
+            self._title = value
+            self._changed()
+
+    @property
+    def requirement(self):
+        """str: the requirement itself, loaded on first use."""
+        self._load_source()
+        return self._requirement
+
+    @requirement.setter
+    def requirement(self, value):
+        self._load_source()
+        if value != self._requirement:
+            self._changing()
+            self._requirement = value
+            self._changed()
+
+    @property
+    def description(self):
+        """str: the description of the requirement, loaded on first use."""
+        self._load_source()
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        self._load_source()
+        if value != self._description:
+            self._changing()
+            self._description = value
+            self._changed()
+
+    @property
+    def assumptions(self):
+        """str: the assumptions of the requirement, loaded on first use."""
+        self._load_source()
+        return self._assumptions
+
+    @assumptions.setter
+    def assumptions(self, value):
+        self._load_source()
+        if value != self._assumptions:
+            self._changing()
+            self._assumptions = value
+            self._changed()
+
+    def set_source(
+        self, file_path, key, span, loader=yaml_loader.ROUND_TRIP, stat=None
+    ):  # pylint: disable=too-many-arguments
+        """Sets where the text fields are loaded from.
+
+        The title, requirement, description and assumptions are not read
+        until one of them is first used. They are then parsed from the
+        block of the file that holds the requirement.
+
+        Args:
+            file_path (str): the file the requirement is read from.
+            key (str): the key of the requirement in the file.
+            span (tuple): the (start, end) byte offsets of the block.
+            loader (str): the loader used to parse the block.
+            stat (tuple): the (mtime_ns, size) of the file when it was indexed.
+
+        Raises:
+            TypeError: if the file_path or key is not a string
+            ValueError: if the span is not a pair of offsets
+        """
+        # verify the input
+        if not isinstance(file_path, str) or not isinstance(key, str):
+            raise TypeError("file_path and key must be strings.")
+        if not isinstance(span, (tuple, list)) or len(span) != 2 or span[0] > span[1]:
+            raise ValueError("span must be a (start, end) pair.")
+        self._source = (file_path, key, tuple(span), loader, stat)
+
+    def is_loaded(self):
+        """Checks if the text fields are loaded.
+
+        Returns:
+            bool: True if the text fields are loaded, False otherwise
+        """
+        return self._source is None
+
+    def source_path(self):
+        """Returns the file the text fields will be loaded from.
+
+        Returns:
+            str: the path of the file
+            None: if the text fields are loaded
+        """
+        if self._source is None:
+            return None
+        return self._source[0]
+
+    def load(self, file_data=None):
+        """Loads the text fields now if they are not loaded.
+
+        Args:
+            file_data (dict): the data of the whole file the requirement is
+                read from, when it was already parsed. Optional.
+        """
+        if self._source is None:
+            return
+        if isinstance(file_data, dict):
+            key = self._source[1]
+            self._source = None
+            self._set_text(file_data.get(key))
+        else:
+            self._load_source()
+
+    def _load_source(self):
+        if self._source is None:
+            return
+        file_path, key, span, loader, stat = self._source
+        self._source = None
+        self._set_text(yaml_loader.load_block(file_path, key, span, loader, stat))
+
+    def _set_text(self, req_data):
+        if not isinstance(req_data, dict):
+            return
+        if "title" in req_data:
+            self._title = req_data["title"]
+        if "requirement" in req_data:
+            self._requirement = req_data["requirement"]
+        if "description" in req_data:
+            self._description = req_data["description"]
+        if "assumptions" in req_data:
+            self._assumptions = req_data["assumptions"]
 
     def path(self):
         """Returns the path where the requirement is defined.
@@ -99,7 +367,68 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
                     file.write("")
             except Exception as e:
                 raise ValueError("file_path could not be created.") from e
+        old_path = self._path
+        if file_path != old_path:
+            self._changing()
         self._path = file_path
+        if file_path != old_path:
+            self._changed(old_path)
+
+    def set_owner(self, owner):
+        """Sets the standard that is told when the requirement changes.
+
+        The owner's journal() is called with the requirement before a change,
+        and its mark_dirty() with the requirement, and the old path when the
+        requirement moved, after a change that must be written. Its
+        links_changed() is called after the parent, child or related
+        requirements change.
+        This is done by the methods that change the requirement and by
+        assigning the text, label and index fields. Assigning index, type,
+        component or enabled directly is not tracked.
+
+        Args:
+            owner (Standard): the owner, or None to stop telling anyone.
+        """
+        self._owner = owner
+
+    def _changing(self):
+        # before a change, so the owner can keep the state to roll back to
+        if self._owner is not None:
+            self._owner.journal(self)
+
+    def _changed(self, old_path=None):
+        if self._owner is not None:
+            self._owner.mark_dirty(self, old_path)
+
+    def _linked(self):
+        # after the links changed, so the owner builds its graph again
+        if self._owner is not None:
+            self._owner.links_changed()
+
+    def state(self):
+        """Returns a copy of the fields of the requirement.
+
+        Returns:
+            tuple: the fields, to be given to restore().
+        """
+        values = []
+        for name in Requirement.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, (set, list)):
+                value = value.copy()
+            values.append(value)
+        return tuple(values)
+
+    def restore(self, state):
+        """Sets the fields of the requirement back to a copy from state().
+
+        The owner is not told, the caller restores its own records.
+
+        Args:
+            state (tuple): the fields from state().
+        """
+        for name, value in zip(Requirement.__slots__, state):
+            setattr(self, name, value)
 
     def add_label(self, label):
         """Adds a label to the requirement.
@@ -120,8 +449,10 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         if len(label) == 0:
             return
         label_lower = label.lower()
-        if label_lower not in self.label:
-            self.label.add(label_lower)
+        if label_lower not in self._label:
+            self._changing()
+            self._label = _added(self._label, label_lower)
+            self._changed()
 
     def labels(self):
         """Returns the sorted labels of the requirement.
@@ -144,8 +475,10 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         if not isinstance(label, str):
             return
         label_lower = label.lower()
-        if label_lower in self.label:
-            self.label.remove(label_lower)
+        if label_lower in self._label:
+            self._changing()
+            self._label = _discarded(self._label, label_lower)
+            self._changed()
 
     def has_relationship(self, index):
         """Checks if the requirement has a relationship with another requirement.
@@ -204,12 +537,14 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
             return []
         
         # add the index if you can't find it
+        self._changing()
         if relation == "parent":
-            self.parent_idx.add(index)
+            self._parent_idx = _added(self._parent_idx, index)
         if relation == "child":
-            self.child_idx.add(index)
+            self._child_idx = _added(self._child_idx, index)
         if relation == "related":
-            self.related_idx.add(index)
+            self._related_idx = _added(self._related_idx, index)
+        self._changed()
 
         return [index, self.index]
 
@@ -231,24 +566,22 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
             return []
 
         #remove the index if you can find it
-        self.parent_idx.discard(index)
-        self.child_idx.discard(index)
-        self.related_idx.discard(index)
+        indexes = [self._parent_idx, self._child_idx, self._related_idx]
+        if any(index in idx for idx in indexes):
+            self._changing()
+            self._parent_idx = _discarded(self._parent_idx, index)
+            self._child_idx = _discarded(self._child_idx, index)
+            self._related_idx = _discarded(self._related_idx, index)
+            self._changed()
 
         #find related requirements, save and remove
         related = []
-        for req in self.parent:
-            if req.index == index:
-                related.append(req)
-                self.parent.remove(req)
-        for req in self.child:
-            if req.index == index:
-                related.append(req)
-                self.child.remove(req)
-        for req in self.related:
-            if req.index == index:
-                related.append(req)
-                self.related.remove(req)
+        for relation in ["parent", "child", "related"]:
+            links = getattr(self, relation)
+            found = [req for req in links if req.index == index]
+            if len(found) > 0:
+                related.extend(found)
+                setattr(self, relation, [req for req in links if req.index != index])
         
         #remove ourselves from the related requirements
         for req in related:
@@ -259,6 +592,49 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         
         return []
         
+    def add_link(self, relation, requirement, check=True):
+        """Links another requirement as a parent, child, or related requirement.
+
+        Only the requirement objects are linked, see add_relationship()
+        for the indexes. A requirement already linked is not added again.
+
+        Args:
+            relation (str): "parent", "child", or "related"
+            requirement (Requirement): the requirement to link
+            check (bool): if False, the caller knows the requirement is not
+                linked yet and the links are not searched.
+
+        Raises:
+            ValueError: if the relation is not known
+            TypeError: if the requirement is not a Requirement
+        """
+        # verify the input
+        if relation not in ["parent", "child", "related"]:
+            raise ValueError("relation must be parent, child, or related.")
+        if not isinstance(requirement, Requirement):
+            raise TypeError("requirement must be a Requirement.")
+
+        name = "_" + relation
+        links = getattr(self, name)
+        if check and requirement in links:
+            return
+        self._changing()
+        setattr(self, name, links + (requirement,))
+        self._linked()
+
+    def unlink(self, removed_ids):
+        """Removes the links to requirements that are no longer in the standard.
+
+        Args:
+            removed_ids (set<int>): the id() of the requirements to unlink
+        """
+        for relation in ["parent", "child", "related"]:
+            links = getattr(self, relation)
+            if any(id(req) in removed_ids for req in links):
+                kept = [req for req in links if id(req) not in removed_ids]
+                setattr(self, relation, kept)
+
+
     def int_index(self):
         """Returns the index as an integer value.
 
@@ -287,10 +663,12 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
     def to_yaml(self):
         """Converts the requirement to a .yaml string.
 
+        The text is written by the emitter module, ruamel is only used for
+        the values the emitter can not write the same way.
+
         Returns:
             str: the requirement converted to a .yaml string
         """
-        yaml = ruamel.yaml.YAML(typ=["rt", "string"])
         content = {}
 
         content["enabled"] = self.enabled
@@ -312,6 +690,11 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         if len(self.related_idx) > 0:
             content["related_idx"] = sorted(list(self.related_idx))
 
+        text = dump_requirement(self.index, content)
+        if text is not None:
+            return text
+
+        yaml = ruamel.yaml.YAML(typ=["rt", "string"])
         data = {self.index: content}
 
         # the method exists even though pylint cannot see it.
@@ -358,6 +741,11 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         if not isinstance(req_data, dict):
             raise ValueError("req_data must be a dictionary")
 
+        # what is written, to see if anything changed
+        self._changing()
+        old_path = self._path
+        before = self._written_fields()
+
         # update the requirement
         if "path" in req_data:
             path = req_data["path"]
@@ -373,7 +761,7 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
             type = req_data["type"]
             if isinstance(type, str):
                 type_lower = type.lower()
-                self.type = type_lower
+                self.type = sys.intern(type_lower)
 
         if "title" in req_data:
             title = req_data["title"]
@@ -398,8 +786,25 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         if "component" in req_data:
             component = req_data["component"]
             if isinstance(component, str):
-                self.component = component.lower()
-        
+                self.component = sys.intern(component.lower())
+
+        if self._path != old_path:
+            self._changed(old_path)
+        elif self._written_fields() != before:
+            self._changed()
+
+    def _written_fields(self):
+        # the fields update_from_dict() can change, bar the path
+        return (
+            self.enabled,
+            self.type,
+            self.title,
+            self.requirement,
+            self.description,
+            self.assumptions,
+            self.component,
+        )
+
     @staticmethod
     def factory(file_path, req_data=None):  # pylint: disable=too-many-branches
         """Creates a new Requirement object.
@@ -432,11 +837,11 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
 
         # index
         if "index" in req_data:
-            req.index = req_data["index"].lower()
+            req.index = sys.intern(req_data["index"].lower())
 
         # type
         if "type" in req_data:
-            req.type = req_data["type"].lower()
+            req.type = sys.intern(req_data["type"].lower())
 
         # title
         if "title" in req_data:
@@ -456,7 +861,7 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
 
         # component
         if "component" in req_data:
-            req.component = req_data["component"].lower()
+            req.component = sys.intern(req_data["component"].lower())
 
         # label
         if "label" in req_data:
@@ -467,19 +872,22 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         if "parent_idx" in req_data:
             for parent_idx in req_data["parent_idx"]:
                 if not req.has_relationship(parent_idx):
-                    req.parent_idx.add(parent_idx)
+                    added = _added(req.parent_idx, parent_idx)
+                    req._parent_idx = added  # pylint: disable=protected-access
 
         # child_idx
         if "child_idx" in req_data:
             for child_idx in req_data["child_idx"]:
                 if not req.has_relationship(child_idx):
-                    req.child_idx.add(child_idx)
+                    added = _added(req.child_idx, child_idx)
+                    req._child_idx = added  # pylint: disable=protected-access
 
         # related_idx
         if "related_idx" in req_data:
             for related_idx in req_data["related_idx"]:
                 if not req.has_relationship(related_idx):
-                    req.related_idx.add(related_idx)
+                    added = _added(req.related_idx, related_idx)
+                    req._related_idx = added  # pylint: disable=protected-access
 
         # return the new requirement
         return req
@@ -556,3 +964,34 @@ class Requirement:  # pylint: disable=too-many-instance-attributes
         if not isinstance(other, Requirement):
             return False
         return self.index == other.index and self._path == other._path
+
+
+def _intern(value):
+    # the same label or index is shared by many requirements
+    if type(value) is str:  # pylint: disable=unidiomatic-typecheck
+        return sys.intern(value)
+    return value
+
+
+def _intern_set(values):
+    if len(values) == 0:
+        return _EMPTY_SET
+    return {_intern(value) for value in values}
+
+
+def _added(values, value):
+    # the container with value added, the shared empty set is replaced
+    if values is _EMPTY_SET:
+        values = set()
+    values.add(_intern(value))
+    return values
+
+
+def _discarded(values, value):
+    # the container with value removed, an empty set is shared again
+    if value not in values:
+        return values
+    values.discard(value)
+    if len(values) == 0:
+        return _EMPTY_SET
+    return values
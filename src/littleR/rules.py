@@ -0,0 +1,228 @@
+"""Validation rules for the littleR project.
+
+A rule is a function that checks the standard and returns notes. Rules are
+kept in a registry and run by Standard.check(), not while the standard is
+read, so adding a rule does not slow down reading. Two phases are run:
+    * requirement: the function is given the data of one requirement,
+      Requirement.to_dict(), and returns a message, a list of messages, or
+      None. These rules do not see the links, so they can be run in chunks
+      across a process pool. Use a module level function so it can be sent
+      to the pool.
+    * graph: the function is given the linked Standard and returns a list
+      of (requirement, message) tuples. These rules are run once, in order.
+
+Example:
+    @rules.register("title_length")
+    def title_length(data):
+        if len(data["title"]) > 80:
+            return "Title is longer than 80 characters."
+        return None
+"""
+
+import time
+
+REQUIREMENT = "requirement"
+GRAPH = "graph"
+PHASES = [REQUIREMENT, GRAPH]
+
+# the longest label that fits in the label column of the views,
+# Requirement.add_label() accepts up to 40 characters
+MAX_LABEL = 30
+
+_registry = {}
+
+
+class Rule:
+    """The Rule class is a named check in the registry.
+
+    Attributes:
+        name (str): The name of the rule, used as the tag of its notes.
+        fn (callable): The function that checks, see the module docstring.
+        phase (str): REQUIREMENT or GRAPH.
+        problem (bool): True if the notes of the rule are problems.
+    """
+
+    def __init__(self, name, fn, phase=REQUIREMENT, problem=True):
+        """Create a new Rule object.
+
+        Args:
+            name (str): The name of the rule.
+            fn (callable): The function that checks.
+            phase (str): REQUIREMENT or GRAPH.
+            problem (bool): True if the notes of the rule are problems.
+
+        Raises:
+            TypeError: If the name is not a string, fn is not callable or
+                problem is not a boolean.
+            ValueError: If the name is empty or the phase is not known.
+        """
+        # verify the input
+        if not isinstance(name, str):
+            raise TypeError("name must be a string")
+        if name == "":
+            raise ValueError("name must not be empty")
+        if not callable(fn):
+            raise TypeError("fn must be callable")
+        if phase not in PHASES:
+            raise ValueError(f"phase must be one of {PHASES}")
+        if not isinstance(problem, bool):
+            raise TypeError("problem must be a boolean")
+
+        self.name = name
+        self.fn = fn
+        self.phase = phase
+        self.problem = problem
+
+    def check(self, data):
+        """Check the data of one requirement.
+
+        Args:
+            data (dict): The requirement, see Requirement.to_dict().
+
+        Returns:
+            list<str>: The messages, empty if the requirement passes.
+        """
+        result = self.fn(data)
+        if result is None:
+            return []
+        if isinstance(result, str):
+            return [result]
+        return list(result)
+
+    def __str__(self):
+        return f"Rule({self.name}, {self.phase})"
+
+    def __repr__(self):
+        return f"Rule({self.name})"
+
+
+def register(name, phase=REQUIREMENT, problem=True):
+    """Add the decorated function to the registry as a rule.
+
+    A rule registered again with the same name replaces the old one.
+
+    Args:
+        name (str): The name of the rule.
+        phase (str): REQUIREMENT or GRAPH.
+        problem (bool): True if the notes of the rule are problems.
+
+    Returns:
+        callable: The decorator, it returns the function unchanged.
+    """
+
+    def decorator(fn):
+        add_rule(Rule(name, fn, phase, problem))
+        return fn
+
+    return decorator
+
+
+def add_rule(rule):
+    """Add a rule to the registry.
+
+    Args:
+        rule (Rule): The rule to add. One with the same name is replaced.
+
+    Raises:
+        TypeError: If the rule is not a Rule.
+    """
+    if not isinstance(rule, Rule):
+        raise TypeError("rule must be a Rule")
+    _registry[rule.name] = rule
+
+
+def unregister(name):
+    """Remove a rule from the registry.
+
+    Args:
+        name (str): The name of the rule.
+
+    Returns:
+        bool: True if the rule was removed, False if it was not registered.
+    """
+    return _registry.pop(name, None) is not None
+
+
+def get_rules(names=None, phase=None):
+    """Get the registered rules, in the order they were registered.
+
+    Args:
+        names (list<str>): Only the rules with these names. None for all.
+        phase (str): Only the rules of this phase. None for all.
+
+    Returns:
+        list<Rule>: The rules.
+
+    Raises:
+        ValueError: If a name is not registered.
+    """
+    if names is None:
+        rules = list(_registry.values())
+    else:
+        for name in names:
+            if name not in _registry:
+                raise ValueError(f"Rule not found: {name}.")
+        rules = [rule for rule in _registry.values() if rule.name in names]
+    if phase is not None:
+        rules = [rule for rule in rules if rule.phase == phase]
+    return rules
+
+
+def check_chunk(rules, chunk):
+    """Run requirement rules over a chunk of requirements.
+
+    This is the work done by each process of the pool.
+
+    Args:
+        rules (list<Rule>): The requirement rules to run.
+        chunk (list<dict>): The requirements, see Requirement.to_dict().
+
+    Returns:
+        tuple: The (index, rule name, message) of each note, and the seconds
+            spent in each rule by name.
+    """
+    notes = []
+    timings = {}
+    for rule in rules:
+        start = time.perf_counter()
+        for data in chunk:
+            for message in rule.check(data):
+                notes.append((data["index"], rule.name, message))
+        timings[rule.name] = time.perf_counter() - start
+    return notes, timings
+
+
+# rules
+
+
+@register("shall", problem=False)
+def shall(data):
+    """The requirement text should say what shall be done."""
+    # an empty field in the file is read as None
+    text = data.get("requirement") or ""
+    if not isinstance(text, str):
+        text = ""
+    if text.strip() != "" and "shall" not in text.lower():
+        return "Requirement text does not use 'shall'."
+    return None
+
+
+@register("label_length")
+def label_length(data):
+    """Labels must fit in the label column of the views."""
+    labels = data.get("label") or []
+    return [
+        f"Label is longer than {MAX_LABEL} characters: {label}."
+        for label in sorted(label for label in labels if isinstance(label, str))
+        if len(label) > MAX_LABEL
+    ]
+
+
+@register("customer_children", phase=GRAPH)
+def customer_children(standard):
+    """A customer requirement must be met by at least one child."""
+    return [
+        (req, "Customer requirement has no children.")
+        for req in standard.requirements_iter()
+        if req.is_customer() and len(req.child) == 0
+    ]
@@ -0,0 +1,337 @@
+"""Snapshot class for the littleR project."""
+
+import os
+import hashlib
+import json
+
+from ruamel.yaml.scalarstring import FoldedScalarString, LiteralScalarString
+
+from littleR.loader import ROUND_TRIP
+
+
+class Snapshot:
+    """The Snapshot class caches parsed folios on disk.
+
+    Parsing the .yaml files is most of the time spent reading a standard.
+    The snapshot stores the result of read_folio() for each folio so an
+    unchanged file does not need to be parsed again.
+
+    Each entry is keyed by the path, the modification time (ns), the size
+    and a hash of the contents. A file with a new time or size is read and
+    hashed, it is only parsed again if the contents changed. The loader, and
+    if the folio was only indexed for a lazy read, is stored with the entry
+    since they do not return the same data.
+
+    The snapshot is stored as JSON, so loading it never runs code from the
+    file. A tuple, or a block scalar of the round trip loader, is stored as
+    a tagged object so it is read back the same. Contents with any other
+    type, as a round trip float keeps its format, are not stored.
+
+    Attributes:
+        _directory (str): The directory where the snapshot is stored.
+        _entries (dict): The entries indexed by the folio path.
+        _changed (bool): True if the entries need to be saved.
+    """
+
+    VERSION = 4
+    FILE_NAME = "standard.json"
+
+    def __init__(self, directory):
+        """Create a new Snapshot object.
+
+        Args:
+            directory (str): The directory where the snapshot is stored.
+                It is created when the snapshot is saved.
+
+        Raises:
+            TypeError: If the directory is not a string.
+        """
+        # verify the input
+        if not isinstance(directory, str):
+            raise TypeError("directory must be a string")
+
+        self._directory = directory
+        self._entries = {}
+        self._changed = False
+
+    def path(self):
+        """Return the path to the snapshot file.
+
+        Returns:
+            str: The path to the snapshot file.
+        """
+        return os.path.join(self._directory, Snapshot.FILE_NAME)
+
+    def load(self):
+        """Load the entries from disk.
+
+        A missing, unreadable, or old snapshot is treated as empty, and an
+        entry that is not as save() writes it is left out.
+
+        Returns:
+            Snapshot: The modified Snapshot object.
+        """
+        self._entries = {}
+        self._changed = False
+        try:
+            with open(self.path(), "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except Exception:
+            return self
+
+        if not isinstance(data, dict) or data.get("version") != Snapshot.VERSION:
+            return self
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return self
+        for path, entry in entries.items():
+            try:
+                self._entries[path] = _decode_entry(entry)
+            except ValueError:
+                self._changed = True
+        return self
+
+    def save(self):
+        """Save the entries to disk if they changed.
+
+        Returns:
+            bool: True if the snapshot is up to date on disk, False otherwise.
+        """
+        if not self._changed:
+            return True
+
+        entries = {
+            path: dict(entry, contents=_encode(entry["contents"]))
+            for path, entry in self._entries.items()
+        }
+        data = {"version": Snapshot.VERSION, "entries": entries}
+        temp_path = self.path() + ".tmp"
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+
+            # the cache never belongs in version control
+            ignore_path = os.path.join(self._directory, ".gitignore")
+            if not os.path.isfile(ignore_path):
+                with open(ignore_path, "w", encoding="utf-8") as file:
+                    file.write("*\n")
+
+            # replace the snapshot in one step so a reader never sees half of it
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, separators=(",", ":"))
+            os.replace(temp_path, self.path())
+        except Exception:
+            return False
+
+        self._changed = False
+        return True
+
+    def get(self, path, loader=ROUND_TRIP, lazy=False):
+        """Return the cached contents for a folio if the file is unchanged.
+
+        Args:
+            path (str): The path to the folio.
+            loader (str): The loader the contents were parsed with.
+            lazy (bool): True if the contents were read for a lazy read.
+
+        Returns:
+            dict: The result of read_folio() stored for the path.
+            None: If the path is not cached or the file changed.
+        """
+        entry = self._entries.get(path)
+        if entry is None or entry["loader"] != loader or entry["lazy"] != lazy:
+            return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        # the same time and size is an unchanged file
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["contents"]
+
+        # the file was touched, it is only changed if the contents are different
+        digest = Snapshot._hash_file(path)
+        if digest is None or digest != entry["hash"]:
+            return None
+
+        entry["mtime_ns"] = stat.st_mtime_ns
+        entry["size"] = stat.st_size
+        entry["contents"]["stat"] = (stat.st_mtime_ns, stat.st_size)
+        self._changed = True
+        return entry["contents"]
+
+    def put(self, path, contents, loader=ROUND_TRIP, lazy=False):
+        """Store the contents for a folio.
+
+        Contents that could not be read are not stored. If the file changed
+        since the contents were read, or they hold a type the snapshot does
+        not store, they are not stored either.
+
+        Args:
+            path (str): The path to the folio.
+            contents (dict): The result of read_folio() for the path.
+            loader (str): The loader the contents were parsed with.
+            lazy (bool): True if the contents were read for a lazy read.
+
+        Raises:
+            TypeError: If the path is not a string or contents is not a dictionary.
+        """
+        # verify the input
+        if not isinstance(path, str):
+            raise TypeError("path must be a string")
+        if not isinstance(contents, dict):
+            raise TypeError("contents must be a dictionary")
+
+        raw_contents = contents.get("raw_contents")
+        if raw_contents is None:
+            self.discard(path)
+            return
+        try:
+            _encode(contents)
+        except ValueError:
+            self.discard(path)
+            return
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.discard(path)
+            return
+
+        # make sure the file still holds what was parsed
+        digest = Snapshot._hash_text(raw_contents)
+        if digest != Snapshot._hash_file(path):
+            self.discard(path)
+            return
+
+        self._entries[path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": digest,
+            "loader": loader,
+            "lazy": lazy,
+            "contents": contents,
+        }
+        self._changed = True
+
+    def discard(self, path):
+        """Remove the entry for a folio.
+
+        Args:
+            path (str): The path to the folio.
+        """
+        if self._entries.pop(path, None) is not None:
+            self._changed = True
+
+    def prune(self, paths):
+        """Remove the entries for folios that are no longer read.
+
+        Args:
+            paths (list<str>): The paths to keep.
+        """
+        keep = set(paths)
+        for path in list(self._entries.keys()):
+            if path not in keep:
+                self.discard(path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    @staticmethod
+    def _hash_text(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _hash_file(path):
+        # hash the text the same way read_folio() reads it
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return Snapshot._hash_text(file.read())
+        except Exception:
+            return None
+
+    def __str__(self):
+        return f"Snapshot({len(self._entries)} folios)"
+
+    def __repr__(self):
+        return "Snapshot"
+
+
+# the fields of an entry and their types, the contents are checked apart
+_ENTRY_FIELDS = {"mtime_ns": int, "size": int, "hash": str, "loader": str, "lazy": bool}
+
+
+def _encode(value):
+    # the value as JSON data, tagged objects keep what JSON does not have
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    if type(value) is list:
+        return [_encode(item) for item in value]
+    if type(value) is tuple:
+        return {"$tuple": [_encode(item) for item in value]}
+    if type(value) is dict:
+        for key in value:
+            if type(key) is not str or key.startswith("$"):
+                raise ValueError(f"The key cannot be stored: {key!r}")
+        return {key: _encode(item) for key, item in value.items()}
+    if type(value) in (LiteralScalarString, FoldedScalarString):
+        if value.anchor.value is not None or getattr(value, "comment", None):
+            raise ValueError("A scalar with an anchor or comment is not stored.")
+        if type(value) is LiteralScalarString:
+            return {"$literal": str(value)}
+        return {"$folded": [str(value), list(getattr(value, "fold_pos", []))]}
+    raise ValueError(f"The type cannot be stored: {type(value).__name__}")
+
+
+def _decode(value):
+    # the value encode() was given, the tags are checked as they are read
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    if type(value) is list:
+        return [_decode(item) for item in value]
+    if type(value) is not dict:
+        raise ValueError("Not a snapshot value.")
+    if len(value) == 1:
+        tag, item = next(iter(value.items()))
+        if tag == "$tuple" and type(item) is list:
+            return tuple(_decode(i) for i in item)
+        if tag == "$literal" and type(item) is str:
+            return LiteralScalarString(item)
+        if tag == "$folded" and _is_folded(item):
+            folded = FoldedScalarString(item[0])
+            if len(item[1]) > 0:
+                folded.fold_pos = list(item[1])
+            return folded
+    if any(key.startswith("$") for key in value):
+        raise ValueError("Not a snapshot tag.")
+    return {key: _decode(item) for key, item in value.items()}
+
+
+def _is_folded(item):
+    # the text and the fold positions of a folded scalar
+    return (
+        type(item) is list
+        and len(item) == 2
+        and type(item[0]) is str
+        and type(item[1]) is list
+        and all(type(position) is int for position in item[1])
+    )
+
+
+def _decode_entry(entry):
+    # an entry as put() stores it, or ValueError
+    if type(entry) is not dict:
+        raise ValueError("Not a snapshot entry.")
+    for field, kind in _ENTRY_FIELDS.items():
+        if type(entry.get(field)) is not kind:
+            raise ValueError(f"The {field} of the entry is not valid.")
+    contents = _decode(entry.get("contents"))
+    if type(contents) is not dict:
+        raise ValueError("The contents of the entry are not valid.")
+    decoded = {field: entry[field] for field in _ENTRY_FIELDS}
+    decoded["contents"] = contents
+    return decoded
@@ -1,11 +1,29 @@
 """Standard class for the littleR project."""
 
 import os
+import time
+from functools import partial
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+from littleR import loader as yaml_loader
+from littleR import rules as validation_rules
 
 from littleR.validate import Validator
 from littleR.requirement import Requirement
-from littleR.folio import Folio
+from littleR.folio import Folio, read_folio, stat_file, sync_directories
 from littleR.configuration import Configuration
+from littleR.snapshot import Snapshot
+from littleR.graph import Graph
+from littleR.reach import Reachability, from_bits
+
+# the relation, its index field, the relation it makes in the other
+# requirement, and the name used in notes
+_LINKS = [
+    ("parent", "parent_idx", "child", "Parent"),
+    ("child", "child_idx", "parent", "Child"),
+    ("related", "related_idx", "related", "Related"),
+]
 
 
 class Standard:  # pylint: disable=too-many-instance-attributes
@@ -23,11 +41,64 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         _max_index (int): The maximum index of the requirements.
             The next requirement will be one higher than this.
         _folios (dict): A dictionary of folios indexed by their path.
+        _invalid_folios (dict): The (mtime_ns, size) of the files that were
+            not valid folios, indexed by their path. Used by refresh().
         _config (dict): The configuration for the standard.
         _validator (Validator): The validator object to use for validation.
         _project_path (str): The path to the project folder.
         _customer_path (str): The path to the customer folder.
         _test_directory (str): The path to the test directory.
+        _loader (str): The loader used to parse the folios, see littleR.loader.
+        _lazy (bool): True if the text of the requirements is loaded on first use.
+        _revision (int): Counts the changes to the requirements of the standard.
+        _graph (Graph): The links as compact arrays, see graph().
+        _graph_revision (tuple): The revisions the graph was built at.
+        _link_revision (int): Counts the changes to the links of the
+            requirements, see links_changed().
+        _dirty (set): The paths of the folios that changed since the last
+            write. None if every folio must be written, as after a read.
+        _changes (dict): The indices of the requirements that changed since
+            the last write, indexed by the path of their folio. Used by
+            write(patch=True).
+        _report_revision (int): The validator revision of the last report
+            written. None if no report was written.
+        _write_errors (list): The paths of the folios the last write failed to write.
+        _edited (set): The paths of the folios with edits made since they
+            were read or written. Unlike _changes, the links repaired by a
+            read are not edits, reading the file again repairs them again.
+        _conflicts (dict): The state on disk of each folio that changed on
+            disk while it had unsaved edits, by the path it is read from.
+        _batch (dict): The journal of the open batch(), None outside a batch.
+        _unchecked (dict): The requirements that changed since they were last
+            checked, indexed by their id(). See revalidate().
+        _rules (list<Rule>): The requirement rules run by the last check(),
+            run again by revalidate(). None if check() was not called.
+        _rule_timings (dict): The seconds spent in each rule by the last check().
+        _cycles_revision (tuple): The graph revision the cycles were noted at.
+        _edit_revision (int): Counts the edits told to mark_dirty().
+        _components (dict): The component of each requirement, see components().
+        _components_revision (tuple): The revisions the components were found at.
+        _component_tops (dict): The top of each component, see component_top().
+        _component_tops_revision (tuple): The revisions the tops were found at.
+        _reach (Reachability): The ancestors and descendants, see reachability().
+        _touched (dict): The requirements changed since the reachability was
+            last used, indexed by their id().
+        _tree_fields (dict): The fields a tree depends on for each requirement,
+            indexed by their id(). None until tree_revision() is used.
+        _tree_edits (int): Counts the edits that changed those fields.
+        _tree_cache (dict): The node lists kept by Tree.nodes().
+        _roots (dict): The requirements without parents, indexed by their
+            id(). None until tree_top() is used.
+        _customer_children (dict): The (requirement, customer names) of the
+            requirements whose parents are all customer requirements.
+        _roots_touched (dict): The requirements changed since tree_top() was
+            last used, indexed by their id().
+        _order (dict): The place of each requirement in _requirements,
+            indexed by their id(), kept once tree_top() is used.
+        _order_next (int): The place given to the next requirement added.
+        _customer_names (dict): The customer name of each folio by path.
+        _req_revisions (dict): The number of changes to each requirement
+            changed since it was added, indexed by their id().
     """
 
     def __init__(self, name="Working", test_directory=None):
@@ -63,8 +134,59 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         self._new_requirements = {}
         self._max_index = 0
 
+        # the graph is built again when the requirements or links change
+        self._revision = 0
+        self._link_revision = 0
+        self._graph = None
+        self._graph_revision = None
+
+        # the folios to write, and the notes in the last report written
+        self._dirty = None
+        self._changes = {}
+        self._report_revision = None
+        self._write_errors = []
+        self._edited = set()
+        self._conflicts = {}
+
+        # the journal of the open batch
+        self._batch = None
+
+        # the requirements to check again, see revalidate()
+        self._unchecked = {}
+        self._rules = None
+        self._rule_timings = {}
+        self._cycles_revision = None
+
+        # the component of each requirement, found again after a change
+        self._edit_revision = 0
+        self._components = None
+        self._components_revision = None
+        self._component_tops = None
+        self._component_tops_revision = None
+
+        # the ancestors and descendants, kept across changes to the links
+        self._reach = None
+        self._touched = {}
+
+        # the trees, kept until the links or the fields they use change
+        self._tree_fields = None
+        self._tree_edits = 0
+        self._tree_cache = {}
+
+        # the top of the trees, kept up to date as requirements change
+        self._roots = None
+        self._customer_children = {}
+        self._roots_touched = {}
+        self._order = {}
+        self._order_next = 0
+        self._customer_names = {}
+
+        # the changes to each requirement, see requirement_revision()
+        self._req_revisions = {}
+
         # folios stored by path
         self._folios = {}
+        self._invalid_folios = {}
 
         # the config for the standard
         self.config = None
@@ -78,12 +200,23 @@ class Standard:  # pylint: disable=too-many-instance-attributes
             validator_path = self._test_directory
         self._validator = Validator(validator_path)
 
+        # the loader used to parse the folios
+        self._loader = yaml_loader.ROUND_TRIP
+        self._lazy = False
+
         # project and customer paths
         self._project_path = ""
         self._customer_path = ""
         self._reports_path = ""
 
-    def read(self, directory=None):
+    def read(
+        self,
+        directory=None,
+        jobs=1,
+        cache=False,
+        loader=yaml_loader.ROUND_TRIP,
+        lazy=False,
+    ):  # pylint: disable=too-many-arguments
         """Read the requirements from the directory.
 
         This method reads the requirements from the directory,
@@ -92,12 +225,30 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         Args:
             directory (str): The directory to read the requirements from.
                 If None, the current working directory is used.
+            jobs (int): The number of processes used to parse the folios.
+                With 1 the folios are parsed in this process.
+            cache (bool): If True, parsed folios are kept in a snapshot under
+                reports/.cache and only changed folios are parsed again.
+            loader (str): The loader used to parse the folios, see littleR.loader.
+                A standard read with the fast loader is read only and
+                cannot be written.
+            lazy (bool): If True, the folios are only indexed. Each requirement
+                is created with its type, component, labels and relationships
+                so the standard can be linked, the title, requirement,
+                description and assumptions are read from the file when they
+                are first used. Folios without the simple layout that littleR
+                writes are parsed as usual.
 
         Returns:
             Standard: The modified Standard object.
 
         Raises:
             ValueError: If the directory is not a valid directory.
+            TypeError: If jobs is not an integer.
+            ValueError: If jobs is less than 1.
+            TypeError: If cache is not a boolean.
+            ValueError: If the loader is not known.
+            TypeError: If lazy is not a boolean.
         """
         # verify the input
         if directory is None:
@@ -106,6 +257,18 @@ class Standard:  # pylint: disable=too-many-instance-attributes
             raise TypeError("The directory must be a string")
         if not os.path.isdir(directory):
             raise ValueError("The directory must be a valid directory")
+        if not isinstance(jobs, int) or isinstance(jobs, bool):
+            raise TypeError("jobs must be an integer")
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        if not isinstance(cache, bool):
+            raise TypeError("cache must be a boolean")
+        if not yaml_loader.valid_loader(loader):
+            raise ValueError(f"loader must be one of {yaml_loader.LOADERS}")
+        if not isinstance(lazy, bool):
+            raise TypeError("lazy must be a boolean")
+        self._loader = loader
+        self._lazy = lazy
 
         # get the config file
         self._get_config(directory)
@@ -118,44 +281,334 @@ class Standard:  # pylint: disable=too-many-instance-attributes
                 raise FileNotFoundError("A config file was not found."
                 " It must be located in the project root or in the example folder.")
 
+        # every folio is written the first time
+        self._dirty = None
+
         # get the paths to read from
         self._get_paths(directory)
 
         # get all requirement files in the paths
-        self._get_folios()
+        snapshot = self._get_snapshot() if cache else None
+        self._get_folios(jobs, snapshot)
 
         # get the raw requirements from the folios
         self._add_requirements()
 
+        # the requirements are as they are in the files
+        self._changes = {}
+
         # update the new requirements to get valid indices
         self._update_new_requirements()
 
-        # link the requirements together
+        # link the requirements together, which checks every link
         self._link_requirements()
+        self._unchecked = {}
+        self._edited = set()
+        self._note_cycles()
 
         return self
 
-    def write(self):
+    def write(self, patch=False, force=False):
         """Write the requirements back to file after editing.
 
         This method writes the requirements back to the files after editing.
+        The first write after a read writes every folio. After that only the
+        folios with a changed requirement are written, see mark_dirty(), and
+        the validator report is only written if there are new notes.
+        In a batch(), the standard is written once when the batch is done.
+        Each folio is replaced in one step, so a reader never sees part of
+        a file, and the folders are synced once for the whole write.
+
+        With patch, only the requirements that changed since the last write
+        are converted to text and spliced into the folios, the rest of each
+        file is kept as it is, see Folio.patch_file().
+
+        A folio whose file changed on disk since it was read is not written
+        over unless forced, see conflicts().
+
+        Args:
+            patch (bool): If True, only the changed requirements are written.
+            force (bool): If True, the edits are written over the files that
+                changed on disk.
 
         Returns:
             Standard: The modified Standard object.
+
+        Raises:
+            ValueError: If the standard was read with a read only loader.
+            TypeError: If patch or force is not a boolean.
         """
+        # verify the input
+        if not isinstance(patch, bool):
+            raise TypeError("patch must be a boolean")
+        if not isinstance(force, bool):
+            raise TypeError("force must be a boolean")
+
+        # a batch writes once when it is done, a full write wins
+        if self._batch is not None:
+            previous = self._batch["write"]
+            self._batch["write"] = patch if previous is None else previous and patch
+            self._batch["force"] = self._batch["force"] or force
+            return self
+
+        # a read only loader does not keep what is needed to write the files
+        if yaml_loader.is_read_only(self._loader):
+            raise ValueError(
+                f"A standard read with the {self._loader} loader cannot be written."
+            )
+
+        # the report is written with the notes of the edits
+        self.revalidate()
+
+        self._write_errors = []
+        if patch:
+            self._patch(force)
+        else:
+            self._write(force)
+        if force or len(self._conflicts) > 0:
+            self._clear_conflicts()
+
+        # write the validator report
+        if self._report_revision != self._validator.revision():
+            self._validator.write_report()
+            self._report_revision = self._validator.revision()
+
+        return self
+
+    def _write(self, force):
+        # the folios to write
+        if self._dirty is None:
+            folios = list(self._folios.values())
+        else:
+            folios = [
+                self._folios[path] for path in self._dirty if path in self._folios
+            ]
+        paths = {folio.path() for folio in folios}
+        requirements = [
+            req for req in self._requirements.values() if req.path() in paths
+        ]
+
+        # load any text that is still in the files before they are replaced
+        self._load(requirements)
+
         # link the requirements to their folios
-        for req in self._requirements.values():
+        for req in requirements:
             req_folio = self._folios[req.path()]
             req_folio.link_requirement(req)
 
-        # write the requirements to the directory
-        for folio in self._folios.values():
-            folio.write_file()
+        # write the requirements to the directory, the folders are synced
+        # once for the batch
+        directories = set()
+        for folio in folios:
+            folio.write_file(directories, force)
+            if folio.write_failed():
+                self._write_errors.append(folio.path())
+        sync_directories(directories)
+
+        # the folios that failed are written again by the next write
+        self._dirty = set(self._write_errors)
+        self._changes = self._failed_changes()
+        self._edited &= self._dirty
+
+    def _patch(self, force):
+        # the requirements of the folios with a change, in order
+        folio_reqs = {path: [] for path in self._changes if path in self._folios}
+        for req in self._requirements.values():
+            reqs = folio_reqs.get(req.path())
+            if reqs is not None:
+                reqs.append(req)
+
+        # only the changed requirements need their text
+        changed = [
+            req
+            for path, reqs in folio_reqs.items()
+            for req in reqs
+            if req.index in self._changes[path]
+        ]
+        self._load(changed)
+
+        directories = set()
+        for path, reqs in folio_reqs.items():
+            folio = self._folios[path]
+            if not folio.patch_file(reqs, self._changes[path], directories, force):
+                # the layout is not known, write the whole folio
+                self._load(reqs)
+                for req in reqs:
+                    folio.link_requirement(req)
+                folio.write_file(directories, force)
+            if folio.write_failed():
+                self._write_errors.append(path)
+        sync_directories(directories)
+
+        # the folios that failed are written again by the next write
+        if self._dirty is not None:
+            self._dirty = set(self._write_errors)
+        self._changes = self._failed_changes()
+        self._edited &= set(self._write_errors)
+
+    def _failed_changes(self):
+        # the changes of the folios the last write failed to write
+        return {path: self._changes.get(path, set()) for path in self._write_errors}
+
+    @contextmanager
+    def batch(self):
+        """Group many edits so the standard is linked and written once.
+
+        In the batch, relink() and write() only record what to do. When the
+        batch is done, the requirements that changed or were given to
+        relink() are linked in one pass, then the standard is written once
+        if write() was called, each changed folio once. If an exception
+        leaves the batch, the requirements are put back as they were and the
+        requirements added in the batch are removed. Files created by
+        Requirement.set_path() are not removed.
+
+        A batch opened inside another batch is part of the outer one.
+
+        Example:
+            with standard.batch():
+                for req in requirements:
+                    standard.relink(req.add_relationship(parent, "parent"))
+                standard.write(patch=True)
+
+        Yields:
+            Standard: The Standard object.
+        """
+        if self._batch is not None:
+            yield self
+            return
 
-        # write the validator report
-        self._validator.write_report()
+        self._batch = {
+            "journal": {},
+            "added": [],
+            "relink": {},
+            "write": None,
+            "force": False,
+            "changes": {path: set(indices) for path, indices in self._changes.items()},
+            "dirty": None if self._dirty is None else set(self._dirty),
+            "edited": set(self._edited),
+            "new_requirements": dict(self._new_requirements),
+            "max_index": self._max_index,
+        }
+        try:
+            yield self
+        except BaseException:
+            self._rollback()
+            raise
+        self._commit()
+
+    def journal(self, requirement):
+        """Keep the state of a requirement before it first changes in a batch.
+
+        Requirements added to the standard call this before they change.
+        The requirement is also kept so reachability() and tree_top() know
+        whose links may have changed, and its requirement_revision() changes.
 
-        return self
+        Args:
+            requirement (Requirement): The requirement about to change.
+        """
+        key = id(requirement)
+        self._req_revisions[key] = self._req_revisions.get(key, 0) + 1
+        if self._reach is not None:
+            self._touched[key] = requirement
+        if self._roots is not None:
+            self._roots_touched[key] = requirement
+        if self._batch is None:
+            return
+        journal = self._batch["journal"]
+        if key not in journal:
+            journal[key] = (requirement, requirement.state())
+
+    def _commit(self):
+        # link what changed in one pass, then write once
+        batch = self._batch
+        self._batch = None
+
+        link = dict(batch["relink"])
+        for req, _ in batch["journal"].values():
+            link[id(req)] = req
+        for req in batch["added"]:
+            link[id(req)] = req
+        link = [
+            req for req in link.values() if self._requirements.get(req.index) is req
+        ]
+        if len(link) > 0:
+            self._link_requirements(link)
+
+        if batch["write"] is not None:
+            self.write(patch=batch["write"], force=batch["force"])
+
+    def _rollback(self):
+        # put the requirements back as they were before the batch
+        batch = self._batch
+        self._batch = None
+
+        for req in batch["added"]:
+            if self._requirements.get(req.index) is req:
+                del self._requirements[req.index]
+            req.set_owner(None)
+            self._roots_touched[id(req)] = req
+        for req, state in batch["journal"].values():
+            req.restore(state)
+
+        for req in batch["added"]:
+            self._validator.clear_index(req)
+        for req, _ in batch["journal"].values():
+            self._unchecked[id(req)] = req
+
+        self._changes = batch["changes"]
+        self._dirty = batch["dirty"]
+        self._edited = batch["edited"]
+        self._new_requirements = batch["new_requirements"]
+        self._max_index = batch["max_index"]
+        self._revision += 1
+
+    def write_errors(self):
+        """Get the folios that the last write() failed to write.
+
+        The failures are also noted in the validator.
+
+        Returns:
+            list<str>: The paths of the folios.
+        """
+        return list(self._write_errors)
+
+    def mark_dirty(self, requirement, old_path=None):
+        """Mark the folio of a requirement to be written by write().
+
+        Requirements added to the standard call this when they change.
+
+        Args:
+            requirement (Requirement): The requirement that changed.
+            old_path (str): The path the requirement moved from. Optional.
+        """
+        self._changes.setdefault(requirement.path(), set()).add(requirement.index)
+        self._edited.add(requirement.path())
+        if old_path is not None:
+            self._changes.setdefault(old_path, set())
+            self._edited.add(old_path)
+        self._unchecked[id(requirement)] = requirement
+        self._edit_revision += 1
+
+        # only an edit to a field a tree uses changes the trees
+        if self._tree_fields is not None:
+            fields = _tree_fields(requirement)
+            if self._tree_fields.get(id(requirement)) != fields:
+                self._tree_fields[id(requirement)] = fields
+                self._tree_edits += 1
+
+        if self._dirty is None:
+            return
+        self._dirty.add(requirement.path())
+        if old_path is not None:
+            self._dirty.add(old_path)
+
+    def links_changed(self):
+        """Mark the graph to be built again after the links changed.
+
+        Requirements added to the standard call this when their links
+        change, journal() already kept which requirement changed.
+        """
+        self._link_revision += 1
 
     def file_count(self):
         """Return the number of requirement files found.
@@ -173,6 +626,10 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         Args:
             requirement (Requirement): The requirement to add.
 
+        Returns:
+            bool: True if the requirement was added, False if the index
+                was already in the standard.
+
         Raises:
             TypeError: If the requirement is not a Requirement object.
         """
@@ -191,11 +648,20 @@ class Standard:  # pylint: disable=too-many-instance-attributes
                     first_req,
                     f"Requirement duplicated  file: {second_file}.",
                     problem=True,
+                    tag="duplicate",
                 )
-            return
+            return False
 
         # add the requirement to the dictionary
         self._requirements[requirement.index] = requirement
+        self._revision += 1
+        if self._batch is not None:
+            self._batch["added"].append(requirement)
+
+        # changes to the requirement mark its folio to be written
+        requirement.set_owner(self)
+        self._place(requirement)
+        self.mark_dirty(requirement)
 
         # we will also record some information about new and max index here.
         if requirement.is_new():
@@ -204,6 +670,8 @@ class Standard:  # pylint: disable=too-many-instance-attributes
             idx = requirement.int_index()
             self._max_index = max(self._max_index, idx)
 
+        return True
+
     def get_new_requirement(self, path, type):
         """Return a new requirement.
 
@@ -255,6 +723,15 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         start_path = os.getcwd()
         return [os.path.relpath(path, start_path) for path in self._folios.keys()]
 
+    def get_source_paths(self):
+        """Return the folders the folios are read from.
+
+        Returns:
+            list: The project and customer folders that were found.
+        """
+        paths = [self._project_path, self._customer_path]
+        return [path for path in paths if path != ""]
+
     def get_report_path(self):
         """Return the path to the reports folder.
 
@@ -274,11 +751,456 @@ class Standard:  # pylint: disable=too-many-instance-attributes
     def validator(self):
         """Return the validator for the standard.
 
+        The requirements that changed are checked again first, see revalidate().
+
         Returns:
             Validator: The validator for the standard.
         """
+        self.revalidate()
         return self._validator
 
+    def revalidate(self):
+        """Check the requirements that changed since they were last checked.
+
+        The notes of the checks are made again for each requirement that
+        changed and the requirements linked to it, the rest of the notes are
+        kept. So problem_count() and report() of the validator stay right
+        after an edit without reading the standard again. Nothing is checked
+        in a batch().
+
+        Each index in parent_idx, child_idx and related_idx must be in the
+        standard. The notes are tagged "check", see Validator.clear_index().
+        If the links changed, the cycles are found again, see cycles().
+        After check(), its requirement rules are run again as well. The graph
+        rules are only run by check().
+
+        Returns:
+            int: The number of requirements checked.
+        """
+        if self._batch is not None or len(self._unchecked) == 0:
+            return 0
+        unchecked = self._unchecked
+        self._unchecked = {}
+
+        # the changed requirements that are still in the standard, and
+        # the requirements next to them
+        check = {}
+        for req in unchecked.values():
+            if self._requirements.get(req.index) is not req:
+                continue
+            check[id(req)] = req
+            for other in [*req.parent, *req.child, *req.related]:
+                check[id(other)] = other
+
+        notes = []
+        for req in check.values():
+            self._validator.clear_index(req, tag="check")
+            notes.extend(self._check_requirement(req))
+        if len(notes) > 0:
+            self._validator.index_note_batch(notes, tag="check")
+
+        if self._rules is not None:
+            for rule in self._rules:
+                for req in check.values():
+                    self._validator.clear_index(req, tag=rule.name)
+            data = [req.to_dict() for req in check.values()]
+            notes, _ = validation_rules.check_chunk(self._rules, data)
+            self._note_rules(self._rules, notes)
+
+        self._note_cycles()
+        return len(check)
+
+    def cycles(self):
+        """Return the parent and child cycles in the standard.
+
+        A cycle is a strongly connected component of the child links with
+        more than one requirement, or a requirement that is its own child.
+        See Graph.components() for the component of every requirement.
+
+        Returns:
+            list<list<Requirement>>: The requirements of each cycle, in
+                index order.
+        """
+        graph = self.graph()
+        return [[graph.requirement(n) for n in nodes] for nodes in graph.cycles()]
+
+    def components(self):
+        """Return the component each requirement is part of.
+
+        A requirement without a component is part of the component of its
+        parents, see Graph.resolve_components(). The components are found in
+        one pass and kept until the requirements, their links or an edit
+        told to mark_dirty() change them.
+
+        Returns:
+            dict: The component of each requirement by index, "" for none.
+        """
+        graph = self.graph()
+        revision = (self._graph_revision, self._edit_revision)
+        if self._components is None or self._components_revision != revision:
+            resolved = graph.resolve_components()
+            self._components = {
+                graph.requirement(node).index: component
+                for node, component in enumerate(resolved)
+            }
+            self._components_revision = revision
+        return self._components
+
+    def component(self, requirement):
+        """Return the component a requirement is part of, see components().
+
+        Args:
+            requirement (Requirement): The requirement.
+
+        Returns:
+            str: The component, "" for none.
+        """
+        return self.components().get(requirement.index, requirement.component)
+
+    def component_top(self, component):
+        """Return the requirements at the top of a component.
+
+        These are the requirements of the component without a parent in it,
+        leaving out the links that close a cycle. The tops of all the
+        components are found in one pass and kept with components().
+
+        Args:
+            component (str): The component.
+
+        Returns:
+            list<Requirement>: The requirements, in the order of
+                requirements_iter().
+        """
+        components = self.components()
+        if (
+            self._component_tops is None
+            or self._component_tops_revision != self._components_revision
+        ):
+            graph = self.graph()
+            tops = {}
+            for req in self._requirements.values():
+                node = graph.node(req)
+                if node is None:
+                    continue
+                own = components[req.index]
+                parents = graph.tree_parents(node)
+                if not any(
+                    components[graph.requirement(p).index] == own for p in parents
+                ):
+                    tops.setdefault(own, []).append(req)
+            self._component_tops = tops
+            self._component_tops_revision = self._components_revision
+        return list(self._component_tops.get(component, []))
+
+    def tree_revision(self):
+        """Return a key that changes when a tree of the requirements could change.
+
+        It changes with the graph, and with an edit to the index, type,
+        path, component or labels of a requirement told to mark_dirty().
+        Edits to the text do not change it.
+
+        Returns:
+            tuple: The revision of the trees.
+        """
+        self.graph()
+        if self._tree_fields is None:
+            self._tree_fields = {
+                id(req): _tree_fields(req) for req in self._requirements.values()
+            }
+        return (self._graph_revision, self._tree_edits)
+
+    def tree_cache(self):
+        """Return the cache Tree keeps its node lists in, see Tree.nodes().
+
+        Returns:
+            dict: The cache, owned by the standard.
+        """
+        return self._tree_cache
+
+    def tree_top(self, customer="", also=None):
+        """Return the requirements TreeFilter.top() is True for.
+
+        These are the requirements without parents, and those whose parents
+        are all customer requirements of another customer. Both are kept as
+        the requirements change, so this does not look at every requirement.
+
+        Args:
+            customer (str): The customer of the filter, see TreeFilter.
+            also (list<Requirement>): More requirements to put in order with
+                the top, such as the top of a cycle. Optional.
+
+        Returns:
+            list<Requirement>: The requirements, each once, in the order of
+                requirements_iter().
+        """
+        if self._roots is None:
+            self._roots = {}
+            self._roots_touched = {id(req): req for req in self._requirements.values()}
+            self._order = {key: i for i, key in enumerate(self._roots_touched)}
+            self._order_next = len(self._order)
+        self._update_roots()
+
+        top = dict(self._roots)
+        for key, (req, names) in self._customer_children.items():
+            if customer not in names:
+                top[key] = req
+        for req in also or []:
+            top[id(req)] = req
+        return sorted(top.values(), key=lambda req: self._order[id(req)])
+
+    def requirement_revision(self, requirement):
+        """Return a number that changes when a requirement of the standard changes.
+
+        Any change made through the requirement, its fields, labels or
+        links, changes it. Assigning the fields it does not track, see
+        Requirement.set_owner(), does not.
+
+        Args:
+            requirement (Requirement): The requirement.
+
+        Returns:
+            int: The revision of the requirement, 0 if it was never changed.
+        """
+        return self._req_revisions.get(id(requirement), 0)
+
+    def customer_name(self, requirement):
+        """Return the customer a requirement belongs to, the name of its file.
+
+        The name is found once for each folio.
+
+        Args:
+            requirement (Requirement): The requirement.
+
+        Returns:
+            str: The file name of the requirement without the extension.
+        """
+        path = requirement.path()
+        name = self._customer_names.get(path)
+        if name is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+            self._customer_names[path] = name
+        return name
+
+    def _place(self, requirement):
+        # a requirement put last in _requirements is last in tree_top()
+        if self._roots is not None:
+            self._order[id(requirement)] = self._order_next
+            self._order_next += 1
+            self._roots_touched[id(requirement)] = requirement
+
+    def _update_roots(self):
+        # the changed requirements, and the children of a changed parent
+        touched = self._roots_touched
+        self._roots_touched = {}
+        for req in list(touched.values()):
+            for child in req.child:
+                touched[id(child)] = child
+
+        for key, req in touched.items():
+            self._roots.pop(key, None)
+            self._customer_children.pop(key, None)
+            if self._requirements.get(req.index) is not req:
+                self._order.pop(key, None)
+                continue
+            parents = req.parent
+            if len(parents) == 0:
+                self._roots[key] = req
+            elif all(parent.type == "customer" for parent in parents):
+                names = frozenset(self.customer_name(parent) for parent in parents)
+                self._customer_children[key] = (req, names)
+
+    def reachability(self):
+        """Return the ancestors and descendants of the requirements.
+
+        After relink() or another change to the links, the bitsets of the
+        requirements the change cannot reach are kept, see
+        Reachability.rebase(). A new one is made if requirements were added
+        or removed.
+
+        Returns:
+            Reachability: The reachability of the current graph.
+        """
+        graph = self.graph()
+        if self._reach is None or not self._reach.rebase(graph, self._touched.values()):
+            self._reach = Reachability(graph)
+        self._touched = {}
+        return self._reach
+
+    def descendants(self, index):
+        """Return every requirement below a requirement, through its children.
+
+        Args:
+            index (str): The index of the requirement.
+
+        Returns:
+            list<Requirement>: The descendants, in index order.
+
+        Raises:
+            ValueError: If the index is not in the standard.
+        """
+        reach = self.reachability()
+        return self._from_bits(reach.descendants(self._node(index)))
+
+    def ancestors(self, index):
+        """Return every requirement above a requirement, through its parents.
+
+        Args:
+            index (str): The index of the requirement.
+
+        Returns:
+            list<Requirement>: The ancestors, in index order.
+
+        Raises:
+            ValueError: If the index is not in the standard.
+        """
+        reach = self.reachability()
+        return self._from_bits(reach.ancestors(self._node(index)))
+
+    def impacted_by(self, indices):
+        """Return every requirement below any of the requirements.
+
+        Args:
+            indices (iterable<str>): The indices of the changed requirements.
+
+        Returns:
+            list<Requirement>: The requirements a change could impact, in
+                index order.
+
+        Raises:
+            ValueError: If an index is not in the standard.
+        """
+        reach = self.reachability()
+        nodes = [self._node(index) for index in indices]
+        return self._from_bits(reach.impacted_by(nodes))
+
+    def _node(self, index):
+        # the graph id of the requirement with the index
+        req = self._requirements.get(index)
+        node = None if req is None else self.graph().node(req)
+        if node is None:
+            raise ValueError(f"Requirement not found: {index}.")
+        return node
+
+    def _from_bits(self, bits):
+        graph = self.graph()
+        return [graph.requirement(node) for node in from_bits(bits)]
+
+    def _note_cycles(self):
+        # one problem for each cycle, on its first requirement, made again
+        # only when the links changed
+        self.graph()
+        if self._cycles_revision == self._graph_revision:
+            return
+        self._cycles_revision = self._graph_revision
+
+        self._validator.clear_tag("cycle")
+        notes = []
+        for cycle in self.cycles():
+            indices = ", ".join(req.index for req in cycle)
+            notes.append((cycle[0], f"Parent and child cycle: {indices}.", True))
+        if len(notes) > 0:
+            self._validator.index_note_batch(notes, tag="cycle")
+
+    def check(self, rules=None, jobs=1):
+        """Run the validation rules over the standard.
+
+        The requirement rules are run first, in chunks across a process pool
+        when jobs is more than 1, then the graph rules. The notes of each
+        rule are tagged with its name, and the notes of an earlier check()
+        are removed first. See littleR.rules.
+
+        Args:
+            rules (list<str>): The names of the rules to run. None for all
+                registered rules.
+            jobs (int): The number of processes for the requirement rules.
+
+        Returns:
+            dict: The seconds spent in each rule, by name. Also see rule_timings().
+
+        Raises:
+            TypeError: If jobs is not an integer.
+            ValueError: If jobs is less than 1 or a rule is not registered.
+        """
+        # verify the input
+        if not isinstance(jobs, int) or isinstance(jobs, bool):
+            raise TypeError("jobs must be an integer")
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        selected = validation_rules.get_rules(rules)
+
+        # the changes are checked first so their notes are not made twice
+        self.revalidate()
+        for rule in selected:
+            self._validator.clear_tag(rule.name)
+
+        data = [req.to_dict() for req in self._requirements.values()]
+        requirement_rules = [
+            r for r in selected if r.phase == validation_rules.REQUIREMENT
+        ]
+        timings = {rule.name: 0.0 for rule in selected}
+
+        # requirement rules, each process gets a chunk of the requirements
+        results = []
+        if len(requirement_rules) > 0 and len(data) > 0:
+            if jobs > 1 and len(data) > 1:
+                size = max(1, len(data) // (jobs * 4))
+                chunks = [data[i : i + size] for i in range(0, len(data), size)]
+                run = partial(validation_rules.check_chunk, requirement_rules)
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    results = list(pool.map(run, chunks))
+            else:
+                results = [validation_rules.check_chunk(requirement_rules, data)]
+
+        notes = []
+        for chunk_notes, chunk_timings in results:
+            notes.extend(chunk_notes)
+            for name, seconds in chunk_timings.items():
+                timings[name] += seconds
+        self._note_rules(requirement_rules, notes)
+
+        # graph rules, over the linked standard
+        for rule in selected:
+            if rule.phase != validation_rules.GRAPH:
+                continue
+            start = time.perf_counter()
+            found = rule.fn(self)
+            timings[rule.name] += time.perf_counter() - start
+            graph_notes = [(req, message, rule.problem) for req, message in found]
+            if len(graph_notes) > 0:
+                self._validator.index_note_batch(graph_notes, tag=rule.name)
+
+        self._rules = requirement_rules
+        self._rule_timings = timings
+        return dict(timings)
+
+    def rule_timings(self):
+        """Return the seconds spent in each rule by the last check().
+
+        Returns:
+            dict: The seconds, by rule name. Empty if check() was not called.
+        """
+        return dict(self._rule_timings)
+
+    def _note_rules(self, rules, notes):
+        # the (index, rule name, message) notes of the requirement rules
+        problems = {rule.name: rule.problem for rule in rules}
+        by_rule = {}
+        for index, name, message in notes:
+            req = self._requirements[index]
+            by_rule.setdefault(name, []).append((req, message, problems[name]))
+        for name, rule_notes in by_rule.items():
+            self._validator.index_note_batch(rule_notes, tag=name)
+
+    def _check_requirement(self, req):
+        # the notes for the indices of a requirement that are not found
+        notes = []
+        for _, field, _, name in _LINKS:
+            for idx in sorted(getattr(req, field)):
+                idx = self._new_requirements.get(idx, idx)
+                if idx not in self._requirements:
+                    notes.append((req, f"{name} index not found: {idx}.", True))
+        return notes
+
     def get_requirement(self, index):  # TODO: Test this method
         """Return the requirement with the given index.
 
@@ -301,6 +1223,31 @@ class Standard:  # pylint: disable=too-many-instance-attributes
 
         return self._requirements.get(index)
 
+    def revision(self):
+        """Return a number that changes when the requirements are changed.
+
+        Adding, removing, renumbering or linking requirements all change it.
+
+        Returns:
+            int: The revision of the standard.
+        """
+        return self._revision
+
+    def graph(self):
+        """Return the links of the standard as a Graph.
+
+        The graph is built on first use and again after the requirements
+        or their links change.
+
+        Returns:
+            Graph: The graph of the requirements.
+        """
+        revision = (self._revision, self._link_revision)
+        if self._graph is None or self._graph_revision != revision:
+            self._graph = Graph(self._requirements.values())
+            self._graph_revision = revision
+        return self._graph
+
     def requirements_iter(self):
         """Return an iterator over the requirements.
 
@@ -309,6 +1256,35 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         """
         return iter(self._requirements.values())
 
+    def load(self):
+        """Load the text of every requirement.
+
+        After a lazy read the text of a requirement is loaded when it is
+        first used. This loads the rest at once, parsing each file once.
+
+        Returns:
+            Standard: The modified Standard object.
+        """
+        self._load(self._requirements.values())
+        return self
+
+    def _load(self, requirements):
+        # load the text of the requirements, parsing each file once
+        pending = {}
+        for req in requirements:
+            path = req.source_path()
+            if path is not None:
+                pending.setdefault(path, []).append(req)
+
+        for path, reqs in pending.items():
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    data = yaml_loader.load(file, self._loader)
+            except Exception:
+                data = None
+            for req in reqs:
+                req.load(data)
+
     def relink(self, requirements=None):
         """Relink the requirements.
 
@@ -340,8 +1316,202 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         
         #turn the indices into requirements
         reqs = [self._requirements[index] for index in requirements]
+
+        # a batch links once when it is done
+        if self._batch is not None:
+            for req in reqs:
+                self._batch["relink"][id(req)] = req
+            return
+
         self._link_requirements(reqs)
     
+    def refresh(self):
+        """Re-read the folios that changed on disk since they were read.
+
+        Every folio is checked for a change in modification time or size,
+        and the folders are checked for new and removed folios. Only those
+        folios are parsed again. Their old requirements are removed and
+        only the links that touch them are rebuilt.
+
+        A folio with edits that are not written yet is not read again, the
+        edits are kept and the conflict is noted as a problem. The folio is
+        not written over the file either, see conflicts() to resolve it.
+
+        Returns:
+            list: The paths of the folios that were added, changed, or removed.
+        """
+        # nothing to refresh before the standard is read
+        if self._project_path == "" and self._customer_path == "":
+            return []
+
+        # the folios we know about, by the path they are read from
+        known = {folio.read_path(): folio for folio in self._folios.values()}
+        paths = self._find_folio_paths()
+
+        changed = []
+        removed = []
+        for path in paths:
+            folio = known.get(path)
+            if folio is not None:
+                if folio.changed():
+                    changed.append(path)
+            elif self._invalid_folios.get(path, False) != stat_file(path):
+                changed.append(path)
+        current = set(paths)
+        for path in known:
+            if path not in current:
+                removed.append(path)
+        for path in list(self._invalid_folios.keys()):
+            if path not in current:
+                del self._invalid_folios[path]
+
+        # a folio with unsaved edits keeps them, the change on disk is noted
+        conflicts = {
+            p
+            for p in changed + removed
+            if p in known and known[p].path() in self._edited
+        }
+        for path in conflicts:
+            self._note_conflict(known[path])
+        for path in list(self._conflicts.keys()):
+            if path not in conflicts:
+                del self._conflicts[path]
+        changed = [p for p in changed if p not in conflicts]
+        removed = [p for p in removed if p not in conflicts]
+
+        return self._read_again(known, changed, removed)
+
+    def conflicts(self):
+        """Get the folios that changed on disk while they had unsaved edits.
+
+        Such a folio is not read again by refresh() and not written over by
+        write(). write(force=True) keeps the edits and writes them over the
+        file, reload(path, discard=True) drops them and reads the file.
+
+        Returns:
+            list<str>: The paths the folios are read from, in order.
+        """
+        return sorted(
+            folio.read_path()
+            for folio in self._folios.values()
+            if folio.path() in self._edited and folio.changed()
+        )
+
+    def reload(self, path, discard=False):
+        """Read a folio again from its file on disk.
+
+        A folio whose file was removed is removed with its requirements.
+        The edits that were not written yet are lost, so a folio with such
+        edits is only read again with discard.
+
+        Args:
+            path (str): The path the folio is read from or written to.
+            discard (bool): If True, the unsaved edits of the folio are
+                dropped.
+
+        Returns:
+            list: The paths of the folios that were read again or removed.
+
+        Raises:
+            TypeError: If discard is not a boolean.
+            ValueError: If the path is not a folio of the standard, or the
+                folio has unsaved edits and discard is False.
+        """
+        # verify the input
+        if not isinstance(discard, bool):
+            raise TypeError("discard must be a boolean")
+        folio = self._folios.get(path)
+        if folio is None:
+            found = [f for f in self._folios.values() if f.read_path() == path]
+            folio = found[0] if len(found) > 0 else None
+        if folio is None:
+            raise ValueError("The path must be a folio of the standard.")
+        if folio.path() in self._edited and not discard:
+            raise ValueError("The folio has unsaved edits, use discard to drop them.")
+
+        # the edits of the folio are dropped
+        self._edited.discard(folio.path())
+        self._changes.pop(folio.path(), None)
+        if self._dirty is not None:
+            self._dirty.discard(folio.path())
+
+        read_path = folio.read_path()
+        self._validator.clear_file(read_path, tag="conflict")
+        if os.path.isfile(read_path):
+            paths = self._read_again({read_path: folio}, [read_path], [])
+        else:
+            paths = self._read_again({read_path: folio}, [], [read_path])
+        self._clear_conflicts()
+        return paths
+
+    def _read_again(self, known, changed, removed):
+        # read the changed folios again and drop the removed ones
+        if len(changed) == 0 and len(removed) == 0:
+            return []
+
+        # the links repaired while reading the folios again are not edits
+        edited = set(self._edited)
+
+        # remove the old folios and their requirements, keeping the
+        # requirements they were linked to so they can be relinked
+        neighbors = self._remove_folios(
+            [known[p] for p in changed + removed if p in known]
+        )
+
+        # parse the changed and new folios
+        added = []
+        for path in changed:
+            self._invalid_folios.pop(path, None)
+            folio = Folio(path, self._validator, None, self._loader, self._lazy)
+            if not folio.valid():
+                self._invalid_folios[path] = folio.stat()
+                continue
+            self._add_folio(folio)
+            for req in folio.parse_file():
+                if self.add_requirement(req):
+                    added.append(req)
+
+            # the requirements are as they are in the file
+            self._changes.pop(folio.path(), None)
+
+        # give new requirements an index, then link what was touched
+        new_indices = [req.index for req in added if req.is_new()]
+        self._update_new_requirements(new_indices)
+        link = added + [req for req in neighbors if req.index in self._requirements]
+        self._link_requirements(link)
+        self._edited = edited
+
+        return changed + removed
+
+    def _clear_conflicts(self):
+        # forget the conflicts that were resolved, and their notes once
+        # none is left
+        current = set(self.conflicts())
+        for path in list(self._conflicts.keys()):
+            if path not in current:
+                del self._conflicts[path]
+        if len(current) == 0:
+            self._validator.clear_tag("conflict")
+
+    def _note_conflict(self, folio):
+        # noted once for each state of the file on disk
+        path = folio.read_path()
+        state = stat_file(path)
+        if path in self._conflicts and self._conflicts[path] == state:
+            return
+        self._conflicts[path] = state
+
+        message = (
+            "File changed on disk with unsaved edits, "
+            "the edits are kept and the file is not read again."
+        )
+        if state is not None:
+            self._validator.clear_file(path, tag="conflict")
+            self._validator.file_note(path, message, problem=True, tag="conflict")
+        else:
+            message = f"{message} File removed: {path}"
+            self._validator.note(message, problem=True, tag="conflict")
+
     # read methods
 
     def _get_config(self, directory):
@@ -387,31 +1557,105 @@ class Standard:  # pylint: disable=too-many-instance-attributes
         self._reports_path = os.path.join(directory, "reports")
         #this path does not have to exist, it will be created if not found
 
-    def _get_folios(self):
+    def _get_snapshot(self):
+        # the snapshot sits with the reports, or the output when testing
+        directory = os.path.join(self._reports_path, ".cache")
+        if self._test_directory is not None:
+            directory = os.path.join(self._test_directory, ".cache")
+        return Snapshot(directory).load()
+
+    def _get_folios(self, jobs=1, snapshot=None):
         # verify required input
         if self._project_path == "" and self._customer_path == "":
             self._validator.note("No project or customer path found.", problem=True)
             return
 
-        # project path
-        for root, _, files in os.walk(self._project_path):
-            for file in files:
-                if file.endswith(".yaml"):
-                    folio = Folio(os.path.join(root, file), self._validator)
-                    if folio.valid():
-                        self._add_folio(folio)
-
-        # customer path
-        for root, _, files in os.walk(self._customer_path):
-            for file in files:
-                if file.endswith(".yaml"):
-                    folio = Folio(os.path.join(root, file), self._validator)
-                    if folio.valid():
-                        self._add_folio(folio)
+        paths = self._find_folio_paths()
+
+        # unchanged folios come from the snapshot
+        contents = [None] * len(paths)
+        if snapshot is not None:
+            contents = [snapshot.get(path, self._loader, self._lazy) for path in paths]
+        missing = [i for i, content in enumerate(contents) if content is None]
+
+        # read and parse the rest, the results keep the order of the paths
+        # so the folios are added the same way as a serial read
+        if jobs > 1 and len(missing) > 1:
+            missing_paths = [paths[i] for i in missing]
+            chunksize = max(1, len(missing_paths) // (jobs * 4))
+            read = partial(read_folio, loader=self._loader, lazy=self._lazy)
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = pool.map(read, missing_paths, chunksize=chunksize)
+                for i, content in zip(missing, results):
+                    contents[i] = content
+        elif snapshot is not None:
+            for i in missing:
+                contents[i] = read_folio(paths[i], self._loader, self._lazy)
+
+        # keep the snapshot up to date
+        if snapshot is not None:
+            for i in missing:
+                snapshot.put(paths[i], contents[i], self._loader, self._lazy)
+            snapshot.prune(paths)
+            snapshot.save()
+
+        for path, content in zip(paths, contents):
+            folio = Folio(path, self._validator, content, self._loader, self._lazy)
+            if folio.valid():
+                self._add_folio(folio)
+            else:
+                self._invalid_folios[path] = folio.stat()
 
         if self.file_count() == 0:
             self._validator.note("No requirement files found.", problem=True)
 
+    def _find_folio_paths(self):
+        # project path, then customer path
+        paths = []
+        for folder in [self._project_path, self._customer_path]:
+            for root, _, files in os.walk(folder):
+                for file in files:
+                    if file.endswith(".yaml"):
+                        paths.append(os.path.join(root, file))
+        return paths
+
+    def _remove_folios(self, folios):
+        # remove the folios and the requirements that came from them
+        folio_paths = set()
+        for folio in folios:
+            folio_paths.add(folio.path())
+            self._folios.pop(folio.path(), None)
+
+            # the file is read again, so are its notes
+            self._validator.clear_file(folio.path())
+
+        removed = [
+            req for req in self._requirements.values() if req.path() in folio_paths
+        ]
+        removed_ids = {id(req) for req in removed}
+        self._revision += 1
+        for req in removed:
+            req.set_owner(None)
+            self._roots_touched[id(req)] = req
+            self._req_revisions.pop(id(req), None)
+        for path in folio_paths:
+            self._customer_names.pop(path, None)
+
+        # unlink the removed requirements from the ones that stay
+        neighbors = []
+        for req in removed:
+            del self._requirements[req.index]
+            for other in [*req.parent, *req.child, *req.related]:
+                other.unlink(removed_ids)
+                neighbors.append(other)
+
+        # the neighbors that stay, each once
+        unique = {}
+        for req in neighbors:
+            if id(req) not in removed_ids:
+                unique[id(req)] = req
+        return list(unique.values())
+
     def _add_folio(self, folio):
         # verify input
         if not isinstance(folio, Folio) or not folio.valid():
@@ -440,9 +1684,13 @@ class Standard:  # pylint: disable=too-many-instance-attributes
             for req in raw_requirements:
                 self.add_requirement(req)
 
-    def _update_new_requirements(self):
+    def _update_new_requirements(self, new_indices=None):
+        # only the given new indices, or all of them after a read
+        if new_indices is None:
+            new_indices = list(self._new_requirements.keys())
+
         # for each new requirement, we will replace it with a valid index
-        for new_index in self._new_requirements:
+        for new_index in new_indices:
             # get the requirement with the new index
             req = self._requirements.pop(new_index)
 
@@ -450,109 +1698,83 @@ class Standard:  # pylint: disable=too-many-instance-attributes
             self._max_index += 1
             index = f"r{self._max_index:08d}"
 
-            # replace the index
+            # replace the index, the folio writes it in place of the old one
             req.index = index
+            folio = self._folios.get(req.path())
+            if folio is not None:
+                folio.rename_block(new_index, index)
+            self._revision += 1
+            self.mark_dirty(req)
             self._new_requirements[new_index] = index
 
-            # add the requirement back to the dictionary
+            # add the requirement back to the dictionary, it is now the last
             self._requirements[index] = req
+            self._place(req)
 
-    def _link_requirements(self, link = None):  # pylint: disable=too-many-branches
+    def _link_requirements(self, link=None):
         """Link the requirements.
 
         for each requirement's parent_idx, child_idx, and related_idx, we will:
             * link requirements
             * replace "new" indices with the updated index
 
+        The links are made in one pass. The indices of each requirement are
+        taken in sorted order so the links are made in the same order every
+        time, and the links already made are tracked in sets so each link is
+        checked once. The new links of each requirement are added together
+        once the pass is done, and so are the indices that are not found
+        reported, they are dropped.
+
         Args:
             link (list<Requirement>): The requirements to relink. Optional.
                 If provided, will only relink the requirements in the list.
         """
         if link is None:
             link = self._requirements.values()
+        self._revision += 1
 
+        linked = {}
+        added = {}
+        missing = []
         for req in link:
+            for relation, field, reverse, name in _LINKS:
+                indices = []
+                for idx in sorted(getattr(req, field)):
+                    # a new index is replaced with the index it was given
+                    idx = self._new_requirements.get(idx, idx)
+
+                    other = self._requirements.get(idx)
+                    if other is None:
+                        missing.append((req, f"{name} index not found: {idx}.", True))
+                        continue
+
+                    indices.append(idx)
+                    Standard._link(linked, added, req, relation, other)
+                    Standard._link(linked, added, other, reverse, req)
+
+                # the invalid indices are removed
+                setattr(req, field, indices)
+
+        # the links are tuples, each gets its new links at once
+        for req, relation, others in added.values():
+            setattr(req, relation, getattr(req, relation) + tuple(others))
+
+        if len(missing) > 0:
+            self._validator.index_note_batch(missing, tag="link")
+
+    @staticmethod
+    def _link(linked, added, req, relation, other):
+        # the ids already linked are collected the first time they are needed
+        key = (id(req), relation)
+        ids = linked.get(key)
+        if ids is None:
+            ids = linked[key] = {id(r) for r in getattr(req, relation)}
+        if id(other) not in ids:
+            ids.add(id(other))
+            if key not in added:
+                added[key] = (req, relation, [])
+            added[key][2].append(other)
 
-            # parent_idx
-            parent_idx = sorted(list(req.parent_idx))
-            for i, p_idx in enumerate(parent_idx):
-
-                if p_idx in self._new_requirements:
-                    p_idx = parent_idx[i] = self._new_requirements[p_idx]
-
-                if p_idx not in self._requirements:
-                    self._validator.index_note(
-                        req,
-                        f"Parent index not found: {p_idx}.",
-                        problem=True,
-                    )
-                    # remove the invalid parent index
-                    parent_idx.remove(p_idx)
-                    continue
-
-                parent_req = self._requirements[p_idx]
-
-                if parent_req not in req.parent:
-                    req.parent.append(parent_req)
-                
-                if req not in parent_req.child:
-                    parent_req.child.append(req)
-
-            req.parent_idx = set(parent_idx)
-
-            # child_idx
-            child_idx = sorted(list(req.child_idx))
-            for i, c_idx in enumerate(child_idx):
-
-                if c_idx in self._new_requirements:
-                    c_idx = child_idx[i] = self._new_requirements[c_idx]
-
-                if c_idx not in self._requirements:
-                    self._validator.index_note(
-                        req,
-                        f"Child index not found: {c_idx}.",
-                        problem=True,
-                    )
-                    # remove the invalid child index
-                    child_idx.remove(c_idx)
-                    continue
-
-                child_req = self._requirements[c_idx]
-
-                if child_req not in req.child:
-                    req.child.append(child_req)
-
-                if req not in child_req.parent:
-                    child_req.parent.append(req)
-
-            req.child_idx = set(child_idx)
-
-            # related_idx
-            related_idx = sorted(list(req.related_idx)) 
-            for i, r_idx in enumerate(related_idx):
-                if r_idx in self._new_requirements:
-                    r_idx = related_idx[i] = self._new_requirements[r_idx]
-
-                if r_idx not in self._requirements:
-                    self._validator.index_note(
-                        req,
-                        f"Related index not found: {r_idx}.",
-                        problem=True,
-                    )
-                    # remove the invalid related index
-                    related_idx.remove(r_idx)
-                    continue
-
-                related_req = self._requirements[r_idx]
-
-                if related_req not in req.related:
-                    req.related.append(related_req)
-
-                if req not in related_req.related:
-                    related_req.related.append(req)
-
-            req.related_idx = set(related_idx)
-            
     # dunders
 
     def __str__(self):
@@ -570,3 +1792,8 @@ class Standard:  # pylint: disable=too-many-instance-attributes
             and len(self._requirements) == len(other._requirements)
             and len(self._folios) == len(other._folios)
         )
+
+
+def _tree_fields(req):
+    # the fields of a requirement a tree filter or outline depends on
+    return (req.index, req.type, req.path(), req.component, frozenset(req.label))
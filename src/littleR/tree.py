@@ -2,6 +2,28 @@ from littleR.standard import Standard
 from littleR.tree_filter import TreeFilter
 from littleR.requirement import Requirement
 
+class TreeNode():
+    """A requirement at its place in a tree.
+
+    Attributes:
+        requirement (Requirement): The requirement.
+        depth (int): The depth in the tree, the top is 1.
+        outline (str): The outline number, such as "1.2.3".
+    """
+
+    __slots__ = ["requirement", "depth", "outline"]
+
+    def __init__(self, requirement, depth, outline):
+        self.requirement = requirement
+        self.depth = depth
+        self.outline = outline
+
+    def __str__(self):
+        return f"TreeNode({self.outline} {self.requirement.index})"
+
+    def __repr__(self):
+        return "TreeNode"
+
 class Tree():
 
     def __init__(self, standard, tree_filter):
@@ -13,30 +35,122 @@ class Tree():
         
         self._standard = standard
         self._tree_filter = tree_filter
+        self._graph = standard.graph()
+
+        # the component of each requirement, only for a component filter
+        self._components = None
+        if tree_filter._component != "":
+            self._components = standard.components()
     
+    def nodes(self, max_depth=100):
+        """Return the tree as a list of nodes in the order it is read.
+
+        The list is kept by the standard for each filter and max depth, and
+        found again only when the graph or the index, type, path, component
+        or labels of a requirement change, see Standard.tree_revision().
+        Edits to the text of a requirement keep the list.
+
+        Args:
+            max_depth (int): The deepest level to include, the top is 1.
+
+        Returns:
+            tuple<TreeNode>: The nodes, each parent before its children.
+        """
+        # verify the input
+        if not isinstance(max_depth, int):
+            raise TypeError("The max depth must be an integer.")
+        if max_depth <= 0:
+            raise ValueError("The max depth must be a positive integer.")
+
+        cache = self._standard.tree_cache()
+        key = (self._tree_filter.signature(), max_depth)
+        revision = self._standard.tree_revision()
+        cached = cache.get(key)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+
+        # drop what the change made stale, then walk the current graph
+        for stale in [k for k, v in cache.items() if v[0] != revision]:
+            del cache[stale]
+        self._graph = self._standard.graph()
+        if self._components is not None:
+            self._components = self._standard.components()
+
+        nodes = tuple(self._walk(max_depth))
+        cache[key] = (revision, nodes)
+        return nodes
+
+    def _walk(self, max_depth):
+        # depth first without recursion, so a deep tree does not hit the limit
+        stack = [
+            (req, 1, str(i + 1)) for i, req in reversed(list(enumerate(self.top())))
+        ]
+        while stack:
+            req, depth, outline = stack.pop()
+            yield TreeNode(req, depth, outline)
+            if depth == max_depth:
+                continue
+            children = self.children(req)
+            for i in range(len(children) - 1, -1, -1):
+                stack.append((children[i], depth + 1, f"{outline}.{i + 1}"))
+
     def config(self):
         """Return the configuration."""
         return self._standard.config
 
     def top(self):
         """Return the top of the tree."""
-        # find the top of the tree
-        tree_top = []
-        for req in self._standard.requirements_iter():
-            if self._tree_filter.top(req):
-                tree_top.append(req)
-        return tree_top
+        self._graph = self._standard.graph()
+
+        # the standard keeps the top of each component
+        if self._components is not None:
+            top = self._standard.component_top(self._tree_filter._component)
+            return [req for req in top if self._tree_filter.project_or_customer(req)]
+
+        # the standard keeps the top, only a cycle can add to it
+        cycle_top = []
+        for nodes in self._graph.cycles():
+            for node in nodes:
+                req = self._graph.requirement(node)
+                if self._cycle_top(req):
+                    cycle_top.append(req)
+        return self._standard.tree_top(self._tree_filter._customer, cycle_top)
+
+    def _cycle_top(self, req):
+        # a requirement whose parents all close a cycle starts the cycle
+        node = self._graph.node(req)
+        if node is None or self._graph.degree(node, "parent") == 0:
+            return False
+        if len(self._graph.tree_parents(node)) > 0:
+            return False
+        return self._tree_filter.project_or_customer(req)
 
     def children(self, req):
         """Return a list of filtered child requirements.
         
-        This only filters based on customer, label, and not_label.
+        This only filters based on customer, label, not_label and component.
+        A child link that closes a parent and child cycle is left out,
+        see Graph.tree_children(), so walking the children always ends.
         """
+        # walk the compact graph, a requirement it does not hold uses its links
+        node = self._graph.node(req)
+        if node is None:
+            candidates = req.child
+        else:
+            candidates = [
+                self._graph.requirement(c) for c in self._graph.tree_children(node)
+            ]
+
         children = []
-        for child in req.child:
+        for child in candidates:
             # exclude on customer first
             if not self._tree_filter.project_or_customer(child):
                 continue
+
+            # exclude what is not in the component
+            if self._components is not None:
+                if not self._tree_filter.component(child, self._components):
+                    continue
             
             # find the matching labels if any
             if TreeFilter.has_label(child, self._tree_filter._label):
@@ -107,26 +107,47 @@ class TreeFilter():
                 return False
         return True
     
-    def component(self, req):
+    def component(self, req, components=None):
         """Return True if the requirement is in the component.
         
         Something is part of the component if it:
         - Has the component.
-        - One of its parents, recursive, is part of the component.
-        - It is not part of another component.
+        - Has no component and its first parent with one, recursive, is
+          part of the component.
+
+        Args:
+            req (Requirement): The requirement to check.
+            components (dict): The component of each requirement by index,
+                see Standard.components(). Without it the parents are walked.
         """
-        if self._component == req.component:
-            return True
-        parents = req.parent
+        if components is not None:
+            return components.get(req.index, req.component) == self._component
+
+        # the parents in order, each requirement once
+        seen = set()
+        parents = [req]
         while len(parents) > 0:
             parent = parents.pop()
-            if self._component == parent.component:
-                return True
-            if parent.component != "": #matches any component not in the filter
-                return False
-            parents.extend(parent.parent())
-        return False
+            if id(parent) in seen:
+                continue
+            seen.add(id(parent))
+            if parent.component != "":
+                return self._component == parent.component
+            parents.extend(reversed(parent.parent))
+        return self._component == ""
 
+    def signature(self):
+        """Return a key that is the same for filters that pick the same tree.
+
+        Returns:
+            tuple: The customer, labels, not labels and component.
+        """
+        return (
+            self._customer,
+            tuple(sorted(self._label)),
+            tuple(sorted(self._not_label)),
+            self._component,
+        )
 
     @staticmethod
     def has_label(req, labels):
@@ -1,7 +1,9 @@
 """Contains classes that deal with validation of the Standard."""
 
+import io
 import os
 
+from littleR import report as report_formats
 from littleR.requirement import Requirement
 
 class Validator:
@@ -14,10 +16,22 @@ class Validator:
     This class can be used to perform custom validation rules by creating
     extensions of the ValidatorTest class.
 
+    The notes about a file or a requirement can be given a tag, the name of
+    the check that made them. clear_file() and clear_index() remove the
+    notes of a file or requirement, all of them or those of one tag, and
+    clear_tag() those of one tag everywhere, so a check can be done again
+    without reading the standard.
+
+    The report is made from the stream of notes given by records(), so it
+    is written straight to disk in each format, see littleR.report.
+
     Attributes:
         _path (str): The path to the directory where the validation report
             will be saved.
         _problem_count (int): The number of problems found during validation.
+        _revision (int): The number of notes added, see revision().
+        _marks (list): The (problem, tag) of each note in notes.
+        _formats (list<str>): The formats written by write_report().
         notes (list): A list of notes for the validation report.
         file_notes (dict): A dictionary of notes for each file.
         index_notes (dict): A dictionary of notes for each index
@@ -52,46 +66,56 @@ class Validator:
 
         # set the problem count to zero
         self._problem_count = 0
+        self._revision = 0
+        self._formats = [report_formats.TEXT]
 
         # create store for notes and validators
+        self._marks = []
         self.notes = []
         self.file_notes = {}
         self.index_notes = {}
 
-    def note(self, message, problem=False):
+    def note(self, message, problem=False, tag=None):
         """Add a note to the validation report.
 
         Args:
             message (str): The message to add to the report.
             problem (bool): True if the note is a problem, False otherwise.
+            tag (str): The check that made the note. Optional.
 
         Raises:
-            TypeError: If the message is not a string or the problem is not a boolean
+            TypeError: If the message is not a string, the problem is not a
+                boolean, or the tag is not a string.
         """
         # verify input
         if not isinstance(message, str):
             raise TypeError("message must be a string")
         if not isinstance(problem, bool):
             raise TypeError("problem must be a boolean")
+        if tag is not None and not isinstance(tag, str):
+            raise TypeError("tag must be a string")
 
         # add the message to the notes
         self.notes.append(message)
+        self._marks.append((problem, tag))
+        self._revision += 1
 
         # count the problem if it is one
         if problem:
             self._problem_count += 1
 
-    def file_note(self, file_path, message, problem=False):
+    def file_note(self, file_path, message, problem=False, tag=None):
         """Add a note to the validation report for a specific file.
 
         Args:
             file_path (str): The file to add the note about.
             message (str): The message to add to the report.
             problem (bool): True if the note is a problem, False otherwise.
+            tag (str): The check that made the note, see clear_file(). Optional.
 
         Raises:
             TypeError: If the file_path is not a string, the message is not a string,
-                or the problem is not a boolean.
+                the problem is not a boolean, or the tag is not a string.
         """
         # verify input
         if not isinstance(file_path, str) or not os.path.isfile(file_path):
@@ -100,6 +124,8 @@ class Validator:
             raise TypeError("message must be a string")
         if not isinstance(problem, bool):
             raise TypeError("problem must be a boolean")
+        if tag is not None and not isinstance(tag, str):
+            raise TypeError("tag must be a string")
 
         # get the file note, f
         if file_path in self.file_notes:
@@ -109,23 +135,26 @@ class Validator:
             self.file_notes[file_path] = f
 
         # add the message to the folio validator
-        f.note(message)
+        f.note(message, problem, tag)
+        self._revision += 1
 
         # count the problem if it is one
         if problem:
             self._problem_count += 1
 
-    def index_note(self, requirement, message, problem=False):
+    def index_note(self, requirement, message, problem=False, tag=None):
         """Add a note to the validation report for a specific requirement.
 
         Args:
             requirement (Requirement): The requirement (index) to add the note about.
             message (str): The message to add to the report.
             problem (bool): True if the note is a problem, False otherwise.
+            tag (str): The check that made the note, see clear_index(). Optional.
 
         Raises:
             TypeError: If the requirement is not a valid instance of Requirement,
-                the message is not a string, or the problem is not a boolean.
+                the message is not a string, the problem is not a boolean, or
+                the tag is not a string.
         """
         # verify input
         if not isinstance(requirement, Requirement):
@@ -134,7 +163,143 @@ class Validator:
             raise TypeError("message must be a string")
         if not isinstance(problem, bool):
             raise TypeError("problem must be a boolean")
+        if tag is not None and not isinstance(tag, str):
+            raise TypeError("tag must be a string")
+
+        # add the message to the index note
+        self._get_index_note(requirement).note(message, problem, tag)
+        self._revision += 1
+
+        # count the problem if it is one
+        if problem:
+            self._problem_count += 1
+
+    def index_note_batch(self, notes, tag=None):
+        """Add many notes to the validation report for specific requirements.
+
+        The same as calling index_note() for each note, in order.
+
+        Args:
+            notes (list): (requirement, message, problem) tuples.
+            tag (str): The check that made the notes, see clear_index(). Optional.
+
+        Raises:
+            TypeError: If notes is not a list, or a note is not valid, see index_note().
+        """
+        # verify input
+        if not isinstance(notes, list):
+            raise TypeError("notes must be a list")
+        if tag is not None and not isinstance(tag, str):
+            raise TypeError("tag must be a string")
+        for note in notes:
+            if not isinstance(note, tuple) or len(note) != 3:
+                raise TypeError("notes must be (requirement, message, problem) tuples")
+            requirement, message, problem = note
+            if not isinstance(requirement, Requirement):
+                raise TypeError("requirement must be an instance of Requirement")
+            if not isinstance(message, str):
+                raise TypeError("message must be a string")
+            if not isinstance(problem, bool):
+                raise TypeError("problem must be a boolean")
+
+        # notes for the same requirement share the lookup
+        last = None
+        index_note = None
+        for requirement, message, problem in notes:
+            if requirement is not last:
+                index_note = self._get_index_note(requirement)
+                last = requirement
+            index_note.note(message, problem, tag)
+            self._revision += 1
+            if problem:
+                self._problem_count += 1
+
+    def clear_file(self, file_path, tag=None):
+        """Remove the notes about a file and the requirements in it.
+
+        Args:
+            file_path (str): The file the notes are about.
+            tag (str): Only remove the notes with this tag. None removes all.
+
+        Returns:
+            int: The number of notes removed.
+        """
+        f = self.file_notes.get(file_path)
+        if f is None:
+            return 0
+
+        removed, problems = f.clear(tag)
+        emptied = set()
+        for index_note in f.index_notes:
+            count, index_problems = index_note.clear(tag)
+            removed += count
+            problems += index_problems
+            if len(index_note.notes) == 0:
+                emptied.add(id(index_note))
+
+        # forget the index notes with nothing left
+        if len(emptied) > 0:
+            for index, index_note in list(self.index_notes.items()):
+                if id(index_note) in emptied:
+                    del self.index_notes[index]
+            for other in list(self.file_notes.values()):
+                for index_note in list(other.index_notes):
+                    if id(index_note) in emptied:
+                        other.remove_index_note(index_note)
+        if f.empty():
+            del self.file_notes[file_path]
+        self._removed(removed, problems)
+        return removed
+
+    def clear_tag(self, tag):
+        """Remove the notes with a tag from the report, every file and requirement.
+
+        Args:
+            tag (str): The tag of the notes to remove.
 
+        Returns:
+            int: The number of notes removed.
+        """
+        removed, problems = _clear(self, tag)
+        self._removed(removed, problems)
+        for file_path in list(self.file_notes.keys()):
+            removed += self.clear_file(file_path, tag)
+        return removed
+
+    def clear_index(self, requirement, tag=None):
+        """Remove the notes about a requirement.
+
+        Args:
+            requirement (Requirement|str): The requirement, or its index.
+            tag (str): Only remove the notes with this tag. None removes all.
+
+        Returns:
+            int: The number of notes removed.
+        """
+        index = requirement
+        if isinstance(requirement, Requirement):
+            index = requirement.index
+        index_note = self.index_notes.get(index)
+        if index_note is None:
+            return 0
+
+        removed, problems = index_note.clear(tag)
+        if len(index_note.notes) == 0:
+            # forget the index note, and its file if nothing is left
+            del self.index_notes[index]
+            for path, f in list(self.file_notes.items()):
+                if f.remove_index_note(index_note) and f.empty():
+                    del self.file_notes[path]
+        self._removed(removed, problems)
+        return removed
+
+    def _removed(self, removed, problems):
+        # the report changed if a note was removed
+        if removed > 0:
+            self._revision += 1
+        self._problem_count -= problems
+
+    def _get_index_note(self, requirement):
         # get the file note, f
         path = requirement.path()
         if path in self.file_notes:
@@ -150,15 +315,17 @@ class Validator:
             i = IndexNote(requirement)
             self.index_notes[requirement.index] = i
 
-        # add the message to the index note
-        i.note(message)
-
         # ensure the index validator is linked to the folio validator
         f.add_index_note(i)
+        return i
 
-        # count the problem if it is one
-        if problem:
-            self._problem_count += 1
+    def revision(self):
+        """Get a number that changes whenever a note is added or removed.
+
+        Returns:
+            int: The revision of the notes.
+        """
+        return self._revision
 
     def problem_count(self):
         """Get the number of problems found during validation.
@@ -168,24 +335,95 @@ class Validator:
         """
         return self._problem_count
 
+    def note_count(self):
+        """Get the number of notes in the report.
+
+        Returns:
+            int: The number of notes, problems or not.
+        """
+        count = len(self.notes)
+        for f in self.file_notes.values():
+            count += len(f.notes)
+            for index_note in f.index_notes:
+                count += len(index_note.notes)
+        return count
+
+    def records(self):
+        """Give each note of the report, in the order of the text report.
+
+        The notes about the standard, then for each file the notes about
+        the file and the notes of each requirement in it.
+
+        Yields:
+            dict: The severity, file, index, rule and message of the note,
+                see littleR.report.
+        """
+        for message, (problem, tag) in zip(self.notes, self._marks):
+            yield _record(problem, None, None, tag, message)
+        for f in self.file_notes.values():
+            file = f.relative_path()
+            for message, (problem, tag) in f.marked_notes():
+                yield _record(problem, file, None, tag, message)
+            for index_note in f.index_notes:
+                index = index_note.index()
+                for message, (problem, tag) in index_note.marked_notes():
+                    yield _record(problem, file, index, tag, message)
+
     def report(self):
         """Create a validation report.
 
         Returns:
             str: The validation report.
         """
-        report = "Validation Report\n"
-        report += "Problems: " + str(self._problem_count) + "\n\n"
-        for note in self.notes:
-            report += note + "\n"
-        if len(self.notes) > 0:
-            report += "\n"
-        for f in self.file_notes.values():
-            report += f.report()
-        return report.strip()
+        stream = io.StringIO()
+        self.stream_report(stream)
+        return stream.getvalue()
+
+    def stream_report(self, stream, fmt=report_formats.TEXT):
+        """Write the validation report to a stream, one note at a time.
+
+        Args:
+            stream (file): The text stream to write to.
+            fmt (str): The format, one of littleR.report.FORMATS.
+
+        Raises:
+            ValueError: If the format is not known.
+        """
+        if not report_formats.valid_format(fmt):
+            raise ValueError(f"fmt must be one of {report_formats.FORMATS}")
+
+        writer = report_formats.report_writer(
+            fmt, stream, self._problem_count, self.note_count()
+        )
+        for record in self.records():
+            writer.write(record)
+        writer.close()
+
+    def set_report_formats(self, formats):
+        """Set the formats written by write_report().
 
-    def write_report(self):  # TODO: test this method
-        """Write the validation report to a file.
+        Args:
+            formats (list<str>): The formats, see littleR.report.FORMATS.
+
+        Raises:
+            TypeError: If formats is not a list.
+            ValueError: If a format is not known or the list is empty.
+        """
+        # verify the input
+        if not isinstance(formats, list):
+            raise TypeError("formats must be a list")
+        if len(formats) == 0:
+            raise ValueError("at least one format must be given")
+        for fmt in formats:
+            if not report_formats.valid_format(fmt):
+                raise ValueError(f"formats must be in {report_formats.FORMATS}")
+
+        self._formats = list(formats)
+
+    def write_report(self):
+        """Write the validation report to a file in each format.
+
+        See set_report_formats(), the text report is written by default.
 
         Raises:
             TypeError: If the path is not a string.
@@ -195,17 +433,15 @@ class Validator:
         if not isinstance(self._path, str):
             raise TypeError("The path must be a string.")
 
-        # create the report
-        report = self.report()
-
-        # write the report to a file
-        report_file = os.path.join(self._path, "validation_report.txt")
-        try:
-            os.makedirs(self._path, exist_ok=True)
-            with open(report_file, "w", encoding="utf-8") as f:
-                f.write(report)
-        except Exception as e:
-            raise ValueError("The report file could not be written.") from e
+        # write each report to a file, one note at a time
+        for fmt in self._formats:
+            report_file = self.report_path(fmt)
+            try:
+                os.makedirs(self._path, exist_ok=True)
+                with open(report_file, "w", encoding="utf-8") as f:
+                    self.stream_report(f, fmt)
+            except Exception as e:
+                raise ValueError("The report file could not be written.") from e
 
     def path(self):
         """Get the path to the directory where the validation report will be saved.
@@ -215,13 +451,21 @@ class Validator:
         """
         return self._path
 
-    def report_path(self):  # TODO: test this method
+    def report_path(self, fmt=report_formats.TEXT):
         """Get the path to the validation report.
 
+        Args:
+            fmt (str): The format of the report, one of littleR.report.FORMATS.
+
         Returns:
             str: The path to the validation report.
+
+        Raises:
+            ValueError: If the format is not known.
         """
-        return os.path.join(self.path(), "validation_report.txt")
+        if not report_formats.valid_format(fmt):
+            raise ValueError(f"fmt must be one of {report_formats.FORMATS}")
+        return os.path.join(self.path(), report_formats.FILE_NAMES[fmt])
 
     def __str__(self):
         return "Validator"
@@ -232,6 +476,7 @@ class FileNote:
 
     Attributes:
         _path (str): The file that the notes are about.
+        _marks (list): The (problem, tag) of each note.
         notes (list): A list of notes for the file.
         index_notes (list): A list of index validators for the file.
     """
@@ -250,14 +495,18 @@ class FileNote:
             raise TypeError("file_path must be a valid file path.")
 
         self._path = file_path
+        self._marks = []
         self.notes = []
         self.index_notes = []
+        self._index_note_ids = set()
 
-    def note(self, message):
+    def note(self, message, problem=False, tag=None):
         """Add a note to the file notes.
 
         Args:
             message (str): The message to add to the notes.
+            problem (bool): True if the note is a problem, False otherwise.
+            tag (str): The check that made the note. Optional.
 
         Raises:
             TypeError: If the message is not a string.
@@ -268,6 +517,57 @@ class FileNote:
 
         # add the message to the notes
         self.notes.append(message)
+        self._marks.append((problem, tag))
+
+    def clear(self, tag=None):
+        """Remove the notes about the file, not those of its index notes.
+
+        Args:
+            tag (str): Only remove the notes with this tag. None removes all.
+
+        Returns:
+            tuple: The number of notes and of problems removed.
+        """
+        return _clear(self, tag)
+
+    def marked_notes(self):
+        """Get the notes with their (problem, tag) marks.
+
+        Returns:
+            zip: The (message, (problem, tag)) of each note.
+        """
+        return zip(self.notes, self._marks)
+
+    def relative_path(self):
+        """Get the path of the file as it is shown in the report.
+
+        Returns:
+            str: The path relative to the working directory, with "/".
+        """
+        return os.path.relpath(self._path, os.getcwd()).replace("\\", "/")
+
+    def remove_index_note(self, index_note):
+        """Remove an index note from the file.
+
+        Args:
+            index_note (IndexNote): The index note to remove.
+
+        Returns:
+            bool: True if the index note was in the file, False otherwise.
+        """
+        if id(index_note) not in self._index_note_ids:
+            return False
+        self._index_note_ids.discard(id(index_note))
+        self.index_notes = [i for i in self.index_notes if i is not index_note]
+        return True
+
+    def empty(self):
+        """Check if the file has no notes and no index notes.
+
+        Returns:
+            bool: True if there is nothing to report, False otherwise.
+        """
+        return len(self.notes) == 0 and len(self.index_notes) == 0
 
     def add_index_note(self, index_note):
         """Add an index validator to the file.
@@ -286,8 +586,9 @@ class FileNote:
         if not isinstance(index_note, IndexNote):
             raise TypeError("index_note must be an instance of IndexValidator")
 
-        # add the index validator to the list
-        if index_note not in self.index_notes:
+        # add the index validator to the list, each one once
+        if id(index_note) not in self._index_note_ids:
+            self._index_note_ids.add(id(index_note))
             self.index_notes.append(index_note)
 
     def report(self):
@@ -296,8 +597,7 @@ class FileNote:
         Returns:
             str: The report for the file's portion.
         """
-        relative_path = os.path.relpath(self._path, os.getcwd()).replace("\\", "/")
-        report = f"File: {relative_path}\n"
+        report = f"File: {self.relative_path()}\n"
         for note in self.notes:
             report += "\t\t" + note + "\n"
         report += "\n"
@@ -311,6 +611,7 @@ class IndexNote:
 
     Attributes:
         _requirement (Requirement): The requirement object that the notes are about.
+        _marks (list): The (problem, tag) of each note.
         notes (list): A list of notes for the index.
     """
 
@@ -329,13 +630,16 @@ class IndexNote:
             raise TypeError("requirement must be an instance of Requirement")
 
         self._requirement = requirement
+        self._marks = []
         self.notes = []
 
-    def note(self, message):
+    def note(self, message, problem=False, tag=None):
         """Add a note to the index notes.
 
         Args:
             message (str): The message to add to the notes.
+            problem (bool): True if the note is a problem, False otherwise.
+            tag (str): The check that made the note. Optional.
 
         Raises:
             TypeError: If the message is not a string.
@@ -345,6 +649,34 @@ class IndexNote:
             raise TypeError("message must be a string")
 
         self.notes.append(message)
+        self._marks.append((problem, tag))
+
+    def clear(self, tag=None):
+        """Remove the notes about the index.
+
+        Args:
+            tag (str): Only remove the notes with this tag. None removes all.
+
+        Returns:
+            tuple: The number of notes and of problems removed.
+        """
+        return _clear(self, tag)
+
+    def marked_notes(self):
+        """Get the notes with their (problem, tag) marks.
+
+        Returns:
+            zip: The (message, (problem, tag)) of each note.
+        """
+        return zip(self.notes, self._marks)
+
+    def index(self):
+        """Get the index the notes are about.
+
+        Returns:
+            str: The index of the requirement.
+        """
+        return self._requirement.index
 
     def report(self):
         """Create a report for the index's portion.
@@ -369,3 +701,33 @@ class IndexNote:
         if not isinstance(other, Validator):
             return False
         return self._path == other._path
+
+
+def _clear(notes, tag):
+    # remove the notes of a FileNote or IndexNote with the tag, or all of them
+    kept = []
+    kept_marks = []
+    removed = 0
+    problems = 0
+    for message, mark in zip(notes.notes, notes._marks):  # pylint: disable=protected-access
+        problem, note_tag = mark
+        if tag is None or note_tag == tag:
+            removed += 1
+            problems += int(problem)
+        else:
+            kept.append(message)
+            kept_marks.append(mark)
+    notes.notes = kept
+    notes._marks = kept_marks  # pylint: disable=protected-access
+    return removed, problems
+
+
+def _record(problem, file, index, tag, message):
+    # a note as littleR.report expects it
+    return {
+        "severity": report_formats.PROBLEM if problem else report_formats.NOTE,
+        "file": file,
+        "index": index,
+        "rule": tag,
+        "message": message,
+    }
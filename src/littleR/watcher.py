@@ -0,0 +1,322 @@
+"""Watcher class for the littleR project."""
+
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+
+from littleR.folio import stat_file
+
+# inotify event masks, see inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+INOTIFY = "inotify"
+POLL = "poll"
+BACKENDS = [INOTIFY, POLL]
+
+
+class Watcher:  # pylint: disable=too-many-instance-attributes
+    """The Watcher class refreshes a standard when its files change.
+
+    A background thread watches the project and customer folders of the
+    standard. inotify is used where it is available, otherwise the folios
+    are polled for a new modification time or size. A burst of changes is
+    collected until the folders are quiet for the delay, then the standard
+    is refreshed once, in place, while holding the lock.
+
+    Attributes:
+        _standard (Standard): The standard to refresh.
+        _lock (RLock): The lock held while the standard is refreshed.
+        _delay (float): Seconds without changes before refreshing.
+        _interval (float): Seconds between polls with the poll backend.
+        _on_refresh (callable): Called with the changed paths after a refresh.
+        _backend (str): The backend in use, inotify or poll.
+        _thread (Thread): The background thread.
+        _stop (Event): Set to stop the background thread.
+        refresh_count (int): The number of refreshes that found changes.
+    """
+
+    def __init__(
+        self,
+        standard,
+        lock=None,
+        delay=0.2,
+        interval=0.5,
+        on_refresh=None,
+        backend=None,
+    ):  # pylint: disable=too-many-arguments
+        """Create a new Watcher object.
+
+        Args:
+            standard (Standard): The standard to refresh. It must be read.
+            lock (RLock): The lock held while the standard is refreshed.
+                A new lock is used if None.
+            delay (float): Seconds without changes before refreshing.
+            interval (float): Seconds between polls with the poll backend.
+            on_refresh (callable): Called with the list of changed paths
+                after each refresh that found changes. Optional.
+            backend (str): inotify or poll. If None, inotify is used
+                when it is available.
+
+        Raises:
+            TypeError: If the standard does not have a refresh method.
+            ValueError: If delay or interval is not a positive number.
+            ValueError: If the backend is not known or not available.
+        """
+        # verify the input
+        if not callable(getattr(standard, "refresh", None)):
+            raise TypeError("standard must be a Standard")
+        if not isinstance(delay, (int, float)) or delay <= 0:
+            raise ValueError("delay must be a positive number")
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError("interval must be a positive number")
+        if on_refresh is not None and not callable(on_refresh):
+            raise TypeError("on_refresh must be callable")
+        if backend is None:
+            backend = INOTIFY if inotify_available() else POLL
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}")
+        if backend == INOTIFY and not inotify_available():
+            raise ValueError("inotify is not available")
+
+        self._standard = standard
+        self._lock = lock if lock is not None else threading.RLock()
+        self._delay = delay
+        self._interval = interval
+        self._on_refresh = on_refresh
+        self._backend = backend
+        self._thread = None
+        self._stop = threading.Event()
+        self.refresh_count = 0
+
+    def start(self):
+        """Start watching in a background thread.
+
+        Returns:
+            Watcher: The Watcher object.
+        """
+        if self.running():
+            return self
+
+        self._stop.clear()
+        if self._backend == INOTIFY:
+            target = self._run_inotify
+        else:
+            target = self._run_poll
+        self._thread = threading.Thread(
+            target=target, name="littleR-watcher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop watching and wait for the background thread.
+
+        Args:
+            timeout (float): Seconds to wait for the thread. None waits.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def running(self):
+        """Check if the watcher is running.
+
+        Returns:
+            bool: True if the background thread is running, False otherwise.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def backend(self):
+        """Get the backend in use.
+
+        Returns:
+            str: inotify or poll.
+        """
+        return self._backend
+
+    def refresh(self):
+        """Refresh the standard now, holding the lock.
+
+        Errors are added to the validator so the thread keeps running.
+
+        Returns:
+            list: The paths that changed.
+        """
+        with self._lock:
+            try:
+                changed = self._standard.refresh()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                message = f"Error refreshing standard: {e}"
+                self._standard.validator().note(message, problem=True)
+                return []
+
+        if len(changed) > 0:
+            self.refresh_count += 1
+            if self._on_refresh is not None:
+                self._on_refresh(changed)
+        return changed
+
+    # poll backend
+
+    def _signature(self):
+        # the state of every folio under the watched folders
+        signature = {}
+        for folder in self._standard.get_source_paths():
+            for root, _, files in os.walk(folder):
+                for file in files:
+                    if file.endswith(".yaml"):
+                        path = os.path.join(root, file)
+                        signature[path] = stat_file(path)
+        return signature
+
+    def _run_poll(self):
+        signature = self._signature()
+        while not self._stop.wait(self._interval):
+            current = self._signature()
+            if current == signature:
+                continue
+
+            # wait for the burst of changes to end
+            while not self._stop.wait(self._delay):
+                settled = self._signature()
+                if settled == current:
+                    break
+                current = settled
+            if self._stop.is_set():
+                return
+
+            self.refresh()
+            signature = current
+
+    # inotify backend
+
+    def _run_inotify(self):
+        fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            self._run_poll()
+            return
+
+        try:
+            watches = {}
+            for folder in self._standard.get_source_paths():
+                self._add_watches(fd, folder, watches)
+
+            pending = False
+            last_event = 0.0
+            while not self._stop.is_set():
+                timeout = self._delay if pending else 0.5
+                ready, _, _ = select.select([fd], [], [], timeout)
+                if ready:
+                    if self._read_events(fd, watches):
+                        pending = True
+                        last_event = time.monotonic()
+                    continue
+
+                # quiet for the delay, refresh once for the whole burst
+                if pending and time.monotonic() - last_event >= self._delay:
+                    pending = False
+                    self.refresh()
+        finally:
+            os.close(fd)
+
+    def _add_watches(self, fd, folder, watches):
+        # watch the folder and every folder below it
+        for root, _, _ in os.walk(folder):
+            wd = _libc.inotify_add_watch(fd, os.fsencode(root), IN_WATCH_MASK)
+            if wd >= 0:
+                watches[wd] = root
+
+    def _read_events(self, fd, watches):
+        # read the events, return True if any could change a folio
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        relevant = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            start = offset + EVENT_HEADER.size
+            name_bytes = data[start : start + length]
+            offset = start + length
+            name = os.fsdecode(name_bytes.rstrip(b"\0"))
+
+            if mask & IN_Q_OVERFLOW:
+                relevant = True
+                continue
+
+            # a new folder needs its own watch
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and wd in watches:
+                    self._add_watches(fd, os.path.join(watches[wd], name), watches)
+                relevant = True
+                continue
+
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                watches.pop(wd, None)
+                relevant = True
+                continue
+
+            if name.endswith(".yaml"):
+                relevant = True
+        return relevant
+
+    def __str__(self):
+        return f"Watcher({self._backend})"
+
+    def __repr__(self):
+        return "Watcher"
+
+
+def inotify_available():
+    """Check if inotify can be used.
+
+    Returns:
+        bool: True if inotify is available, False otherwise.
+    """
+    return _libc is not None
+
+
+def _load_libc():
+    # inotify is only on linux, reached through the c library
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32
+        ]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
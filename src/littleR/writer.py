@@ -0,0 +1,228 @@
+"""Writer class for the littleR project."""
+
+import time
+import threading
+
+
+class Writer:  # pylint: disable=too-many-instance-attributes
+    """The Writer class writes a standard in a background thread.
+
+    Edits mark the standard with request(), which returns at once. The
+    thread waits until there have been no requests for the delay, so a
+    burst of edits is written once, then writes the standard while holding
+    the lock. flush() waits until every request made before it is written.
+
+    Errors are added to the validator of the standard and kept for status().
+
+    Attributes:
+        _standard (Standard): The standard to write.
+        _lock (RLock): The lock held while the standard is written.
+        _delay (float): Seconds without requests before writing.
+        _patch (bool): Passed to Standard.write().
+        _condition (Condition): Guards the counters below and wakes the thread.
+        _requested (int): The number of requests made.
+        _written (int): The number of requests written, successful or not.
+        _last_request (float): The monotonic time of the last request.
+        _flushing (bool): True if a flush is waiting, the delay is skipped.
+        _thread (Thread): The background thread.
+        _stop (bool): Set to stop the background thread.
+        write_count (int): The number of writes done.
+        error_count (int): The number of writes that failed.
+        last_error (str): The error of the last write that failed, if any.
+        last_write (float): The time.time() of the last write, if any.
+    """
+
+    def __init__(self, standard, lock=None, delay=0.5, patch=True):
+        """Create a new Writer object.
+
+        Args:
+            standard (Standard): The standard to write. It must be read.
+            lock (RLock): The lock held while the standard is written.
+                A new lock is used if None.
+            delay (float): Seconds without requests before writing.
+            patch (bool): Passed to Standard.write(), True writes only the
+                requirements that changed.
+
+        Raises:
+            TypeError: If the standard does not have a write method.
+            ValueError: If delay is not a positive number.
+            TypeError: If patch is not a boolean.
+        """
+        # verify the input
+        if not callable(getattr(standard, "write", None)):
+            raise TypeError("standard must be a Standard")
+        if not isinstance(delay, (int, float)) or isinstance(delay, bool) or delay <= 0:
+            raise ValueError("delay must be a positive number")
+        if not isinstance(patch, bool):
+            raise TypeError("patch must be a boolean")
+
+        self._standard = standard
+        self._lock = lock if lock is not None else threading.RLock()
+        self._delay = delay
+        self._patch = patch
+        self._condition = threading.Condition()
+        self._requested = 0
+        self._written = 0
+        self._last_request = 0.0
+        self._flushing = False
+        self._thread = None
+        self._stop = False
+        self.write_count = 0
+        self.error_count = 0
+        self.last_error = None
+        self.last_write = None
+
+    def start(self):
+        """Start writing in a background thread.
+
+        Returns:
+            Writer: The Writer object.
+        """
+        if self.running():
+            return self
+
+        with self._condition:
+            self._stop = False
+        self._thread = threading.Thread(
+            target=self._run, name="littleR-writer", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Write what was requested, then stop the background thread.
+
+        Args:
+            timeout (float): Seconds to wait for the thread. None waits.
+        """
+        self.flush(timeout)
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def running(self):
+        """Check if the writer is running.
+
+        Returns:
+            bool: True if the background thread is running, False otherwise.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def request(self):
+        """Ask for the standard to be written.
+
+        Returns at once. Without a running thread the standard is written now.
+        """
+        with self._condition:
+            self._requested += 1
+            self._last_request = time.monotonic()
+            self._condition.notify_all()
+        if not self.running():
+            self.flush()
+
+    def pending(self):
+        """Check if there are requests that are not written yet.
+
+        Returns:
+            bool: True if a write is waiting, False otherwise.
+        """
+        with self._condition:
+            return self._written < self._requested
+
+    def flush(self, timeout=None):
+        """Wait until every request made so far is written.
+
+        Without a running thread the standard is written in this thread.
+        Do not hold the lock while flushing, the thread needs it to write.
+
+        Args:
+            timeout (float): Seconds to wait. None waits.
+
+        Returns:
+            bool: True if the requests are written, False on a timeout.
+        """
+        if not self.running():
+            with self._condition:
+                target = self._requested
+            if self._written < target:
+                self._write(target)
+            return True
+
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            target = self._requested
+            self._flushing = True
+            self._condition.notify_all()
+            while self._written < target and self.running():
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            self._flushing = False
+            return self._written >= target
+
+    def status(self):
+        """Get the state of the writer.
+
+        Returns:
+            dict: running, pending, write_count, error_count, last_error and
+                last_write (time.time(), or None).
+        """
+        with self._condition:
+            pending = self._written < self._requested
+        return {
+            "running": self.running(),
+            "pending": pending,
+            "write_count": self.write_count,
+            "error_count": self.error_count,
+            "last_error": self.last_error,
+            "last_write": self.last_write,
+        }
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # wait for a request, then for the burst to end
+                while not self._stop and self._written >= self._requested:
+                    self._condition.wait()
+                while not self._stop and not self._flushing:
+                    quiet = time.monotonic() - self._last_request
+                    if quiet >= self._delay:
+                        break
+                    self._condition.wait(self._delay - quiet)
+                if self._stop:
+                    return
+                target = self._requested
+
+            self._write(target)
+
+    def _write(self, target):
+        # write the standard, errors are noted so the thread keeps running
+        error = None
+        with self._lock:
+            try:
+                self._standard.write(patch=self._patch)
+                failed = self._standard.write_errors()
+                if len(failed) > 0:
+                    error = f"Error writing file: {', '.join(failed)}"
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                error = f"Error writing standard: {e}"
+                self._standard.validator().note(error, problem=True)
+
+        with self._condition:
+            self.write_count += 1
+            self.last_write = time.time()
+            if error is not None:
+                self.error_count += 1
+                self.last_error = error
+            self._written = max(self._written, target)
+            self._condition.notify_all()
+
+    def __str__(self):
+        return f"Writer({self.write_count} writes, {self.error_count} errors)"
+
+    def __repr__(self):
+        return "Writer"
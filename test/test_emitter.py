@@ -0,0 +1,107 @@
+from context import littleR
+from littleR import emitter
+from littleR import requirement as requirement_module
+from littleR.emitter import dump_requirement
+from littleR.folio import read_folio
+from littleR.requirement import Requirement
+
+import ruamel.yaml
+from ruamel.yaml.scalarstring import LiteralScalarString
+
+from context_files import *
+
+
+def ruamel_dump(index, content):
+    yaml = ruamel.yaml.YAML(typ=["rt", "string"])
+    return yaml.dump_to_string({index: content})
+
+
+def golden_requirements():
+    # every requirement in the example and the test support folders
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    folders = [os.path.join(root, "example"), os.path.join(root, "test", "support")]
+    for folder in folders:
+        for path, _, files in os.walk(folder):
+            for file in sorted(files):
+                if not file.endswith(".yaml") or file == "config.yaml":
+                    continue
+                file_path = os.path.join(path, file)
+                for value in read_folio(file_path)["requirements"]:
+                    yield Requirement.factory(file_path, value)
+
+
+def test_emitter_golden(monkeypatch):
+    # the emitter writes the same text as ruamel for every requirement
+    requirements = list(golden_requirements())
+    assert len(requirements) > 20
+
+    fallback = []
+
+    def spy(index, content):
+        text = dump_requirement(index, content)
+        if text is None:
+            fallback.append(index)
+        return text
+
+    monkeypatch.setattr(requirement_module, "dump_requirement", spy)
+    emitted = [req.to_yaml() for req in requirements]
+    assert fallback == []
+
+    monkeypatch.setattr(requirement_module, "dump_requirement", lambda i, c: None)
+    expected = [req.to_yaml() for req in requirements]
+    assert emitted == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        "true",
+        "123",
+        "null",
+        "#hash",
+        "- dash",
+        "a: b",
+        "trailing space ",
+        " leading space",
+        "two  spaces",
+        "it's",
+        "line\nbreak",
+        "tab\there",
+        "unicode é ü",
+        "word " * 40,
+        "x" * 100 + " y",
+        "short " + "x" * 90,
+        "'" + "quoted " * 20 + "'",
+        ("[" + "abc " * 30).strip(),
+        ("#" + "abc " * 30 + " ").strip() + " ",
+        LiteralScalarString(""),
+        LiteralScalarString("one\ntwo"),
+        LiteralScalarString("one\ntwo\n"),
+        LiteralScalarString("one\n\ntwo\n"),
+        LiteralScalarString("one\ntwo\n\n"),
+        LiteralScalarString(" indented\ntext"),
+        LiteralScalarString("\nleading break"),
+        LiteralScalarString("trailing spaces  \n  and more  "),
+    ],
+)
+def test_emitter_scalars(value):
+    content = {"enabled": True, "title": value, "child_idx": []}
+    text = dump_requirement("r00000001", content)
+    assert text is None or text == ruamel_dump("r00000001", content)
+
+
+def test_emitter_lists():
+    content = {"label": ["alpha", "two words", "", "true", "x" * 90]}
+    assert dump_requirement("r00000001", content) is None
+    content = {"label": ["alpha", "two words", "", "true"]}
+    assert dump_requirement("r00000001", content) == ruamel_dump("r00000001", content)
+
+
+def test_emitter_fallback():
+    # values the emitter does not write are left to ruamel
+    assert dump_requirement("r00000001", {"title": 1}) is None
+    assert dump_requirement("r00000001", {"title": "it's\nnext"}) is None
+    assert dump_requirement("a: b", {"title": "text"}) is None
+    assert dump_requirement("r00000001", {"title": LiteralScalarString("kept\n\n")}) is None
+    assert emitter.WIDTH == 80
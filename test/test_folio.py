@@ -1,5 +1,5 @@
 from context import littleR
-from littleR.folio import Folio
+from littleR.folio import Folio, block_spans, index_folio, replace_file, sync_directories
 from littleR.validate import Validator
 from littleR.requirement import Requirement
 
@@ -113,3 +113,148 @@ def test_folio_link_and_write(scratch_path, requirement_yaml):
     with open(software_file, "r") as file:
         data = file.read()
     assert data == software_yaml
+
+
+def test_folio_fast_loader(software_file, duplicate_file, scratch_path):
+    # the fast loader makes the same requirements as the round trip loader
+    v = Validator(scratch_path)
+    round_trip = Folio(software_file, v).parse_file()
+    fast = Folio(software_file, v, loader="fast").parse_file()
+    assert [r.to_dict() for r in fast] == [r.to_dict() for r in round_trip]
+
+    # duplicated indices are still found
+    folio = Folio(duplicate_file, v, loader="fast")
+    assert folio.valid() == False
+
+    with pytest.raises(ValueError):
+        Folio(software_file, v, loader="slow")
+
+
+def test_folio_lazy(software_file, duplicate_file, scratch_path):
+    # a lazy folio makes the same requirements, the text is read on first use
+    v = Validator(scratch_path)
+    eager = Folio(software_file, v).parse_file()
+    lazy = Folio(software_file, v, lazy=True).parse_file()
+    assert lazy[0].is_loaded() == False
+    assert [r.to_dict() for r in lazy] == [r.to_dict() for r in eager]
+    assert lazy[0].is_loaded() == True
+
+    # a file that is not simple is parsed, duplicated indices are still found
+    assert index_folio(duplicate_file) is None
+    folio = Folio(duplicate_file, v, lazy=True)
+    assert folio.valid() == False
+
+    # the text is still found when the file changes before it is used
+    path = os.path.join(scratch_path, "software.yaml")
+    shutil.copy(software_file, path)
+    req = Folio(path, v, lazy=True).parse_file()[0]
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# moved\n" + text.replace("Software Title", "Changed Title"))
+    assert req.title == "Changed Title"
+
+    with pytest.raises(TypeError):
+        Folio(software_file, v, lazy="yes")
+
+
+def test_folio_patch(scratch_path):
+    # only the changed block is written, comments and other blocks are kept
+    text = (
+        "# top comment\n"
+        "r00000001:\n  type: software\n  title: First.\n\n"
+        "# about the second\n"
+        "r00000002:\n  type: software\n  title:   Kept   as is.\n\n"
+        "r00000003:\n  type: software\n  title: Third.\n"
+    )
+    spans = block_spans(text)
+    assert list(spans.keys()) == ["r00000001", "r00000002", "r00000003"]
+    start, end = spans["r00000002"]
+    assert text[start:end] == "r00000002:\n  type: software\n  title:   Kept   as is."
+    assert block_spans("r00000001: {type: software}") is None
+    assert block_spans("  indented: first") is None
+
+    path = os.path.join(scratch_path, "software.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    v = Validator(scratch_path)
+    folio = Folio(path, v)
+    first, second, third = folio.parse_file()
+
+    # change the first, remove the third, add a fourth
+    first.title = "Changed."
+    fourth = Requirement.factory(path, {"index": "r00000004", "type": "software"})
+    assert folio.patch_file([first, second, fourth], {"r00000001", "r00000004"})
+    with open(path, "r", encoding="utf-8") as f:
+        written = f.read()
+    assert written == (
+        "# top comment\n"
+        + first.to_yaml()
+        + "\n\n# about the second\n"
+        "r00000002:\n  type: software\n  title:   Kept   as is."
+        "\n\n" + fourth.to_yaml()
+    )
+
+    # the spans follow the written text
+    second.title = "Changed too."
+    assert folio.patch_file([first, second, fourth], {"r00000002"})
+    with open(path, "r", encoding="utf-8") as f:
+        patched = f.read()
+    assert patched == written.replace(
+        "r00000002:\n  type: software\n  title:   Kept   as is.", second.to_yaml()
+    )
+
+    # a file without the simple layout must be written whole
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("r00000001: {type: software, title: Flow.}\n")
+    folio = Folio(path, v)
+    assert folio.patch_file(folio.parse_file(), {"r00000001"}) == False
+
+
+def test_folio_replace_file(scratch_path, monkeypatch):
+    # the file is replaced in one step and keeps its permissions
+    path = os.path.join(scratch_path, "software.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("old")
+    os.chmod(path, 0o640)
+
+    directories = set()
+    replace_file(path, "new", directories)
+    assert directories == {os.path.abspath(scratch_path)}
+    sync_directories(directories)
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == "new"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(scratch_path) == ["software.yaml"]
+
+    # a new file gets the permissions of the umask
+    new_path = os.path.join(scratch_path, "service.yaml")
+    umask = os.umask(0o027)
+    try:
+        replace_file(new_path, "new")
+    finally:
+        os.umask(umask)
+    assert os.stat(new_path).st_mode & 0o777 == 0o640
+    os.remove(new_path)
+
+    # a failed write leaves the old file and no temporary file
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        replace_file(path, "lost")
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == "new"
+    assert os.listdir(scratch_path) == ["software.yaml"]
+
+    # the folio reports the error and keeps what it read
+    v = Validator(scratch_path)
+    shutil.copy(os.path.join(os.path.dirname(__file__), "support", "file", "software.yaml"), path)
+    folio = Folio(path, v)
+    for req in folio.parse_file():
+        req.title = "Changed."
+        folio.link_requirement(req)
+    folio.write_file()
+    assert v.problem_count() == 1
+    assert not folio.changed()
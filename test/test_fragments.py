@@ -0,0 +1,58 @@
+from context import littleR
+from littleR.interface.viewR.fragments import FragmentCache
+from littleR.requirement import Requirement
+from littleR.standard import Standard
+
+from context_files import *
+
+
+class CountingTemplate:
+    # a template that counts its renders
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, context, request=None):
+        self.renders += 1
+        return f"{context['idx']} {context['req'].title}"
+
+
+def test_fragment_cache(software_file, scratch_path):
+    s = Standard("Fragments", scratch_path)
+    for i in range(1, 4):
+        data = {"index": f"r0000000{i}", "type": "software", "title": f"Title {i}."}
+        s.add_requirement(Requirement.factory(software_file, data))
+    reqs = list(s.requirements_iter())
+
+    cache = FragmentCache(max_size=3)
+    template = CountingTemplate()
+
+    def render(req, idx):
+        context = {"req": req, "depth": 1, "idx": idx}
+        return cache.render("item", template, context, None, s.requirement_revision(req))
+
+    # the second view is joined from the cache
+    for _ in range(2):
+        assert [render(req, str(i)) for i, req in enumerate(reqs)] == [
+            "0 Title 1.", "1 Title 2.", "2 Title 3."
+        ]
+    assert template.renders == 3
+    assert cache.status()["hits"] == 3 and cache.status()["misses"] == 3
+
+    # an edit renders the requirement again, so does a new place in the tree
+    revision = s.requirement_revision(reqs[0])
+    reqs[0].update_from_dict({"title": "Edited."})
+    assert s.requirement_revision(reqs[0]) > revision
+    assert render(reqs[0], "0") == "0 Edited."
+    assert render(reqs[1], "9") == "9 Title 2."
+    assert template.renders == 5
+
+    # the fragment used longest ago is dropped
+    assert len(cache) == 3
+    assert cache.status()["evictions"] == 2
+    render(reqs[2], "2")
+    assert template.renders == 5
+    render(reqs[1], "1")
+    assert template.renders == 6
+
+    cache.clear()
+    assert len(cache) == 0 and cache.status()["hits"] == 0
@@ -0,0 +1,234 @@
+from context import littleR
+from littleR.graph import Graph
+from littleR.requirement import Requirement
+from littleR.standard import Standard
+from littleR.tree import Tree
+from littleR.tree_filter import TreeFilter
+
+from context_files import *
+
+
+def test_graph_links(project_4_directory, scratch_path):
+    s = Standard("Graph", scratch_path).read(project_4_directory)
+    graph = s.graph()
+    assert len(graph) == len(list(s.requirements_iter()))
+    assert graph.backend() in ["numpy", "array"]
+
+    # the graph holds the same links, in the same order
+    for req in s.requirements_iter():
+        node = graph.node(req)
+        assert graph.requirement(node) is req
+        for relation in ["parent", "child", "related"]:
+            linked = [graph.requirement(n) for n in graph.neighbors(node, relation)]
+            assert linked == list(getattr(req, relation))
+            assert graph.degree(node, relation) == len(linked)
+    assert graph.edge_count("parent") == graph.edge_count("child")
+
+    with pytest.raises(ValueError):
+        graph.neighbors(0, "sibling")
+    with pytest.raises(TypeError):
+        Graph(None)
+
+    # a new index shares its int_index with another, each keeps its node
+    first = s.get_requirement("r00000001")
+    data = {"index": "new1", "type": "software"}
+    new = Requirement.factory(first.path(), data)
+    s.add_requirement(new)
+    graph = s.graph()
+    assert graph.requirement(graph.node(first)) is first
+    for req in s.requirements_iter():
+        assert graph.requirement(graph.node(req)) is req
+    assert new in s.component_top(s.component(new))
+
+
+def test_graph_revision(project_4_directory, scratch_path):
+    s = Standard("Graph", scratch_path).read(project_4_directory)
+    graph = s.graph()
+    assert s.graph() is graph
+
+    # a changed link builds the graph again
+    parent = next(r for r in s.requirements_iter() if len(r.child) > 0)
+    child = parent.child[0]
+    parent.delete_relationship(child.index)
+    rebuilt = s.graph()
+    assert rebuilt is not graph
+    children = rebuilt.children(rebuilt.node(parent))
+    assert child not in [rebuilt.requirement(n) for n in children]
+
+    # the tree walks the graph
+    tree = Tree(s, TreeFilter({}))
+    assert tree.children(parent) == [c for c in parent.child]
+
+    # links changed outside the standard keep its graph
+    other = Standard("Other", scratch_path).read(project_4_directory)
+    other_req = next(r for r in other.requirements_iter() if len(r.child) > 0)
+    other_req.delete_relationship(other_req.child[0].index)
+    data = {"index": "r00000099", "type": "software"}
+    loose = Requirement.factory(parent.path(), data)
+    loose.add_link("child", parent)
+    assert s.graph() is rebuilt
+
+
+def test_graph_cycles(software_file, scratch_path):
+    # r1 -> r2 -> r3 -> r1 is a cycle, r4 is its own child, r5 is not in one
+    s = Standard("Cycles", scratch_path)
+    links = {1: [2], 2: [3], 3: [1, 5], 4: [4], 5: []}
+    for i, children in links.items():
+        data = {"index": f"r0000000{i}", "type": "software"}
+        data["child_idx"] = [f"r0000000{c}" for c in children]
+        s.add_requirement(Requirement.factory(software_file, data))
+    s.relink([f"r0000000{i}" for i in links])
+
+    cycles = [[req.index for req in cycle] for cycle in s.cycles()]
+    assert cycles == [["r00000001", "r00000002", "r00000003"], ["r00000004"]]
+    notes = s.validator().index_notes["r00000001"].notes
+    assert notes == ["Parent and child cycle: r00000001, r00000002, r00000003."]
+    assert s.validator().problem_count() == 2
+
+    # the components come children first, r5 before the cycle above it
+    graph = s.graph()
+    node = {req.index: graph.node(req) for req in s.requirements_iter()}
+    assert graph.component(node["r00000001"]) == graph.component(node["r00000003"])
+    assert graph.component(node["r00000005"]) < graph.component(node["r00000001"])
+    assert graph.is_back_edge(node["r00000003"], node["r00000001"])
+
+    # the tree breaks the cycle at the link back to where it started
+    tree = Tree(s, TreeFilter({}))
+    r1, r3 = s.get_requirement("r00000001"), s.get_requirement("r00000003")
+    assert tree.children(r3) == [s.get_requirement("r00000005")]
+    assert r1 in tree.top()
+
+    # removing a link removes the problem
+    r3.delete_relationship("r00000001")
+    r1.delete_relationship("r00000003")
+    s.relink(["r00000001", "r00000003"])
+    assert s.validator().problem_count() == 1
+
+
+def test_graph_components(software_file, scratch_path):
+    # r1 (engine) -> r2 -> r3 (body) -> r4, r2 -> r4, r5 has no parent
+    s = Standard("Components", scratch_path)
+    links = {1: [2], 2: [3, 4], 3: [4], 4: [], 5: []}
+    owned = {1: "engine", 3: "body"}
+    for i, children in links.items():
+        data = {"index": f"r0000000{i}", "type": "software"}
+        data["child_idx"] = [f"r0000000{c}" for c in children]
+        if i in owned:
+            data["component"] = owned[i]
+        s.add_requirement(Requirement.factory(software_file, data))
+    s.relink([f"r0000000{i}" for i in links])
+
+    # the first parent with a component decides
+    components = s.components()
+    assert components == {
+        "r00000001": "engine",
+        "r00000002": "engine",
+        "r00000003": "body",
+        "r00000004": "engine",
+        "r00000005": "",
+    }
+    assert s.components() is components
+    r2, r4 = s.get_requirement("r00000002"), s.get_requirement("r00000004")
+
+    # the walk gives the same answer and leaves the links as they were
+    engine = TreeFilter({"component": "engine"})
+    parents = r4.parent
+    assert engine.component(r4)
+    assert engine.component(r4, components)
+    assert r4.parent == parents
+
+    # an edit finds the components again
+    r2.update_from_dict({"component": "body"})
+    assert s.component(r4) == "body"
+
+    tree = Tree(s, TreeFilter({"component": "body"}))
+    assert [req.index for req in tree.top()] == ["r00000002"]
+    assert [req.index for req in tree.children(r2)] == ["r00000003", "r00000004"]
+
+    # the tops of every component are found once for the components
+    assert [req.index for req in s.component_top("engine")] == ["r00000001"]
+    assert [req.index for req in s.component_top("")] == ["r00000005"]
+    assert s.component_top("wheel") == []
+    tops = s._component_tops
+    assert [req.index for req in tree.top()] == ["r00000002"]
+    assert s._component_tops is tops
+
+
+def test_tree_nodes(software_file, scratch_path):
+    # r1 -> r2 -> r3, r1 -> r4, r5 has no parent
+    s = Standard("Nodes", scratch_path)
+    links = {1: [2, 4], 2: [3], 3: [], 4: [], 5: []}
+    for i, children in links.items():
+        data = {"index": f"r0000000{i}", "type": "software"}
+        data["child_idx"] = [f"r0000000{c}" for c in children]
+        s.add_requirement(Requirement.factory(software_file, data))
+    s.relink([f"r0000000{i}" for i in links])
+
+    nodes = Tree(s, TreeFilter({})).nodes()
+    assert [(n.requirement.index, n.depth, n.outline) for n in nodes] == [
+        ("r00000001", 1, "1"),
+        ("r00000002", 2, "1.1"),
+        ("r00000003", 3, "1.1.1"),
+        ("r00000004", 2, "1.2"),
+        ("r00000005", 1, "2"),
+    ]
+    assert [n.outline for n in Tree(s, TreeFilter({})).nodes(2)] == [
+        "1", "1.1", "1.2", "2"
+    ]
+
+    # a new tree with the same filter gets the kept nodes
+    assert Tree(s, TreeFilter({})).nodes() is nodes
+
+    # an edit to the text keeps them, an edit to the labels does not
+    r3 = s.get_requirement("r00000003")
+    r3.update_from_dict({"requirement": "The engine shall start."})
+    assert Tree(s, TreeFilter({})).nodes() is nodes
+    r3.add_label("hidden")
+    assert Tree(s, TreeFilter({})).nodes() is not nodes
+    hidden = Tree(s, TreeFilter({"not_label": {"hidden"}})).nodes()
+    assert [n.outline for n in hidden] == ["1", "1.1", "1.2", "2"]
+
+    # so does a change to the links
+    r1, r4 = s.get_requirement("r00000001"), s.get_requirement("r00000004")
+    s.relink(r1.delete_relationship("r00000004") + r4.delete_relationship("r00000001"))
+    assert [n.outline for n in Tree(s, TreeFilter({})).nodes()] == [
+        "1", "1.1", "1.1.1", "2", "3"
+    ]
+
+
+def test_tree_top(software_file, customer_file, scratch_path):
+    # c1 (customer) -> r2 -> r3, c1 -> r4, r5 has no parent
+    s = Standard("Top", scratch_path)
+    links = {1: [2, 4], 2: [3], 3: [], 4: [], 5: []}
+    for i, children in links.items():
+        data = {"index": f"r0000000{i}", "type": "customer" if i == 1 else "software"}
+        data["child_idx"] = [f"r0000000{c}" for c in children]
+        path = customer_file if i == 1 else software_file
+        s.add_requirement(Requirement.factory(path, data))
+    s.relink([f"r0000000{i}" for i in links])
+
+    def scan(tree_filter):
+        # the top as found by looking at every requirement
+        return [req.index for req in s.requirements_iter() if tree_filter.top(req)]
+
+    def top(tree_filter):
+        return [req.index for req in Tree(s, tree_filter).top()]
+
+    others, customer = TreeFilter({}), TreeFilter({"customer": "customer"})
+    assert top(others) == scan(others) == [
+        "r00000001", "r00000002", "r00000004", "r00000005"
+    ]
+    assert top(customer) == scan(customer) == ["r00000001", "r00000005"]
+    assert s.customer_name(s.get_requirement("r00000001")) == "customer"
+
+    # the top follows the edits without a new scan
+    r1, r4 = s.get_requirement("r00000001"), s.get_requirement("r00000004")
+    s.relink(r1.delete_relationship("r00000004") + r4.delete_relationship("r00000001"))
+    r3 = s.get_requirement("r00000003")
+    s.relink(r3.add_relationship("r00000005", "parent"))
+    r1.update_from_dict({"type": "software"})
+    data = {"index": "r00000006", "type": "software"}
+    s.add_requirement(Requirement.factory(software_file, data))
+    for tree_filter in [others, customer]:
+        assert top(tree_filter) == scan(tree_filter)
+    assert top(others) == ["r00000001", "r00000004", "r00000005", "r00000006"]
@@ -0,0 +1,85 @@
+from context import littleR
+from littleR.reach import Reachability, from_bits, to_bits
+from littleR.requirement import Requirement
+from littleR.standard import Standard
+
+from context_files import *
+
+
+def reach_standard(software_file, scratch_path):
+    # r1 -> r2 -> r4, r1 -> r3 -> r4, r5 -> r6
+    s = Standard("Reach", scratch_path)
+    links = {1: [2, 3], 2: [4], 3: [4], 4: [], 5: [6], 6: []}
+    for i, children in links.items():
+        data = {"index": f"r0000000{i}", "type": "software"}
+        data["child_idx"] = [f"r0000000{c}" for c in children]
+        s.add_requirement(Requirement.factory(software_file, data))
+    s.relink([f"r0000000{i}" for i in links])
+    return s
+
+
+def indices(reqs):
+    return [req.index for req in reqs]
+
+
+def test_reach_bits():
+    assert to_bits([]) == 0
+    assert to_bits([0, 3, 9]) == 0b1000001001
+    assert from_bits(to_bits([0, 3, 9, 700])) == [0, 3, 9, 700]
+    assert from_bits(0) == []
+
+
+def test_reach_queries(software_file, scratch_path):
+    s = reach_standard(software_file, scratch_path)
+    assert indices(s.descendants("r00000001")) == ["r00000002", "r00000003", "r00000004"]
+    assert indices(s.ancestors("r00000004")) == ["r00000001", "r00000002", "r00000003"]
+    assert indices(s.impacted_by({"r00000002", "r00000005"})) == ["r00000004", "r00000006"]
+    assert s.descendants("r00000004") == []
+
+    reach = s.reachability()
+    graph = s.graph()
+    r1, r4 = s.get_requirement("r00000001"), s.get_requirement("r00000004")
+    assert reach.reaches(graph.node(r1), graph.node(r4))
+    assert not reach.reaches(graph.node(r4), graph.node(r1))
+
+    with pytest.raises(ValueError):
+        s.descendants("r00000099")
+
+
+def test_reach_relink(software_file, scratch_path):
+    s = reach_standard(software_file, scratch_path)
+    assert indices(s.descendants("r00000005")) == ["r00000006"]
+    assert indices(s.descendants("r00000001")) == ["r00000002", "r00000003", "r00000004"]
+    reach = s.reachability()
+
+    # a new link keeps the reachability, and only drops what it touches
+    r4 = s.get_requirement("r00000004")
+    s.relink(r4.add_relationship("r00000005", "child"))
+    assert s.reachability() is reach
+    assert indices(s.descendants("r00000005")) == ["r00000006"]
+    assert indices(s.descendants("r00000001")) == [
+        "r00000002",
+        "r00000003",
+        "r00000004",
+        "r00000005",
+        "r00000006",
+    ]
+    assert indices(s.ancestors("r00000006")) == [
+        "r00000001",
+        "r00000002",
+        "r00000003",
+        "r00000004",
+        "r00000005",
+    ]
+
+    # removing the link is seen as well
+    s.relink(r4.delete_relationship("r00000005"))
+    assert indices(s.ancestors("r00000006")) == ["r00000005"]
+
+    # a new requirement makes a new reachability
+    data = {"index": "r00000007", "type": "software", "parent_idx": ["r00000006"]}
+    s.add_requirement(Requirement.factory(software_file, data))
+    s.relink(["r00000006", "r00000007"])
+    assert s.reachability() is not reach
+    assert indices(s.ancestors("r00000007")) == ["r00000005", "r00000006"]
+    assert isinstance(s.reachability(), Reachability)
@@ -48,6 +48,38 @@ def test_requirement(software_file, requirement_data, requirement_yaml):
     assert req.to_yaml() == yaml
 
 
+def test_requirement_compact(software_file, customer_file, requirement_data):
+    # empty fields are shared until they change, short strings are interned
+    req = Requirement.factory(customer_file, requirement_data["new_requirement"])
+    other = Requirement()
+    assert not hasattr(req, "__dict__")
+    assert req.label is other.label
+    assert req.parent is other.parent
+
+    req.add_label("Label1")
+    assert req.label == {"label1"}
+    assert other.label == set()
+    req.delete_label("label1")
+    assert req.label is other.label
+
+    full = Requirement.factory(software_file, requirement_data["requirement"])
+    copy = Requirement.factory(software_file, requirement_data["requirement"])
+    assert full.component is copy.component
+    assert next(iter(full.parent_idx)) is next(iter(copy.parent_idx))
+
+    # links are added once and removed by identity
+    req.add_link("child", full)
+    req.add_link("child", full)
+    assert req.child == (full,)
+    assert other.child == ()
+    req.unlink({id(full)})
+    assert req.child is other.child
+    with pytest.raises(ValueError):
+        req.add_link("sibling", full)
+    with pytest.raises(TypeError):
+        req.add_link("child", "r00000045")
+
+
 valid_index_data = [
     # index, expected
     ("r00000000", True),
@@ -0,0 +1,94 @@
+from context import littleR
+from littleR import rules
+from littleR.folio import Folio
+from littleR.requirement import Requirement
+from littleR.rules import Rule
+from littleR.standard import Standard
+
+from context_files import *
+
+
+def rules_standard(software_file, scratch_path):
+    s = Standard("Rules", scratch_path)
+    customer = {"index": "r00000001", "type": "customer", "requirement": "It shall go."}
+    software = {
+        "index": "r00000002",
+        "type": "software",
+        "requirement": "It goes.",
+        "label": ["x" * 31, "short"],
+    }
+    s.add_requirement(Requirement.factory(software_file, customer))
+    s.add_requirement(Requirement.factory(software_file, software))
+    return s
+
+
+def test_rules_registry():
+    names = [rule.name for rule in rules.get_rules()]
+    assert names[:3] == ["shall", "label_length", "customer_children"]
+    assert [r.name for r in rules.get_rules(phase=rules.GRAPH)] == ["customer_children"]
+
+    @rules.register("test_rule", problem=False)
+    def test_rule(data):
+        return None
+
+    assert rules.get_rules(["test_rule"])[0].problem is False
+    assert rules.unregister("test_rule")
+    assert not rules.unregister("test_rule")
+    with pytest.raises(ValueError):
+        rules.get_rules(["test_rule"])
+    with pytest.raises(ValueError):
+        Rule("bad", test_rule, phase="file")
+    with pytest.raises(TypeError):
+        Rule("bad", None)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rules_check(software_file, scratch_path, jobs):
+    s = rules_standard(software_file, scratch_path)
+    timings = s.check(jobs=jobs)
+    assert set(timings) == {rule.name for rule in rules.get_rules()}
+    assert s.rule_timings() == timings
+
+    v = s.validator()
+    assert v.index_notes["r00000001"].notes == ["Customer requirement has no children."]
+    assert v.index_notes["r00000002"].notes == [
+        "Requirement text does not use 'shall'.",
+        f"Label is longer than 30 characters: {'x' * 31}.",
+    ]
+    assert v.problem_count() == 2
+
+    # a second check does not repeat the notes
+    s.check(["shall"])
+    assert len(v.index_notes["r00000002"].notes) == 2
+
+
+def test_rules_revalidate(software_file, scratch_path):
+    s = rules_standard(software_file, scratch_path)
+    s.check(["shall"])
+    req = s.get_requirement("r00000002")
+    req.requirement = "It shall go."
+    assert "r00000002" not in s.validator().index_notes
+    req.requirement = "It goes."
+    assert s.validator().index_notes["r00000002"].notes == [
+        "Requirement text does not use 'shall'."
+    ]
+
+
+
+def test_rules_empty_fields(scratch_path):
+    # an empty requirement field is read as None
+    path = os.path.join(scratch_path, "software.yaml")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("r00000001:\n  type: software\n  title: Empty\n  requirement:\n")
+    s = Standard("Rules", scratch_path)
+    for req in Folio(path, s.validator()).parse_file():
+        s.add_requirement(req)
+    assert s.get_requirement("r00000001").to_dict()["requirement"] is None
+
+    # the check runs, an empty requirement is not a problem
+    s.check()
+    assert "r00000001" not in s.validator().index_notes
+
+    for data in [{"requirement": None, "label": None}, {"requirement": 42, "label": [7]}]:
+        assert rules.shall(data) is None
+        assert rules.label_length(data) == []
@@ -0,0 +1,120 @@
+import json
+
+from context import littleR
+from littleR.folio import read_folio
+from littleR.snapshot import Snapshot
+from littleR.standard import Standard
+
+from context_files import *
+
+
+def test_snapshot_put_get(software_file, scratch_path):
+    file_path = os.path.join(scratch_path, "software.yaml")
+    shutil.copy(software_file, file_path)
+    contents = read_folio(file_path)
+
+    snapshot = Snapshot(os.path.join(scratch_path, ".cache"))
+    assert snapshot.get(file_path) is None
+    snapshot.put(file_path, contents)
+    assert file_path in snapshot
+    assert snapshot.get(file_path) == contents
+
+    # saved and loaded again
+    assert snapshot.save() == True
+    assert os.path.isfile(snapshot.path())
+    loaded = Snapshot(os.path.join(scratch_path, ".cache")).load()
+    assert len(loaded) == 1
+    assert loaded.get(file_path) == contents
+
+    # touching the file without changing it keeps the entry
+    stat = os.stat(file_path)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    touched = loaded.get(file_path)
+    assert touched["requirements"] == contents["requirements"]
+    assert touched["stat"] == (stat.st_mtime_ns + 1_000_000_000, stat.st_size)
+
+    # changing the file misses
+    with open(file_path, "a", encoding="utf-8") as file:
+        file.write("\n")
+    assert loaded.get(file_path) is None
+
+    # removed files are pruned
+    loaded.prune([])
+    assert len(loaded) == 0
+
+
+def test_snapshot_plain_data(scratch_path):
+    # block scalars keep their style, tuples stay tuples
+    file_path = os.path.join(scratch_path, "software.yaml")
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(
+            "r00000001:\n  type: software\n  title: Blocks\n"
+            "  requirement: |\n    It shall\n    go.\n"
+            "  description: >\n    folded text\n    more\n"
+        )
+    contents = read_folio(file_path)
+    snapshot = Snapshot(os.path.join(scratch_path, ".cache"))
+    snapshot.put(file_path, contents)
+    assert snapshot.save() == True
+    loaded = Snapshot(os.path.join(scratch_path, ".cache")).load().get(file_path)
+    assert loaded == contents
+    data, read = loaded["requirements"][0], contents["requirements"][0]
+    assert type(data["requirement"]) is type(read["requirement"])
+    assert data["description"].fold_pos == read["description"].fold_pos
+    assert type(loaded["stat"]) is tuple
+
+    # a type that is not plain data is not stored
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write("r00000001:\n  type: software\n  title: Float\n  weight: 1.50\n")
+    snapshot.put(file_path, read_folio(file_path))
+    assert file_path not in snapshot
+
+    # an entry that is not as it was saved is left out
+    with open(snapshot.path(), "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "version": Snapshot.VERSION,
+                "entries": {file_path: {"mtime_ns": "0", "contents": {"$code": "x"}}},
+            },
+            file,
+        )
+    assert len(Snapshot(os.path.join(scratch_path, ".cache")).load()) == 0
+
+
+def test_snapshot_invalid(scratch_path):
+    with pytest.raises(TypeError):
+        Snapshot(42)
+
+    # a corrupt snapshot is empty
+    os.makedirs(os.path.join(scratch_path, ".cache"), exist_ok=True)
+    snapshot = Snapshot(os.path.join(scratch_path, ".cache"))
+    with open(snapshot.path(), "w", encoding="utf-8") as file:
+        file.write("not a snapshot")
+    assert len(snapshot.load()) == 0
+
+    with pytest.raises(TypeError):
+        snapshot.put(42, {})
+    with pytest.raises(TypeError):
+        snapshot.put("path", None)
+
+
+def test_snapshot_standard(project_4_directory, scratch_path):
+    # a cached read matches a read from the files
+    project_path = os.path.join(scratch_path, "project_4")
+    shutil.copytree(project_4_directory, project_path)
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+
+    plain = Standard("Plain", output_path).read(project_path)
+    cold = Standard("Cold", output_path).read(project_path, cache=True)
+    assert os.path.isfile(os.path.join(output_path, ".cache", "standard.json"))
+    warm = Standard("Warm", output_path).read(project_path, cache=True)
+
+    for s in [cold, warm]:
+        assert s.validator().report() == plain.validator().report()
+        assert [r.to_dict() for r in s.requirements_iter()] == [
+            r.to_dict() for r in plain.requirements_iter()
+        ]
+
+    with pytest.raises(TypeError):
+        Standard("Cache", output_path).read(project_path, cache="yes")
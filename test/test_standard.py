@@ -1,5 +1,5 @@
 from context import littleR
-from littleR.folio import Folio
+from littleR.folio import Folio, block_spans
 from littleR.validate import Validator
 from littleR.requirement import Requirement
 from littleR.standard import Standard
@@ -112,3 +112,368 @@ def test_standard_read_project_5(project_5_directory, scratch_path, reports_text
     print(f"\n{s.validator().report()}\n")
     compare_text(s.validator().report(), reports_text["standard_read_project_5"])
     assert s.validator().report() == reports_text["standard_read_project_5"]
+
+
+def test_standard_read_jobs(project_4_directory, scratch_path):
+    # reading with a process pool must match a serial read
+    serial = Standard("Serial", scratch_path).read(project_4_directory)
+    pooled = Standard("Pooled", scratch_path).read(project_4_directory, jobs=2)
+    assert pooled.validator().report() == serial.validator().report()
+    assert pooled.file_count() == serial.file_count()
+    serial_reqs = [req.to_dict() for req in serial.requirements_iter()]
+    pooled_reqs = [req.to_dict() for req in pooled.requirements_iter()]
+    assert pooled_reqs == serial_reqs
+
+    s = Standard("Jobs", scratch_path)
+    with pytest.raises(TypeError):
+        s.read(project_4_directory, jobs="2")
+    with pytest.raises(TypeError):
+        s.read(project_4_directory, jobs=True)
+    with pytest.raises(ValueError):
+        s.read(project_4_directory, jobs=0)
+
+
+def test_standard_read_loader(project_4_directory, scratch_path):
+    # the fast loader reads the same standard but it is read only
+    round_trip = Standard("Round Trip", scratch_path).read(project_4_directory)
+    fast = Standard("Fast", scratch_path).read(project_4_directory, loader="fast")
+    assert fast.validator().report() == round_trip.validator().report()
+    assert [r.to_dict() for r in fast.requirements_iter()] == [
+        r.to_dict() for r in round_trip.requirements_iter()
+    ]
+    with pytest.raises(ValueError):
+        fast.write()
+    with pytest.raises(ValueError):
+        Standard("Loader", scratch_path).read(project_4_directory, loader="slow")
+
+
+def test_standard_read_lazy(project_4_directory, scratch_path):
+    # a lazy read loads the text when it is used and reads the same standard
+    eager = Standard("Eager", scratch_path).read(project_4_directory)
+    lazy = Standard("Lazy", scratch_path).read(project_4_directory, lazy=True)
+    assert not any(r.is_loaded() for r in lazy.requirements_iter())
+
+    req = lazy.get_requirement("r00000003")
+    assert req.title == eager.get_requirement("r00000003").title
+    assert req.is_loaded()
+    assert lazy.get_requirement("r00000002").is_loaded() is False
+
+    assert lazy.validator().report() == eager.validator().report()
+    assert [r.to_dict() for r in lazy.requirements_iter()] == [
+        r.to_dict() for r in eager.requirements_iter()
+    ]
+    with pytest.raises(TypeError):
+        Standard("Lazy", scratch_path).read(project_4_directory, lazy=1)
+
+
+def test_standard_read_lazy_write(project_4_directory, scratch_path):
+    # the text is loaded before the files are written
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+    eager = Standard("Eager", output_path).read(project_4_directory)
+    lazy = Standard("Lazy", output_path).read(project_4_directory, lazy=True)
+    lazy.write()
+    assert all(r.is_loaded() for r in lazy.requirements_iter())
+    assert [r.to_dict()["title"] for r in lazy.requirements_iter()] == [
+        r.to_dict()["title"] for r in eager.requirements_iter()
+    ]
+
+
+def test_standard_link_missing(software_file, scratch_path):
+    # every missing index is dropped and noted, the rest are linked once
+    s = Standard("Link", scratch_path)
+    parent = Requirement.factory(software_file, {"index": "r00000001", "type": "software"})
+    data = {
+        "index": "r00000002",
+        "type": "software",
+        "parent_idx": ["r00000008", "r00000009", "r00000001"],
+    }
+    child = Requirement.factory(software_file, data)
+    s.add_requirement(parent)
+    s.add_requirement(child)
+    s.relink(["r00000001", "r00000002"])
+    s.relink(["r00000001", "r00000002"])
+
+    assert child.parent_idx == {"r00000001"}
+    assert child.parent == (parent,)
+    assert parent.child == (child,)
+    notes = s.validator().index_notes["r00000002"].notes
+    assert notes == ["Parent index not found: r00000008.", "Parent index not found: r00000009."]
+    assert s.validator().problem_count() == 2
+
+
+def test_standard_write_dirty(project_4_directory, scratch_path):
+    # after the first write only changed folios and new notes are written
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+    s = Standard("Dirty", output_path).read(project_4_directory)
+    s.write()
+    written = sorted(os.listdir(output_path))
+    assert "software.yaml" in written and "service.yaml" in written
+    for name in written:
+        os.remove(os.path.join(output_path, name))
+
+    # nothing changed, nothing is written
+    s.write()
+    assert os.listdir(output_path) == []
+
+    # a label changes one folio
+    req = next(r for r in s.requirements_iter() if r.path().endswith("software.yaml"))
+    req.add_label("dirty")
+    s.write()
+    assert os.listdir(output_path) == ["software.yaml"]
+
+    # moving a requirement writes both folios, a note writes the report
+    os.remove(os.path.join(output_path, "software.yaml"))
+    service = next(p for p in s.get_folio_paths() if p.endswith("service.yaml"))
+    with open(service, "w", encoding="utf-8") as f:
+        f.write("")
+    req.update_from_dict({"path": service})
+    s.validator().note("Moved.")
+    s.write()
+    assert sorted(os.listdir(output_path)) == [
+        "service.yaml",
+        "software.yaml",
+        "validation_report.txt",
+    ]
+    with open(service, "r", encoding="utf-8") as f:
+        assert f"{req.index}:" in f.read()
+
+
+def test_standard_write_patch(project_4_directory, scratch_path):
+    # a patch only writes the blocks of the changed requirements
+    project_path = os.path.join(scratch_path, "project_4")
+    shutil.copytree(project_4_directory, project_path)
+    service = os.path.join(project_path, "project", "service.yaml")
+    with open(service, "r", encoding="utf-8") as f:
+        text = "# kept\n" + f.read()
+    with open(service, "w", encoding="utf-8") as f:
+        f.write(text)
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+
+    s = Standard("Patch", output_path).read(project_path, lazy=True)
+    s.write(patch=True)
+    with open(os.path.join(output_path, "software.yaml"), "r", encoding="utf-8") as f:
+        software = f.read()
+
+    # the new requirement is written in place under its index
+    assert "new03" not in software
+    assert software.startswith("r0000") and software.index("\nr00000004:") > 0
+
+    # one title changes one block, a requirement is only loaded to be written
+    service_output = os.path.join(output_path, "service.yaml")
+    with open(service_output, "r", encoding="utf-8") as f:
+        before = f.read()
+    start, end = block_spans(before)["r00000002"]
+    req = s.get_requirement("r00000002")
+    assert not req.is_loaded()
+    req.title = "Patched."
+    s.write(patch=True)
+    with open(service_output, "r", encoding="utf-8") as f:
+        patched = f.read()
+    assert patched.startswith("# kept\n")
+    assert patched == before[:start] + req.to_yaml() + before[end:]
+
+    with pytest.raises(TypeError):
+        s.write(patch=1)
+
+
+def _bump_file(path, text):
+    # write the file with a later modification time so the change is seen
+    stat = os.stat(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_standard_refresh(project_4_directory, scratch_path):
+    project_path = os.path.join(scratch_path, "project_4")
+    shutil.copytree(project_4_directory, project_path)
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+
+    s = Standard("Refresh", output_path).read(project_path)
+    assert s.refresh() == []
+    acme = s.get_requirement("r00000003")
+
+    # change a title and add a new child of the customer requirement
+    software = os.path.join(project_path, "project", "software.yaml")
+    with open(software, "r", encoding="utf-8") as f:
+        text = f.read()
+    text = text.replace("YAML file format.", "YAML file format, changed.")
+    text += "\n\nr00000020:\n  type: software\n  title: Added.\n"
+    text += "  requirement: The software shall be added.\n"
+    text += "  parent_idx:\n  - r00000003\n"
+    _bump_file(software, text)
+
+    assert s.refresh() == [software]
+    assert s.get_requirement("r00000004").title == "YAML file format, changed."
+    added = s.get_requirement("r00000020")
+    assert added is not None
+    assert acme in added.parent
+    assert added in acme.child
+
+    # the new requirement from the old file was given a new index, and the
+    # requirements of the other files are linked to the new objects
+    service_1 = s.get_requirement("r00000001")
+    software_reqs = [r for r in s.requirements_iter() if r.path().endswith("software.yaml")]
+    assert len(software_reqs) == 3
+    for req in software_reqs:
+        if service_1 in req.parent:
+            assert any(c is req for c in service_1.child)
+    assert len(service_1.child) == 2
+
+    # removing the file removes the requirements and their links
+    os.unlink(software)
+    assert s.refresh() == [software]
+    assert s.get_requirement("r00000004") is None
+    assert s.get_requirement("r00000020") is None
+    assert len(service_1.child) == 0
+    assert added not in acme.child
+    assert s.file_count() == 2
+
+
+def test_standard_refresh_keeps_edits(project_4_directory, scratch_path):
+    project_path = os.path.join(scratch_path, "project_4")
+    shutil.copytree(project_4_directory, project_path)
+    s = Standard("Refresh").read(project_path)
+    problems = s.validator().problem_count()
+
+    # an unsaved edit is kept when its file changes on disk, the other
+    # files are read again
+    software = os.path.join(project_path, "project", "software.yaml")
+    service = os.path.join(project_path, "project", "service.yaml")
+    s.get_requirement("r00000004").add_label("mine")
+    with open(software, "r", encoding="utf-8") as f:
+        _bump_file(software, f.read() + "\n")
+    with open(service, "r", encoding="utf-8") as f:
+        _bump_file(service, f.read() + "\n")
+    assert s.refresh() == [service]
+    assert "mine" in s.get_requirement("r00000004").label
+    assert s.validator().problem_count() == problems + 1
+    assert s.refresh() == []
+    assert s.validator().problem_count() == problems + 1
+
+    # the newer file is not written over either
+    s.write(patch=True)
+    assert s.write_errors() == [software]
+    with open(software, "r", encoding="utf-8") as f:
+        assert "mine" not in f.read()
+    assert s.conflicts() == [software]
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_standard_resolve_conflict(project_4_directory, scratch_path):
+    project_path = os.path.join(scratch_path, "project_4")
+    shutil.copytree(project_4_directory, project_path)
+    s = Standard("Resolve").read(project_path)
+    problems = s.validator().problem_count()
+    software = os.path.join(project_path, "project", "software.yaml")
+    req = s.get_requirement("r00000004")
+
+    # a forced write keeps the edits and writes them over the file
+    req.add_label("mine")
+    _bump_file(software, _read(software) + "\n")
+    assert s.refresh() == []
+    assert s.conflicts() == [software]
+    s.write(patch=True, force=True)
+    assert s.write_errors() == []
+    assert s.conflicts() == []
+    assert s.validator().problem_count() == problems
+    assert "mine" in _read(software)
+
+    # then the folio is written and read again as before
+    req.add_label("next")
+    s.write(patch=True)
+    assert s.write_errors() == []
+    assert "next" in _read(software)
+    _bump_file(software, _read(software) + "\n")
+    assert s.refresh() == [software]
+    req = s.get_requirement("r00000004")
+    assert "next" in req.label
+
+    # a reload drops the edits and reads the file on disk, the write
+    # dropped the broken link the file had
+    problems = s.validator().problem_count()
+    req.add_label("lost")
+    _bump_file(software, _read(software) + "\n")
+    assert s.refresh() == []
+    assert s.conflicts() == [software]
+    with pytest.raises(ValueError):
+        s.reload(software)
+    assert s.reload(software, discard=True) == [software]
+    assert s.conflicts() == []
+    assert s.validator().problem_count() == problems
+    req = s.get_requirement("r00000004")
+    assert "lost" not in req.label
+
+    # then the folio is written and read again as before
+    req.add_label("kept")
+    s.write(patch=True)
+    assert s.write_errors() == []
+    assert "kept" in _read(software)
+    _bump_file(software, _read(software) + "\n")
+    assert s.refresh() == [software]
+
+
+def test_standard_batch(project_4_directory, scratch_path):
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+    s = Standard("Batch", output_path).read(project_4_directory)
+    s.write()
+    for name in os.listdir(output_path):
+        os.remove(os.path.join(output_path, name))
+    data = s.get_requirement("r00000001")
+    service = s.get_requirement("r00000002")
+    software = s.get_requirement("r00000004")
+    assert data not in service.related
+
+    # links and the write wait for the end of the batch
+    with s.batch():
+        s.relink(data.add_relationship(service.index, "related"))
+        software.title = "Batched."
+        s.write(patch=True)
+        with s.batch():
+            service.title = "Nested."
+        assert data not in service.related
+        assert os.listdir(output_path) == []
+    assert data in service.related
+    assert service in data.related
+    assert sorted(os.listdir(output_path)) == ["service.yaml", "software.yaml"]
+
+    # an exception puts the requirements back as they were
+    added = Requirement.factory(
+        software.path(), {"index": "r00000030", "type": "software"}
+    )
+    with pytest.raises(RuntimeError):
+        with s.batch():
+            software.title = "Lost."
+            data.delete_relationship(service.index)
+            assert s.add_requirement(added)
+            raise RuntimeError("stop")
+    assert software.title == "Batched."
+    assert service in data.related
+    assert s.get_requirement("r00000030") is None
+    assert service.title == "Nested."
+
+
+def test_standard_revalidate(project_4_directory, scratch_path):
+    s = Standard("Revalidate", scratch_path).read(project_4_directory)
+    problems = s.validator().problem_count()
+    req = s.get_requirement("r00000004")
+
+    # an edit is checked when the validator is asked for, once
+    req.add_relationship("r00000090", "parent")
+    assert s.validator().problem_count() == problems + 1
+    assert "Parent index not found: r00000090." in s.validator().index_notes[req.index].notes
+    assert s.revalidate() == 0
+
+    # fixing the edit removes the note, the other notes are kept
+    req.delete_relationship("r00000090")
+    assert s.revalidate() > 1
+    assert s.validator().problem_count() == problems
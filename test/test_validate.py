@@ -1,3 +1,6 @@
+import json
+from xml.etree import ElementTree
+
 from context import littleR
 from littleR.validate import Validator
 from littleR.requirement import Requirement
@@ -38,6 +41,23 @@ def test_validator_index_note(software_file, requirement_data, reports_text):
     assert v.report() == reports_text["validator_index_note"]
 
 
+def test_validator_index_note_batch(software_file, requirement_data, reports_text):
+    v = Validator()
+    data = requirement_data["requirement"]
+    req = Requirement.factory(software_file, data)
+    v.index_note_batch([(req, "This is a note.", False), (req, "This is a problem.", True)])
+    assert v.problem_count() == 1
+    assert v.report() == reports_text["validator_index_note"]
+
+    with pytest.raises(TypeError):
+        v.index_note_batch((req, "This is a note.", False))
+    with pytest.raises(TypeError):
+        v.index_note_batch([(req, "This is a note.")])
+    with pytest.raises(TypeError):
+        v.index_note_batch([(req, "This is a note.", False), ("r00000045", "Bad.", False)])
+    assert v.problem_count() == 1
+
+
 def test_validator_problem_count():
     v = Validator()
     assert v.problem_count() == 0
@@ -131,3 +151,74 @@ def test_validator_negative_index_note(software_file, requirement_data):
         v.index_note(req, "This is a problem.", problem="True")
     with pytest.raises(TypeError):
         v.index_note(req, "This is a problem.", problem=42)
+
+
+def test_validator_clear(customer_file, software_file, requirement_data):
+    v = Validator()
+    data = requirement_data["requirement"]
+    req = Requirement.factory(software_file, data)
+    v.index_note(req, "Checked.", problem=True, tag="check")
+    v.index_note(req, "Read.", problem=True)
+    v.file_note(customer_file, "File.", problem=True)
+    assert v.problem_count() == 3
+
+    # only the notes of the tag are removed
+    revision = v.revision()
+    assert v.clear_index(req, tag="check") == 1
+    assert v.index_notes[req.index].notes == ["Read."]
+    assert v.problem_count() == 2
+    assert v.revision() > revision
+    assert v.clear_index("r99999999") == 0
+
+    # an index note with nothing left is not reported
+    assert v.clear_index(req.index) == 1
+    assert req.index not in v.index_notes
+    assert "Index:" not in v.report()
+
+    assert v.clear_file(customer_file) == 1
+    assert v.problem_count() == 0
+    assert v.file_notes == {}
+    with pytest.raises(TypeError):
+        v.index_note(req, "Tagged.", tag=1)
+
+
+def test_validator_stream_report(customer_file, software_file, requirement_data, scratch_path):
+    v = Validator(scratch_path)
+    req = Requirement.factory(software_file, requirement_data["requirement"])
+    v.note("Standard.")
+    v.file_note(customer_file, "File & <file>.", problem=True)
+    v.index_note(req, "Index.", problem=True, tag="check")
+
+    records = list(v.records())
+    assert v.note_count() == 3
+    assert records[2] == {
+        "severity": "problem",
+        "file": "test/support/file/software.yaml",
+        "index": "r00000045",
+        "rule": "check",
+        "message": "Index.",
+    }
+
+    v.set_report_formats(["text", "jsonl", "junit"])
+    v.write_report()
+    with open(v.report_path(), "r", encoding="utf-8") as f:
+        assert f.read() == v.report()
+    with open(v.report_path("jsonl"), "r", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == records
+    suite = ElementTree.parse(v.report_path("junit")).getroot()
+    assert suite.get("tests") == "3" and suite.get("failures") == "2"
+    cases = suite.findall("./testsuite/testcase")
+    assert cases[1].find("failure").get("message") == "File & <file>."
+    assert cases[2].get("name") == "r00000045 check"
+
+    # characters XML does not allow are left out of the junit report
+    v.note("Bell \x07 and \x1b escape.", problem=True)
+    v.write_report()
+    suite = ElementTree.parse(v.report_path("junit")).getroot()
+    messages = [f.get("message") for f in suite.iter("failure")]
+    assert "Bell  and  escape." in messages
+
+    with pytest.raises(ValueError):
+        v.set_report_formats(["pdf"])
+    with pytest.raises(ValueError):
+        v.report_path("pdf")
@@ -0,0 +1,81 @@
+import time
+import threading
+
+from context import littleR
+from littleR.standard import Standard
+from littleR.watcher import Watcher, inotify_available
+
+from context_files import *
+
+
+def _wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _watch_and_edit(project_4_directory, scratch_path, backend):
+    project_path = os.path.join(scratch_path, "project_4")
+    shutil.copytree(project_4_directory, project_path)
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+    s = Standard("Watched", output_path).read(project_path)
+
+    refreshed = []
+    lock = threading.RLock()
+    watcher = Watcher(
+        s, lock, delay=0.1, interval=0.1, on_refresh=refreshed.append, backend=backend
+    )
+    assert watcher.backend() == backend
+    watcher.start()
+    try:
+        assert watcher.running()
+        time.sleep(0.2)
+
+        # a burst of writes is one refresh
+        software = os.path.join(project_path, "project", "software.yaml")
+        with open(software, "r", encoding="utf-8") as f:
+            text = f.read()
+        for i in range(5):
+            with open(software, "w", encoding="utf-8") as f:
+                f.write(text.replace("YAML file format.", f"YAML file format {i}."))
+            stat = os.stat(software)
+            os.utime(software, ns=(stat.st_atime_ns, stat.st_mtime_ns + (i + 1) * 1_000_000))
+
+        def edited():
+            with lock:
+                req = s.get_requirement("r00000004")
+                return req is not None and req.title == "YAML file format 4."
+
+        assert _wait_for(edited)
+        assert watcher.refresh_count == 1
+        assert refreshed == [[software]]
+    finally:
+        watcher.stop()
+    assert not watcher.running()
+
+
+def test_watcher_poll(project_4_directory, scratch_path):
+    _watch_and_edit(project_4_directory, scratch_path, "poll")
+
+
+@pytest.mark.skipif(not inotify_available(), reason="inotify is not available")
+def test_watcher_inotify(project_4_directory, scratch_path):
+    _watch_and_edit(project_4_directory, scratch_path, "inotify")
+
+
+def test_watcher_invalid(scratch_path):
+    s = Standard("Watched", scratch_path)
+    with pytest.raises(TypeError):
+        Watcher("standard")
+    with pytest.raises(ValueError):
+        Watcher(s, delay=0)
+    with pytest.raises(ValueError):
+        Watcher(s, interval=-1)
+    with pytest.raises(ValueError):
+        Watcher(s, backend="fsevents")
+    with pytest.raises(TypeError):
+        Watcher(s, on_refresh=42)
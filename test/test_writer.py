@@ -0,0 +1,129 @@
+import time
+
+from context import littleR
+from littleR import folio as folio_module
+from littleR.standard import Standard
+from littleR.writer import Writer
+
+from context_files import *
+
+
+def _standard(project_4_directory, scratch_path):
+    output_path = os.path.join(scratch_path, "output")
+    os.makedirs(output_path)
+    s = Standard("Written", output_path).read(project_4_directory)
+    s.write()
+    return s, output_path
+
+
+def test_writer_coalesce(project_4_directory, scratch_path):
+    # a burst of requests is one write, flush waits for it
+    s, output_path = _standard(project_4_directory, scratch_path)
+    writer = Writer(s, delay=0.2).start()
+    try:
+        assert writer.running()
+        req = s.get_requirement("r00000004")
+        for i in range(5):
+            req.add_label(f"label_{i}")
+            writer.request()
+        assert writer.pending()
+        assert writer.flush(timeout=5)
+        assert not writer.pending()
+        assert writer.write_count == 1
+        with open(os.path.join(output_path, "software.yaml"), "r", encoding="utf-8") as f:
+            assert "label_4" in f.read()
+
+        # quiet for the delay, the next request is written by the thread
+        req.add_label("late")
+        writer.request()
+        end = time.monotonic() + 5
+        while writer.pending() and time.monotonic() < end:
+            time.sleep(0.05)
+        assert writer.write_count == 2
+    finally:
+        writer.stop()
+    assert not writer.running()
+    assert writer.status()["error_count"] == 0
+
+
+def test_writer_without_thread(project_4_directory, scratch_path):
+    # without the thread a request is written right away
+    s, output_path = _standard(project_4_directory, scratch_path)
+    writer = Writer(s)
+    s.get_requirement("r00000004").add_label("now")
+    writer.request()
+    assert writer.write_count == 1
+    assert writer.flush()
+    assert writer.write_count == 1
+    assert str(writer) == "Writer(1 writes, 0 errors)"
+
+
+def test_writer_errors(project_4_directory, scratch_path, monkeypatch):
+    # a failed folio is in the status and the validator, and written again
+    s, output_path = _standard(project_4_directory, scratch_path)
+    writer = Writer(s)
+
+    def fail(path, text, directories=None):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(folio_module, "replace_file", fail)
+    s.get_requirement("r00000004").add_label("lost")
+    problems = s.validator().problem_count()
+    writer.request()
+    status = writer.status()
+    assert status["error_count"] == 1
+    assert status["last_error"].startswith("Error writing file:")
+    assert s.write_errors() == [os.path.join(output_path, "software.yaml")]
+    assert s.validator().problem_count() == problems + 1
+
+    monkeypatch.undo()
+    writer.request()
+    assert s.write_errors() == []
+    with open(os.path.join(output_path, "software.yaml"), "r", encoding="utf-8") as f:
+        assert "lost" in f.read()
+
+    # an error from the standard itself is noted too
+    fast = Standard("Fast", output_path).read(project_4_directory, loader="fast")
+    writer = Writer(fast, patch=False)
+    writer.request()
+    assert writer.status()["last_error"].startswith("Error writing standard:")
+    assert fast.validator().problem_count() > 0
+
+
+def test_writer_init(scratch_path):
+    s = Standard("Writer", scratch_path)
+    with pytest.raises(TypeError):
+        Writer(None)
+    with pytest.raises(ValueError):
+        Writer(s, delay=0)
+    with pytest.raises(ValueError):
+        Writer(s, delay=True)
+    with pytest.raises(TypeError):
+        Writer(s, patch="yes")
+
+
+def test_writer_newer_file(project_4_directory, scratch_path):
+    # a file changed on disk after it was read is not replaced by a write
+    project_path = os.path.join(scratch_path, "project_4")
+    shutil.copytree(project_4_directory, project_path)
+    s = Standard("Written").read(project_path)
+    s.write()
+    writer = Writer(s)
+
+    software = os.path.join(project_path, "project", "software.yaml")
+    s.get_requirement("r00000004").add_label("zebra")
+    with open(software, "a", encoding="utf-8") as f:
+        f.write("\n# edited outside\n")
+    stat = os.stat(software)
+    os.utime(software, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    problems = s.validator().problem_count()
+
+    writer.request()
+    assert writer.status()["error_count"] == 1
+    assert s.write_errors() == [software]
+    assert s.validator().problem_count() == problems + 1
+    with open(software, "r", encoding="utf-8") as f:
+        text = f.read()
+    assert "# edited outside" in text
+    assert "zebra" not in text
+